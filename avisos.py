@@ -0,0 +1,89 @@
+# avisos.py
+"""Envio da caixa de saída de avisos sem interface gráfica (ex.: tarefa agendada).
+
+Uso:
+    python avisos.py despachar --gateway http://localhost:8080/mensagens [--token TOKEN]
+    python avisos.py situacao
+"""
+import argparse
+import os
+import sys
+import time
+
+from database.database import Database, AVISO_ENVIADO, AVISO_FALHOU, AVISO_PENDENTE
+from utils.notificacoes import (URL_GATEWAY, TOKEN_GATEWAY, LOTE_GATEWAY, ENVIOS_SIMULTANEOS_GATEWAY,
+                                INTERVALO_GATEWAY, EspacamentoEnvios, TransporteHttp, despachar_lote)
+
+
+def despachar(banco: str, transporte) -> dict:
+    """
+    Envia os avisos da fila cuja vez já chegou e imprime o resumo.
+
+    Avisos com nova tentativa agendada para mais tarde ficam para a próxima execução.
+
+    Returns:
+        dict: Quantidade de avisos por resultado (enviado, pendente, falhou)
+    """
+    database = Database(banco)
+    contagem = {AVISO_ENVIADO: 0, AVISO_PENDENTE: 0, AVISO_FALHOU: 0}
+    try:
+        espacamento = EspacamentoEnvios(transporte)
+        while True:
+            resultados = despachar_lote(database, transporte, espacamento)
+            if not resultados:
+                break
+            for aviso_id, cliente_id, estado, erro, _ in resultados:
+                contagem[estado] += 1
+                if erro:
+                    print(f'Aviso {aviso_id} (cliente {cliente_id}): {erro}')
+    finally:
+        database.fechar_conexao()
+    return contagem
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Envio da caixa de saída de avisos.')
+    parser.add_argument('--banco', default='clientes.db', help='Banco de dados SQLite (padrão: clientes.db)')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    despachar_parser = subcomandos.add_parser('despachar', help='Envia os avisos pendentes pelo gateway HTTP')
+    despachar_parser.add_argument('--gateway', default=URL_GATEWAY, help='URL do gateway de mensagens')
+    despachar_parser.add_argument('--token', default=TOKEN_GATEWAY, help='Token de acesso ao gateway')
+    despachar_parser.add_argument('--lote', type=int, default=LOTE_GATEWAY,
+                                  help=f'Avisos reservados por vez (padrão: {LOTE_GATEWAY})')
+    despachar_parser.add_argument('--concorrencia', type=int, default=ENVIOS_SIMULTANEOS_GATEWAY,
+                                  help=f'Envios simultâneos (padrão: {ENVIOS_SIMULTANEOS_GATEWAY})')
+    despachar_parser.add_argument('--intervalo', type=float, default=INTERVALO_GATEWAY,
+                                  help=f'Segundos entre o início de dois envios (padrão: {INTERVALO_GATEWAY})')
+
+    subcomandos.add_parser('situacao', help='Mostra quantos avisos há em cada estado')
+    args = parser.parse_args(argumentos)
+
+    if not os.path.exists(args.banco):
+        parser.error(f'Banco de dados não encontrado: {args.banco}')
+
+    if args.comando == 'despachar':
+        if not args.gateway:
+            parser.error('Informe o gateway (--gateway); os links wa.me só podem ser abertos pela aplicação')
+        transporte = TransporteHttp(args.gateway, args.token, max(args.lote, 1), max(args.concorrencia, 1),
+                                    max(args.intervalo, 0.0))
+        inicio = time.perf_counter()
+        contagem = despachar(args.banco, transporte)
+        print(f'{contagem[AVISO_ENVIADO]} aviso(s) enviado(s), {contagem[AVISO_PENDENTE]} para nova tentativa, '
+              f'{contagem[AVISO_FALHOU]} com falha definitiva em {time.perf_counter() - inicio:.1f} s')
+    elif args.comando == 'situacao':
+        database = Database(args.banco)
+        try:
+            situacao = database.contar_avisos_saida()
+            proxima = database.proxima_tentativa_aviso()
+        finally:
+            database.fechar_conexao()
+        for estado, quantidade in sorted(situacao.items()):
+            print(f'{estado}: {quantidade}')
+        if proxima is not None:
+            print(f'Próximo envio: {time.strftime("%d/%m/%Y %H:%M", time.localtime(proxima))}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+# comprovantes.py
+"""Manutenção da pasta de comprovantes pela linha de comando.
+
+Uso:
+    python comprovantes.py recomprimir [--lado-maximo 2400] [--qualidade 80] [--manter-original]
+    python comprovantes.py configurar [--lado-maximo 2400] [--qualidade 80] [--manter-original | --descartar-original]
+    python comprovantes.py coletar [--carencia-horas 24] [--retencao-dias 30] [--simular]
+    python comprovantes.py subpastas
+    python comprovantes.py anexar PASTA_DIGITALIZADOS
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from database.database import Database
+from utils.comprovante_gc import CARENCIA_ORFAOS, RETENCAO_QUARENTENA, PASTA_QUARENTENA, executar_coleta
+from utils.comprovante_lote import armazenar_lote, associar_arquivos, gravar_anexos
+from utils.comprovante_store import (armazenar_comprovante, caminho_comprovante, caminho_original,
+                                     iterar_comprovantes, migrar_para_subpastas)
+from utils.directory_helper import ensure_comprovantes_dir, ARQUIVO_CONFIGURACAO, PASTA_MINIATURAS, PASTA_ORIGINAIS
+from utils.image_ingest import gravar_configuracao_ingestao, ler_configuracao_ingestao, recomprimir_imagem
+from utils.thumbnail_cache import caminho_miniatura
+
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Redução mínima para regravar um comprovante já existente (evita perder
+# qualidade recomprimindo de novo arquivos que já passaram por aqui)
+ECONOMIA_MINIMA_ACERVO = 0.10
+
+
+def listar_comprovantes(pasta: str) -> list:
+    """Imagens armazenadas na pasta e nas subpastas de hash (ignora temporários)."""
+    return sorted(entrada.path for entrada in iterar_comprovantes(pasta)
+                  if not entrada.name.startswith('.')
+                  and os.path.splitext(entrada.name)[1].lower() in EXTENSOES_IMAGEM)
+
+
+def _recomprimir_arquivo(caminho: str, lado_maximo: int, qualidade: int):
+    """Gera a versão recomprimida em um temporário (executado em processo separado)."""
+    pasta = os.path.dirname(caminho)
+    descritor, temporario = tempfile.mkstemp(prefix='.ingest-', suffix='.jpg', dir=pasta)
+    os.close(descritor)
+    try:
+        if recomprimir_imagem(caminho, temporario, lado_maximo, qualidade, ECONOMIA_MINIMA_ACERVO):
+            return caminho, temporario
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    return caminho, None
+
+
+def recomprimir_acervo(banco: str, pasta: str, lado_maximo: int, qualidade: int,
+                       manter_original: bool, processos: int) -> tuple:
+    """
+    Recomprime os comprovantes existentes em paralelo e atualiza as referências no banco.
+
+    Returns:
+        Tuple[int, int, int]: Arquivos recomprimidos, bytes antes e bytes depois
+    """
+    arquivos = listar_comprovantes(pasta)
+    print(f'{len(arquivos)} comprovante(s) em {pasta}')
+
+    database = Database(banco)
+    recomprimidos = 0
+    bytes_antes = 0
+    bytes_depois = 0
+    try:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            tarefas = [executor.submit(_recomprimir_arquivo, caminho, lado_maximo, qualidade)
+                       for caminho in arquivos]
+            # O banco e os arquivos finais só são alterados neste processo
+            for tarefa in as_completed(tarefas):
+                try:
+                    caminho, temporario = tarefa.result()
+                except Exception as e:
+                    print(f'Erro ao recomprimir: {e}')
+                    continue
+                if temporario is None:
+                    continue
+
+                antigo = os.path.basename(caminho)
+                tamanho_antes = os.path.getsize(caminho)
+                try:
+                    novo = armazenar_comprovante(temporario, pasta)
+                finally:
+                    os.remove(temporario)
+                database.renomear_comprovante(antigo, novo)
+
+                if manter_original:
+                    # Nomeado pelo comprovante novo, o original acompanha a sua liberação e coleta
+                    original = caminho_original(novo, os.path.splitext(antigo)[1], pasta)
+                    os.makedirs(os.path.dirname(original), exist_ok=True)
+                    shutil.move(caminho, original)
+                else:
+                    os.remove(caminho)
+                miniatura = caminho_miniatura(antigo, os.path.join(pasta, PASTA_MINIATURAS))
+                if os.path.exists(miniatura):
+                    os.remove(miniatura)
+
+                tamanho_depois = os.path.getsize(caminho_comprovante(novo, pasta))
+                recomprimidos += 1
+                bytes_antes += tamanho_antes
+                bytes_depois += tamanho_depois
+                print(f'{antigo} -> {novo}: {tamanho_antes / 1024:.0f} KiB -> {tamanho_depois / 1024:.0f} KiB')
+    finally:
+        database.fechar_conexao()
+    return recomprimidos, bytes_antes, bytes_depois
+
+
+def coletar_orfaos(banco: str, pasta: str, carencia: float, retencao: float, simular: bool) -> dict:
+    """Recolhe os comprovantes sem cliente e imprime o resumo."""
+    database = Database(banco)
+    try:
+        resumo = executar_coleta(database, pasta, carencia=carencia, retencao=retencao, simular=simular)
+    finally:
+        database.fechar_conexao()
+
+    mib = 1024 * 1024
+    acao = 'seriam' if simular else 'foram'
+    print(f"{resumo['analisados']} arquivo(s) analisado(s) em {pasta}")
+    print(f"{resumo['orfaos']} órfão(s) {acao} para {PASTA_QUARENTENA}/ ({resumo['bytes_orfaos'] / mib:.1f} MiB)")
+    print(f"{resumo['originais']} original(is) sem comprovante {acao} para {PASTA_QUARENTENA}/{PASTA_ORIGINAIS}/ "
+          f"({resumo['bytes_originais'] / mib:.1f} MiB)")
+    print(f"{resumo['excluidos']} arquivo(s) da quarentena {acao} excluído(s) "
+          f"({resumo['bytes_excluidos'] / mib:.1f} MiB)")
+    print(f"{resumo['restaurados']} arquivo(s) referenciado(s) {acao} restaurado(s) da quarentena")
+    print(f"{resumo['temporarios']} temporário(s) abandonado(s) ({resumo['bytes_temporarios'] / mib:.1f} MiB)")
+    print(f"{resumo['miniaturas']} miniatura(s) sem comprovante ({resumo['bytes_miniaturas'] / mib:.1f} MiB)")
+    return resumo
+
+
+def anexar_pasta(banco: str, pasta: str, pasta_origem: str) -> int:
+    """Anexa os comprovantes de uma pasta aos clientes pelo CPF/CNPJ do nome do arquivo."""
+    database = Database(banco)
+    try:
+        associados, nao_associados = associar_arquivos(pasta_origem, database.indice_documentos())
+        atribuicoes, falhas = armazenar_lote(associados, pasta)
+        atualizados = gravar_anexos(database, atribuicoes, pasta)
+    finally:
+        database.fechar_conexao()
+
+    for arquivo, motivo in nao_associados + falhas:
+        print(f'{arquivo}: {motivo}')
+    print(f'{atualizados} comprovante(s) anexado(s); {len(nao_associados) + len(falhas)} arquivo(s) não associado(s)')
+    return atualizados
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Manutenção da pasta de comprovantes.')
+    parser.add_argument('--banco', default='clientes.db', help='Banco de dados SQLite (padrão: clientes.db)')
+    parser.add_argument('--pasta', default=None, help='Pasta dos comprovantes (padrão: a da aplicação)')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    recomprimir = subcomandos.add_parser('recomprimir', help='Reduz e recomprime os comprovantes existentes')
+    recomprimir.add_argument('--lado-maximo', type=int, default=None,
+                             help=f'Maior lado em pixels (padrão: o de {ARQUIVO_CONFIGURACAO})')
+    recomprimir.add_argument('--qualidade', type=int, default=None,
+                             help=f'Qualidade JPEG de 0 a 100 (padrão: a de {ARQUIVO_CONFIGURACAO})')
+    recomprimir.add_argument('--manter-original', action='store_true', default=None,
+                             help=f'Move os originais para a subpasta {PASTA_ORIGINAIS}/ em vez de apagá-los '
+                                  f'(padrão: o de {ARQUIVO_CONFIGURACAO})')
+    recomprimir.add_argument('--processos', type=int, default=os.cpu_count() or 1,
+                             help='Processos de recompressão (padrão: número de CPUs)')
+
+    coletar = subcomandos.add_parser('coletar', help='Move para a quarentena os comprovantes sem cliente')
+    coletar.add_argument('--carencia-horas', type=float, default=CARENCIA_ORFAOS / 3600,
+                         help=f'Horas sem alteração antes de recolher um órfão (padrão: {CARENCIA_ORFAOS // 3600})')
+    coletar.add_argument('--retencao-dias', type=float, default=RETENCAO_QUARENTENA / 86400,
+                         help=f'Dias na quarentena antes da exclusão (padrão: {RETENCAO_QUARENTENA // 86400})')
+    coletar.add_argument('--simular', action='store_true', help='Só informa o que seria feito')
+
+    configurar = subcomandos.add_parser('configurar',
+                                        help='Mostra ou altera a configuração de entrada dos comprovantes')
+    configurar.add_argument('--lado-maximo', type=int, help='Maior lado em pixels da versão armazenada')
+    configurar.add_argument('--qualidade', type=int, help='Qualidade JPEG de 0 a 100')
+    original = configurar.add_mutually_exclusive_group()
+    original.add_argument('--manter-original', dest='manter_original', action='store_true', default=None,
+                          help=f'Guarda também o original em {PASTA_ORIGINAIS}/')
+    original.add_argument('--descartar-original', dest='manter_original', action='store_false',
+                          help='Guarda só a versão recomprimida')
+
+    subcomandos.add_parser('subpastas', help='Move os comprovantes da raiz para as subpastas de hash')
+
+    anexar = subcomandos.add_parser('anexar', help='Anexa os comprovantes de uma pasta pelo CPF/CNPJ no nome')
+    anexar.add_argument('pasta_origem', help='Pasta com os comprovantes digitalizados')
+    args = parser.parse_args(argumentos)
+
+    pasta = args.pasta or ensure_comprovantes_dir()
+    if args.comando == 'configurar':
+        try:
+            configuracao = gravar_configuracao_ingestao(pasta, lado_maximo=args.lado_maximo,
+                                                        qualidade=args.qualidade,
+                                                        manter_original=args.manter_original)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"{os.path.join(pasta, ARQUIVO_CONFIGURACAO)}: lado máximo {configuracao['lado_maximo']} px, "
+              f"qualidade {configuracao['qualidade']}, "
+              f"{'mantém' if configuracao['manter_original'] else 'descarta'} o original")
+        return 0
+
+    if not os.path.exists(args.banco):
+        parser.error(f'Banco de dados não encontrado: {args.banco}')
+
+    if args.comando == 'recomprimir':
+        configuracao = ler_configuracao_ingestao(pasta)
+        for chave in ('lado_maximo', 'qualidade', 'manter_original'):
+            if getattr(args, chave) is None:
+                setattr(args, chave, configuracao[chave])
+        inicio = time.perf_counter()
+        quantidade, antes, depois = recomprimir_acervo(
+            args.banco, pasta, args.lado_maximo, args.qualidade, args.manter_original, max(args.processos, 1)
+        )
+        economia = antes - depois
+        print(f'{quantidade} comprovante(s) recomprimido(s) em {time.perf_counter() - inicio:.1f} s; '
+              f'{economia / (1024 * 1024):.1f} MiB economizados ({economia} bytes)')
+    elif args.comando == 'coletar':
+        coletar_orfaos(args.banco, pasta, args.carencia_horas * 3600, args.retencao_dias * 86400, args.simular)
+    elif args.comando == 'subpastas':
+        inicio = time.perf_counter()
+        database = Database(args.banco)
+        try:
+            migrados = migrar_para_subpastas(database, pasta)
+        finally:
+            database.fechar_conexao()
+        print(f'{migrados} comprovante(s) movido(s) para subpastas em {time.perf_counter() - inicio:.1f} s')
+    elif args.comando == 'anexar':
+        if not os.path.isdir(args.pasta_origem):
+            parser.error(f'Pasta não encontrada: {args.pasta_origem}')
+        anexar_pasta(args.banco, pasta, args.pasta_origem)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
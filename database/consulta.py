@@ -0,0 +1,183 @@
+# database/consulta.py
+from typing import List, Optional, Tuple
+from utils.date_helper import data_para_dia, hoje_dia
+from utils.text_helper import termos_busca
+
+# Critérios aceitos: rótulo exibido na interface -> (coluna, tipo de comparação).
+# Somente estas colunas podem aparecer no SQL gerado; o valor digitado pelo
+# usuário sempre vai como parâmetro.
+CRITERIOS = {
+    'Nome': ('nome', 'texto'),
+    'Telefone': ('telefone', 'texto'),
+    'CPF/CNPJ': ('cpf_cnpj', 'texto'),
+    'E-mail': ('email', 'texto'),
+    'Municipio': ('cidade', 'texto'),
+    'Vencimento (DD/MM/AAAA)': ('vencimento', 'data'),
+    'Vencimento entre datas': ('vencimento', 'entre'),
+    'Vence nos próximos N dias': ('vencimento', 'proximos'),
+    'Venceu nos últimos N dias': ('vencimento', 'ultimos'),
+    'Status': ('status', 'lista'),
+    'Estado': ('estado', 'lista'),
+    # Busca indexada (FTS5) em nome, telefone, CPF/CNPJ, e-mail e município
+    'Busca rápida': ('id', 'busca'),
+}
+
+CONECTORES = ('AND', 'OR')
+
+
+def _escapar_like(texto: str) -> str:
+    """Escapa os curingas do LIKE para que o texto seja buscado literalmente."""
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filtro_busca(texto: str) -> Tuple[str, list]:
+    """
+    Converte o texto digitado no filtro do índice trigram (todos os termos, em qualquer trecho).
+
+    Termos com 3 ou mais caracteres vão no MATCH; os mais curtos, que o trigram
+    não indexa, são conferidos com LIKE na mesma chave.
+
+    Returns:
+        Tuple[str, list]: Condição sobre clientes_busca e parâmetros (condição vazia se não houver termos)
+    """
+    termos = termos_busca(texto)
+    condicoes = []
+    parametros = []
+    longos = [termo for termo in termos if len(termo) >= 3]
+    if longos:
+        condicoes.append('clientes_busca MATCH ?')
+        parametros.append(' '.join('"{}"'.format(termo.replace('"', '""')) for termo in longos))
+    for termo in termos:
+        if len(termo) < 3:
+            condicoes.append("chave LIKE ? ESCAPE '\\'")
+            parametros.append(f'%{_escapar_like(termo)}%')
+    return ' AND '.join(condicoes), parametros
+
+
+class ConsultaClientes:
+    """Monta uma consulta parametrizada combinando vários critérios com AND/OR.
+
+    Cada critério é adicionado com o conector que o liga ao anterior; a
+    precedência segue a do SQL (AND antes de OR).
+    """
+
+    def __init__(self):
+        self.criterios: List[Tuple[str, str, list]] = []
+
+    def adicionar(self, criterio: str, valores: list, conector: str = 'AND') -> 'ConsultaClientes':
+        if criterio not in CRITERIOS:
+            raise ValueError(f'Critério de pesquisa desconhecido: {criterio}')
+        conector = conector.upper()
+        if conector not in CONECTORES:
+            raise ValueError(f'Conector inválido: {conector}')
+        self.criterios.append((conector, criterio, list(valores)))
+        return self
+
+    def adicionar_grupo(self, consulta: 'ConsultaClientes', conector: str = 'AND') -> 'ConsultaClientes':
+        """Adiciona outra consulta como um único critério entre parênteses."""
+        conector = conector.upper()
+        if conector not in CONECTORES:
+            raise ValueError(f'Conector inválido: {conector}')
+        if not consulta.vazia():
+            self.criterios.append((conector, consulta, []))
+        return self
+
+    def vazia(self) -> bool:
+        return not self.criterios
+
+    def _condicao(self, criterio, valores: list, hoje: int) -> Tuple[str, list]:
+        if isinstance(criterio, ConsultaClientes):
+            return criterio.montar_filtro(hoje)
+
+        coluna, tipo = CRITERIOS[criterio]
+        if not valores:
+            raise ValueError(f'Nenhum valor informado para {criterio}')
+
+        if tipo == 'texto':
+            return f"{coluna} LIKE ? ESCAPE '\\'", [f'%{_escapar_like(str(valores[0]))}%']
+
+        if tipo == 'data':
+            dia = data_para_dia(valores[0])
+            if dia is None:
+                raise ValueError(f'Data inválida: {valores[0]}')
+            return f'{coluna} = ?', [dia]
+
+        if tipo == 'entre':
+            inicio = data_para_dia(valores[0])
+            fim = data_para_dia(valores[1]) if len(valores) > 1 else inicio
+            if inicio is None or fim is None:
+                raise ValueError(f'Intervalo de datas inválido: {valores}')
+            return f'{coluna} BETWEEN ? AND ?', [min(inicio, fim), max(inicio, fim)]
+
+        if tipo == 'proximos':
+            return f'{coluna} BETWEEN ? AND ?', [hoje, hoje + int(valores[0])]
+
+        if tipo == 'ultimos':
+            # Como em 'proximos', a janela inclui hoje (N = 0 é só o dia de hoje)
+            return f'{coluna} BETWEEN ? AND ?', [hoje - int(valores[0]), hoje]
+
+        if tipo == 'busca':
+            filtro, parametros = filtro_busca(valores[0])
+            if not filtro:
+                raise ValueError('Texto de busca vazio')
+            return f'{coluna} IN (SELECT rowid FROM clientes_busca WHERE {filtro})', parametros
+
+        # tipo == 'lista'
+        placeholders = ', '.join(['?'] * len(valores))
+        return f'{coluna} IN ({placeholders})', list(valores)
+
+    def montar_filtro(self, hoje: Optional[int] = None) -> Tuple[str, list]:
+        """
+        Gera apenas a condição WHERE (sem a palavra-chave) e seus parâmetros.
+
+        Args:
+            hoje (Optional[int]): Número de dia usado nas janelas relativas (padrão: hoje)
+
+        Returns:
+            Tuple[str, list]: Condição SQL (vazia se não houver critérios) e parâmetros
+        """
+        if hoje is None:
+            hoje = hoje_dia()
+
+        partes = []
+        parametros = []
+        for posicao, (conector, criterio, valores) in enumerate(self.criterios):
+            condicao, params = self._condicao(criterio, valores, hoje)
+            if posicao > 0:
+                partes.append(conector)
+            partes.append(f'({condicao})')
+            parametros.extend(params)
+        return ' '.join(partes), parametros
+
+    def ordem_padrao(self) -> str:
+        """Coluna de ordenação natural: pesquisas por vencimento seguem a ordem do índice."""
+        for _, criterio, _ in self.criterios:
+            if isinstance(criterio, ConsultaClientes):
+                if criterio.ordem_padrao() == 'vencimento':
+                    return 'vencimento'
+            elif CRITERIOS[criterio][0] == 'vencimento':
+                return 'vencimento'
+        return 'id'
+
+    def montar(self, colunas: str, hoje: Optional[int] = None) -> Tuple[str, list]:
+        """
+        Gera o SQL e os parâmetros da consulta.
+
+        Args:
+            colunas (str): Trecho 'SELECT ... FROM clientes' ao qual o WHERE é anexado
+            hoje (Optional[int]): Número de dia usado nas janelas relativas (padrão: hoje)
+
+        Returns:
+            Tuple[str, list]: Comando SQL e lista de parâmetros
+        """
+        filtro, parametros = self.montar_filtro(hoje)
+
+        sql = colunas
+        if filtro:
+            sql += ' WHERE ' + filtro
+
+        if self.ordem_padrao() == 'vencimento':
+            sql += ' ORDER BY vencimento, id'
+        else:
+            sql += ' ORDER BY id'
+        return sql, parametros
@@ -1,44 +1,575 @@
-# database/database.py
 import sqlite3
+import time
+from datetime import date
 from typing import List, Tuple, Optional
+from utils.date_helper import data_para_dia, dia_para_data, dia_para_iso, hoje_dia
+from utils.status_helper import DIAS_EXPIRANDO, status_por_dias, proxima_transicao
+from utils.text_helper import chave_busca_cliente
+from database.consulta import ConsultaClientes
+
+# Versão atual do esquema (armazenada em PRAGMA user_version)
+ESQUEMA_VERSAO = 4
+
+# Colunas da tabela na ordem usada pelas tuplas da aplicação
+COLUNAS = (
+    'id', 'nome', 'telefone', 'cpf_cnpj', 'email', 'periodo_assinatura',
+    'ultimo_pagamento', 'vencimento', 'data_aviso', 'avisado',
+    'status', 'estado', 'cidade', 'observacao', 'comprovante'
+)
+
+# Eventos enviados aos ouvintes a cada gravação: ouvinte(evento, cliente_id)
+EVENTO_INSERIDO = 'inserido'
+EVENTO_ATUALIZADO = 'atualizado'
+EVENTO_REMOVIDO = 'removido'
+EVENTO_RECARREGADO = 'recarregado'  # Alteração em massa: cliente_id é None
+
+# Índices das colunas de data (armazenadas como número de dia)
+INDICES_DATAS = (6, 7, 8)
+
+# Contagem de referências dos arquivos de comprovante (um arquivo pode ser
+# compartilhado por vários clientes), mantida por gatilhos em qualquer gravação
+SQL_CRIAR_COMPROVANTES = [
+    '''
+    CREATE TABLE IF NOT EXISTS comprovantes (
+        arquivo TEXT PRIMARY KEY,
+        referencias INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS comprovantes_insert
+    AFTER INSERT ON clientes WHEN new.comprovante IS NOT NULL AND new.comprovante != '' BEGIN
+        INSERT OR IGNORE INTO comprovantes (arquivo, referencias) VALUES (new.comprovante, 0);
+        UPDATE comprovantes SET referencias = referencias + 1 WHERE arquivo = new.comprovante;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS comprovantes_update_antigo
+    AFTER UPDATE OF comprovante ON clientes WHEN old.comprovante IS NOT new.comprovante BEGIN
+        UPDATE comprovantes SET referencias = referencias - 1 WHERE arquivo = old.comprovante;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS comprovantes_update_novo
+    AFTER UPDATE OF comprovante ON clientes
+    WHEN old.comprovante IS NOT new.comprovante AND new.comprovante IS NOT NULL AND new.comprovante != '' BEGIN
+        INSERT OR IGNORE INTO comprovantes (arquivo, referencias) VALUES (new.comprovante, 0);
+        UPDATE comprovantes SET referencias = referencias + 1 WHERE arquivo = new.comprovante;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS comprovantes_delete AFTER DELETE ON clientes BEGIN
+        UPDATE comprovantes SET referencias = referencias - 1 WHERE arquivo = old.comprovante;
+    END
+    ''',
+]
+
+# Caixa de saída dos avisos: cada mensagem fica gravada até ser entregue (ou
+# desistida), então nada se perde se a aplicação fechar no meio de uma campanha
+AVISO_PENDENTE = 'pendente'
+AVISO_ENVIANDO = 'enviando'
+AVISO_ENVIADO = 'enviado'
+AVISO_FALHOU = 'falhou'
+AVISO_CANCELADO = 'cancelado'
+
+# Tempo (s) que um aviso reservado fica com quem o reservou; se o envio não for
+# registrado nesse prazo (aplicação fechada no meio), ele volta a ser entregue
+PRAZO_RESERVA_AVISO = 15 * 60
+
+SQL_CRIAR_AVISOS_SAIDA = [
+    '''
+    CREATE TABLE IF NOT EXISTS avisos_saida (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cliente_id INTEGER NOT NULL,
+        telefone TEXT NOT NULL,
+        mensagem TEXT NOT NULL,
+        estado TEXT NOT NULL,
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        proxima_tentativa REAL NOT NULL,
+        criado_em REAL NOT NULL,
+        enviado_em REAL,
+        erro TEXT
+    )
+    ''',
+    # Fila: avisos pendentes (ou com a reserva vencida) na ordem da próxima tentativa
+    'CREATE INDEX IF NOT EXISTS idx_avisos_saida_fila ON avisos_saida (estado, proxima_tentativa)',
+]
+
+SQL_POPULAR_COMPROVANTES = '''
+    INSERT OR REPLACE INTO comprovantes (arquivo, referencias)
+    SELECT comprovante, COUNT(*) FROM clientes
+    WHERE comprovante IS NOT NULL AND comprovante != ''
+    GROUP BY comprovante
+'''
+
+# Faixas de dias em atraso do relatório de inadimplência: (mínimo, máximo, rótulo)
+FAIXAS_INADIMPLENCIA = (
+    (1, 30, '1–30 dias'),
+    (31, 60, '31–60 dias'),
+    (61, 90, '61–90 dias'),
+    (91, None, '90+ dias'),
+)
+
+# Soma que converte o número de dia (ordinal) em dia juliano para date()/strftime() do SQLite
+SQL_DIA_JULIANO = 1721424.5
+
+# Acima desta quantidade de clientes alterados de uma vez (virada do dia,
+# anexo de comprovantes ou entrega de avisos em lote), a tabela é recarregada em vez de linha a linha
+LIMITE_NOTIFICACOES_INDIVIDUAIS = 200
+
+# Linhas do CSV lidas por vez na importação: CPF/CNPJ e e-mails de cada bloco
+# são validados em lote (NumPy) sem carregar o arquivo inteiro na memória
+LINHAS_POR_BLOCO_IMPORTACAO = 10000
+
+SELECT_CLIENTES = f"SELECT {', '.join(COLUNAS)} FROM clientes"
+
+SQL_CRIAR_TABELA = '''
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        telefone TEXT,
+        cpf_cnpj TEXT,
+        email TEXT,
+        periodo_assinatura INTEGER,
+        ultimo_pagamento INTEGER,
+        vencimento INTEGER,
+        data_aviso INTEGER,
+        avisado BOOLEAN,
+        status TEXT,
+        estado TEXT,
+        cidade TEXT,
+        observacao TEXT,
+        comprovante TEXT,
+        proxima_transicao INTEGER
+    )
+'''
+
+# Status e dia da próxima mudança de status calculados no SQL (parâmetros :hoje e :dias).
+# Em dia -> Expirando em vencimento - dias; Expirando -> Inadimplente em vencimento + 1
+SQL_STATUS = '''
+    CASE
+        WHEN vencimento IS NULL THEN 'Data inválida'
+        WHEN vencimento < :hoje THEN 'Inadimplente'
+        WHEN vencimento <= :hoje + :dias THEN 'Expirando'
+        ELSE 'Em dia'
+    END
+'''
+
+SQL_PROXIMA_TRANSICAO = '''
+    CASE
+        WHEN vencimento IS NULL OR vencimento < :hoje THEN NULL
+        WHEN vencimento <= :hoje + :dias THEN vencimento + 1
+        ELSE vencimento - :dias
+    END
+'''
+
+# Cliente novo ou com vencimento alterado entra na próxima verificação de
+# transições, que grava o dia exato da sua próxima mudança de status
+SQL_CRIAR_GATILHOS_TRANSICAO = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS clientes_transicao_insert AFTER INSERT ON clientes BEGIN
+        UPDATE clientes SET proxima_transicao = new.vencimento - %(dias)d WHERE id = new.id;
+    END
+    ''' % {'dias': DIAS_EXPIRANDO},
+    '''
+    CREATE TRIGGER IF NOT EXISTS clientes_transicao_update AFTER UPDATE OF vencimento ON clientes BEGIN
+        UPDATE clientes SET proxima_transicao = new.vencimento - %(dias)d WHERE id = new.id;
+    END
+    ''' % {'dias': DIAS_EXPIRANDO},
+]
+
+
+def _sql_digitos(expressao: str) -> str:
+    """Expressão SQL que remove a pontuação de telefones e documentos."""
+    for caractere in ('(', ')', ' ', '-', '.', '/', '+'):
+        expressao = f"replace({expressao}, '{caractere}', '')"
+    return expressao
+
+
+# Índice de texto (FTS5) para a busca rápida. O tokenizador trigram encontra
+# qualquer trecho (não só o início das palavras) e o texto indexado é a mesma
+# chave normalizada do filtro em memória (chave_busca_cliente), então os dois
+# modos de filtro dão o mesmo resultado. Os gatilhos são SQL puro: só anotam
+# os clientes alterados em clientes_busca_pendentes, e a chave é calculada em
+# Python antes da próxima busca (atualizar_busca_indexada). Assim outras
+# conexões (o sqlite3 da linha de comando, scripts de backup) continuam gravando
+SQL_CRIAR_BUSCA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS clientes_busca USING fts5(
+        chave,
+        tokenize = 'trigram'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS clientes_busca_pendentes (
+        id INTEGER PRIMARY KEY
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS clientes_busca_insert AFTER INSERT ON clientes BEGIN
+        INSERT OR IGNORE INTO clientes_busca_pendentes (id) VALUES (new.id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS clientes_busca_update
+    AFTER UPDATE OF nome, telefone, cpf_cnpj, email, cidade ON clientes BEGIN
+        INSERT OR IGNORE INTO clientes_busca_pendentes (id) VALUES (new.id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS clientes_busca_delete AFTER DELETE ON clientes BEGIN
+        DELETE FROM clientes_busca WHERE rowid = old.id;
+        DELETE FROM clientes_busca_pendentes WHERE id = old.id;
+    END
+    ''',
+]
+
+# Índice criado por versões anteriores (unicode61, ou gatilhos que chamavam
+# uma função Python e impediam outras conexões de gravar)
+SQL_REMOVER_BUSCA = [
+    'DROP TRIGGER IF EXISTS clientes_busca_insert',
+    'DROP TRIGGER IF EXISTS clientes_busca_update',
+    'DROP TRIGGER IF EXISTS clientes_busca_delete',
+    'DROP TABLE IF EXISTS clientes_busca',
+]
+
+# Índice novo: todos os clientes entram como pendentes
+SQL_POPULAR_BUSCA = '''
+    INSERT OR IGNORE INTO clientes_busca_pendentes (id) SELECT id FROM clientes
+'''
+
+
+def _linha_para_tupla(linha: Tuple) -> Tuple:
+    """Converte as colunas de data (número de dia) de uma linha do banco em texto ISO."""
+    if linha is None:
+        return None
+    valores = list(linha)
+    for indice in INDICES_DATAS:
+        valores[indice] = dia_para_iso(valores[indice])
+    return tuple(valores)
+
+
+def _datas_para_dias(cliente: Tuple) -> Tuple:
+    """Converte as datas de uma tupla de gravação (sem o ID na frente) em número de dia."""
+    valores = list(cliente)
+    for indice in INDICES_DATAS:
+        valores[indice - 1] = data_para_dia(valores[indice - 1])
+    return tuple(valores)
+
+
+class PaginadorClientes:
+    """Lê os clientes em páginas, cada uma com uma consulta curta e independente.
+
+    Nenhum cursor fica aberto entre as páginas, então as gravações feitas
+    pelos diálogos (que usam outras conexões) não ficam bloqueadas enquanto
+    a tabela é rolada.
+    """
+
+    def __init__(self, conn, filtro: str, parametros: list, ordenar_por: str = 'id',
+                 decrescente: bool = False, tamanho_pagina: int = 500):
+        if ordenar_por not in COLUNAS:
+            raise ValueError(f'Coluna de ordenação inválida: {ordenar_por}')
+        self.conn = conn
+        self.filtro = filtro
+        self.parametros = list(parametros)
+        self.ordenar_por = ordenar_por
+        self.decrescente = decrescente
+        self.tamanho_pagina = tamanho_pagina
+        self.esgotado = False
+        self._lidos = 0
+        self._ultimo_id = None
+
+    def deslocar(self, quantidade: int):
+        """Ajusta a posição da próxima página quando linhas já lidas são inseridas ou removidas."""
+        self._lidos += quantidade
+
+    def proxima_pagina(self) -> List[Tuple]:
+        if self.esgotado:
+            return []
+
+        direcao = 'DESC' if self.decrescente else 'ASC'
+        condicoes = [f'({self.filtro})'] if self.filtro else []
+        parametros = list(self.parametros)
+
+        if self.ordenar_por == 'id':
+            # Paginação por chave: continua a partir do último ID lido
+            if self._ultimo_id is not None:
+                condicoes.append('id < ?' if self.decrescente else 'id > ?')
+                parametros.append(self._ultimo_id)
+            ordem = f'id {direcao}'
+            deslocamento = 0
+        else:
+            ordem = f'{self.ordenar_por} {direcao}, id {direcao}'
+            deslocamento = self._lidos
+
+        sql = SELECT_CLIENTES
+        if condicoes:
+            sql += ' WHERE ' + ' AND '.join(condicoes)
+        sql += f' ORDER BY {ordem} LIMIT ? OFFSET ?'
+        parametros.extend([self.tamanho_pagina, deslocamento])
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, parametros)
+        linhas = cursor.fetchall()
+
+        self._lidos += len(linhas)
+        if linhas:
+            self._ultimo_id = linhas[-1][0]
+        if len(linhas) < self.tamanho_pagina:
+            self.esgotado = True
+        return [_linha_para_tupla(linha) for linha in linhas]
+
 
 class Database:
+    # Ouvintes compartilhados por todas as instâncias do processo, já que cada
+    # diálogo abre a sua própria conexão
+    _ouvintes = []
+
     def __init__(self, db_name='clientes.db'):
+        self.db_name = db_name
         self.conn = sqlite3.connect(db_name)
+        self._notificacoes_suspensas = False
+        self.busca_indexada = False
         self.criar_tabela()
 
+    @classmethod
+    def registrar_ouvinte(cls, ouvinte) -> None:
+        """Registra uma função chamada como ouvinte(evento, cliente_id) após cada gravação."""
+        if ouvinte not in cls._ouvintes:
+            cls._ouvintes.append(ouvinte)
+
+    @classmethod
+    def remover_ouvinte(cls, ouvinte) -> None:
+        if ouvinte in cls._ouvintes:
+            cls._ouvintes.remove(ouvinte)
+
+    def _notificar(self, evento: str, cliente_id: Optional[int] = None) -> None:
+        if self._notificacoes_suspensas:
+            return
+        for ouvinte in list(Database._ouvintes):
+            try:
+                ouvinte(evento, cliente_id)
+            except Exception as e:
+                print(f"Erro ao notificar alteração: {e}")
+
     def criar_tabela(self):
         cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clientes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                telefone TEXT,
-                cpf_cnpj TEXT,
-                email TEXT,
-                periodo_assinatura INTEGER,
-                ultimo_pagamento DATE,
-                vencimento DATE,
-                data_aviso DATE,
-                avisado BOOLEAN,
-                status TEXT,
-                estado TEXT,
-                cidade TEXT,
-                observacao TEXT,
-                comprovante TEXT
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes'")
+        tabela_existente = cursor.fetchone() is not None
+
+        cursor.execute(SQL_CRIAR_TABELA.format(tabela='clientes'))
+
+        if not tabela_existente:
+            # Banco novo já nasce no esquema atual
+            cursor.execute(f'PRAGMA user_version = {ESQUEMA_VERSAO}')
+        else:
+            # Verifica se a coluna 'comprovante' existe
+            cursor.execute("PRAGMA table_info(clientes)")
+            columns = cursor.fetchall()
+            column_names = [column[1] for column in columns]
+
+            if 'comprovante' not in column_names:
+                # Adiciona a coluna 'comprovante' se ela não existir
+                cursor.execute('ALTER TABLE clientes ADD COLUMN comprovante TEXT')
+                self.conn.commit()
+
+            self.migrar_esquema()
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_vencimento ON clientes (vencimento)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_status ON clientes (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_estado ON clientes (estado)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_transicao ON clientes (proxima_transicao)')
+        # Campanhas de aviso: status e janela de vencimento na mesma busca
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_status_vencimento ON clientes (status, vencimento)')
+        for comando in SQL_CRIAR_GATILHOS_TRANSICAO + SQL_CRIAR_COMPROVANTES + SQL_CRIAR_AVISOS_SAIDA:
+            cursor.execute(comando)
+        self.conn.commit()
+
+        self.criar_busca_indexada()
+
+    def criar_busca_indexada(self):
+        """Cria (uma única vez) o índice FTS5 da busca rápida.
+
+        Um índice de versão anterior (sem trigram) é refeito. Se o SQLite não
+        tiver FTS5 com o tokenizador trigram (3.34+), busca_indexada fica False
+        e a busca rápida usa LIKE nas colunas de texto.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'clientes_busca'")
+            linha = cursor.fetchone()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'clientes_busca_pendentes'")
+            existente = linha is not None and 'trigram' in linha[0] and cursor.fetchone() is not None
+            cursor.execute('BEGIN')
+            if linha is not None and not existente:
+                for comando in SQL_REMOVER_BUSCA:
+                    cursor.execute(comando)
+            for comando in SQL_CRIAR_BUSCA:
+                cursor.execute(comando)
+            if not existente:
+                cursor.execute(SQL_POPULAR_BUSCA)
+            self.conn.commit()
+            self.busca_indexada = True
+            self.atualizar_busca_indexada()
+        except sqlite3.OperationalError as e:
+            self.conn.rollback()
+            print(f"Busca indexada indisponível (FTS5): {e}")
+            self.busca_indexada = False
+
+    def atualizar_busca_indexada(self) -> int:
+        """
+        Grava no índice da busca rápida a chave dos clientes anotados pelos gatilhos.
+
+        Returns:
+            int: Quantidade de clientes reindexados
+        """
+        cursor = self.conn.cursor()
+        # Chamado a cada busca: sem pendências, nem abre transação de escrita
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM clientes_busca_pendentes)')
+        if not cursor.fetchone()[0]:
+            return 0
+        try:
+            # IMMEDIATE: nenhuma outra conexão anota clientes entre a leitura e a limpeza
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT c.id, c.nome, c.telefone, c.cpf_cnpj, c.email, c.cidade
+                FROM clientes_busca_pendentes p JOIN clientes c ON c.id = p.id
+            ''')
+            linhas = cursor.fetchall()
+            if linhas:
+                ids = [(linha[0],) for linha in linhas]
+                cursor.executemany('DELETE FROM clientes_busca WHERE rowid = ?', ids)
+                cursor.executemany(
+                    'INSERT INTO clientes_busca (rowid, chave) VALUES (?, ?)',
+                    [(linha[0], chave_busca_cliente(*linha[1:])) for linha in linhas]
+                )
+            cursor.execute('DELETE FROM clientes_busca_pendentes')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao atualizar o índice da busca rápida: {e}")
+            raise
+        return len(linhas)
+
+    def migrar_esquema(self):
+        """Aplica as migrações pendentes de acordo com PRAGMA user_version."""
+        cursor = self.conn.cursor()
+        cursor.execute('PRAGMA user_version')
+        versao = cursor.fetchone()[0]
+
+        if versao < 1:
+            self._migrar_datas_para_dias()
+        if versao < 2:
+            self._migrar_proxima_transicao()
+        if versao < 3:
+            self._migrar_contagem_comprovantes()
+        if versao < 4:
+            self._migrar_recalculo_status()
+
+    def _migrar_datas_para_dias(self):
+        """Reconstrói a tabela com as datas armazenadas como número de dia.
+
+        Os valores legados (ISO, DD/MM/AAAA, 'None') são normalizados, e
+        colunas obsoletas como 'comprovante_hash' são descartadas. Datas que
+        não puderam ser lidas ficam registradas na observação do cliente.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT * FROM clientes')
+            nomes = [descricao[0] for descricao in cursor.description]
+            linhas = cursor.fetchall()
+
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'clientes'")
+            sequencia = cursor.fetchone()
+
+            novas_linhas = []
+            for linha in linhas:
+                registro = dict(zip(nomes, linha))
+                valores = []
+                descartadas = []
+                for coluna in COLUNAS:
+                    valor = registro.get(coluna)
+                    if coluna in ('ultimo_pagamento', 'vencimento', 'data_aviso'):
+                        dia = data_para_dia(valor)
+                        if dia is None and str(valor).strip().lower() not in ('', 'none', 'null'):
+                            print(f"Data inválida descartada (cliente {registro.get('id')}, {coluna}): {valor!r}")
+                            descartadas.append(f'{coluna}: {valor}')
+                        valor = dia
+                    elif coluna == 'comprovante':
+                        # Textos 'None' gravados por versões antigas viram NULL
+                        if not valor or str(valor).strip().lower() in ('none', 'null'):
+                            valor = registro.get('comprovante_hash')
+                        if not valor or str(valor).strip().lower() in ('none', 'null'):
+                            valor = None
+                    valores.append(valor)
+                if descartadas:
+                    # O texto original fica na observação para ser corrigido à mão
+                    posicao = COLUNAS.index('observacao')
+                    nota = 'Data inválida na migração (' + '; '.join(descartadas) + ')'
+                    valores[posicao] = f'{valores[posicao]} | {nota}' if valores[posicao] else nota
+                novas_linhas.append(tuple(valores))
+
+            cursor.execute('DROP TABLE IF EXISTS clientes_nova')
+            cursor.execute(SQL_CRIAR_TABELA.format(tabela='clientes_nova'))
+            placeholders = ', '.join(['?'] * len(COLUNAS))
+            cursor.executemany(
+                f"INSERT INTO clientes_nova ({', '.join(COLUNAS)}) VALUES ({placeholders})",
+                novas_linhas
             )
-        ''')
+            cursor.execute('DROP TABLE clientes')
+            cursor.execute('ALTER TABLE clientes_nova RENAME TO clientes')
+
+            # Preserva o contador do AUTOINCREMENT (IDs de clientes removidos não são reutilizados)
+            if sequencia:
+                cursor.execute(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'clientes'",
+                    (sequencia[0],)
+                )
+
+            cursor.execute('PRAGMA user_version = 1')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao migrar datas: {e}")
+            raise
 
-        # Verifica se a coluna 'comprovante' existe
-        cursor.execute("PRAGMA table_info(clientes)")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
+    def _migrar_proxima_transicao(self):
+        """Adiciona a coluna proxima_transicao e a preenche com um recálculo completo."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            cursor.execute('PRAGMA table_info(clientes)')
+            if 'proxima_transicao' not in [coluna[1] for coluna in cursor.fetchall()]:
+                cursor.execute('ALTER TABLE clientes ADD COLUMN proxima_transicao INTEGER')
+            cursor.execute(
+                f'UPDATE clientes SET status = {SQL_STATUS}, proxima_transicao = {SQL_PROXIMA_TRANSICAO}',
+                {'hoje': hoje_dia(), 'dias': DIAS_EXPIRANDO}
+            )
+            cursor.execute('PRAGMA user_version = 2')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao migrar transições de status: {e}")
+            raise
 
-        if 'comprovante' not in column_names:
-            # Adiciona a coluna 'comprovante' se ela não existir
-            cursor.execute('ALTER TABLE clientes ADD COLUMN comprovante TEXT')
+    def _migrar_contagem_comprovantes(self):
+        """Cria a tabela de referências dos comprovantes a partir dos clientes existentes."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            cursor.execute(SQL_CRIAR_COMPROVANTES[0])
+            cursor.execute(SQL_POPULAR_COMPROVANTES)
+            cursor.execute('PRAGMA user_version = 3')
             self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao migrar comprovantes: {e}")
+            raise
 
+    def _migrar_recalculo_status(self):
+        """Corrige os status gravados por importações de CSV anteriores (vindos do arquivo, sem recálculo)."""
+        self.recalcular_status()
+        self.conn.execute('PRAGMA user_version = 4')
         self.conn.commit()
 
     def adicionar_cliente(self, cliente: Tuple) -> int:
@@ -50,14 +581,117 @@ class Database:
                 status, estado, cidade, observacao, comprovante
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         '''
-        cursor.execute(query, cliente)
+        cursor.execute(query, _datas_para_dias(cliente))
         self.conn.commit()
+        self._notificar(EVENTO_INSERIDO, cursor.lastrowid)
         return cursor.lastrowid
 
     def listar_clientes(self) -> List[Tuple]:
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM clientes')
-        return cursor.fetchall()
+        cursor.execute(SELECT_CLIENTES)
+        return [_linha_para_tupla(linha) for linha in cursor.fetchall()]
+
+    def contar_por_estado(self) -> dict:
+        """Quantidade de clientes por estado (estados vazios são ignorados)."""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT estado, COUNT(*) FROM clientes
+            WHERE estado IS NOT NULL AND estado != ''
+            GROUP BY estado
+            ORDER BY COUNT(*) DESC, estado
+        ''')
+        return dict(cursor.fetchall())
+
+    def relatorio_inadimplencia(self, hoje: Optional[int] = None) -> dict:
+        """
+        Conta os clientes vencidos por faixa de dias em atraso, agregando no SQL.
+
+        Args:
+            hoje (Optional[int]): Número de dia de referência (padrão: hoje)
+
+        Returns:
+            dict: Rótulo da faixa -> quantidade (todas as faixas, em ordem)
+        """
+        if hoje is None:
+            hoje = hoje_dia()
+
+        casos = []
+        for minimo, maximo, rotulo in FAIXAS_INADIMPLENCIA:
+            if maximo is None:
+                casos.append(f"ELSE '{rotulo}'")
+            else:
+                casos.append(f"WHEN :hoje - vencimento <= {maximo} THEN '{rotulo}'")
+
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT CASE {' '.join(casos)} END AS faixa, COUNT(*)
+            FROM clientes
+            WHERE vencimento < :hoje
+            GROUP BY faixa
+        ''', {'hoje': hoje})
+        contagem = dict(cursor.fetchall())
+        return {rotulo: contagem.get(rotulo, 0) for _, _, rotulo in FAIXAS_INADIMPLENCIA}
+
+    def previsao_renovacoes(self, hoje: Optional[int] = None, meses: int = 12) -> dict:
+        """
+        Prevê quantas renovações vencem em cada mês, a partir do mês atual.
+
+        Cada cliente em dia renova em vencimento + k * (periodo_assinatura * 30)
+        dias; os ciclos são gerados por uma CTE recursiva e agregados por mês
+        no próprio SQL. Clientes já vencidos ficam no relatório de inadimplência.
+
+        Args:
+            hoje (Optional[int]): Número de dia de referência (padrão: hoje)
+            meses (int): Quantidade de meses previstos
+
+        Returns:
+            dict: 'MM/AAAA' -> quantidade de renovações (todos os meses, em ordem)
+        """
+        if hoje is None:
+            hoje = hoje_dia()
+
+        # Primeiro dia de cada mês do período (e do mês seguinte ao último)
+        atual = dia_para_data(hoje)
+        inicios = []
+        ano, mes = atual.year, atual.month
+        for _ in range(meses + 1):
+            inicios.append(date(ano, mes, 1))
+            ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+        fim = inicios[-1].toordinal() - 1
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            WITH RECURSIVE renovacoes (dia, ciclo) AS (
+                SELECT vencimento, periodo_assinatura * 30
+                FROM clientes
+                WHERE vencimento BETWEEN :hoje AND :fim AND periodo_assinatura > 0
+                UNION ALL
+                SELECT dia + ciclo, ciclo FROM renovacoes WHERE dia + ciclo <= :fim
+            )
+            SELECT strftime('%Y-%m', dia + :juliano) AS mes, COUNT(*)
+            FROM renovacoes
+            GROUP BY mes
+        ''', {'hoje': hoje, 'fim': fim, 'juliano': SQL_DIA_JULIANO})
+        contagem = dict(cursor.fetchall())
+        return {
+            inicio.strftime('%m/%Y'): contagem.get(inicio.strftime('%Y-%m'), 0)
+            for inicio in inicios[:-1]
+        }
+
+    def contar_por_municipio(self) -> dict:
+        """Quantidade de clientes por município, rotulado como 'Município (UF)'."""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT cidade, estado, COUNT(*) FROM clientes
+            WHERE cidade IS NOT NULL AND cidade != ''
+            GROUP BY cidade, estado
+            ORDER BY COUNT(*) DESC, cidade
+        ''')
+        contagem = {}
+        for cidade, estado, quantidade in cursor.fetchall():
+            rotulo = f"{cidade} ({estado})"
+            contagem[rotulo] = contagem.get(rotulo, 0) + quantidade
+        return contagem
 
     def atualizar_cliente(self, cliente):
         try:
@@ -84,8 +718,9 @@ class Database:
         WHERE id = ?
         """
             cursor = self.conn.cursor()
-            cursor.execute(query, cliente)
+            cursor.execute(query, _datas_para_dias(cliente))
             self.conn.commit()
+            self._notificar(EVENTO_ATUALIZADO, cliente[-1])
 
         except sqlite3.Error as e:
             self.conn.rollback()
@@ -100,6 +735,121 @@ class Database:
         cursor = self.conn.cursor()
         cursor.execute('DELETE FROM clientes WHERE id = ?', (cliente_id,))
         self.conn.commit()
+        self._notificar(EVENTO_REMOVIDO, cliente_id)
+
+    def referencias_comprovante(self, arquivo: str) -> int:
+        """Quantidade de clientes que usam o arquivo de comprovante."""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT referencias FROM comprovantes WHERE arquivo = ?', (arquivo,))
+        linha = cursor.fetchone()
+        return linha[0] if linha else 0
+
+    def remover_registro_comprovante(self, arquivo: str) -> bool:
+        """Apaga o registro do comprovante se ninguém mais o referencia.
+
+        Returns:
+            bool: True se o registro foi apagado (o arquivo pode ser excluído)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM comprovantes WHERE arquivo = ? AND referencias <= 0', (arquivo,))
+        self.conn.commit()
+        return self.referencias_comprovante(arquivo) == 0
+
+    def indice_documentos(self) -> dict:
+        """
+        Índice dos clientes pelo CPF/CNPJ (só dígitos), montado em uma única consulta.
+
+        Returns:
+            dict: Dígitos do documento -> lista de IDs (mais de um se o documento se repete)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {_sql_digitos('cpf_cnpj')}, id FROM clientes "
+                       "WHERE cpf_cnpj IS NOT NULL AND cpf_cnpj != ''")
+        indice = {}
+        for documento, cliente_id in cursor:
+            indice.setdefault(documento, []).append(cliente_id)
+        return indice
+
+    def atribuir_comprovantes(self, atribuicoes: dict) -> dict:
+        """
+        Grava o comprovante de vários clientes em uma única transação.
+
+        Args:
+            atribuicoes (dict): ID do cliente -> nome do arquivo do comprovante
+
+        Returns:
+            dict: ID do cliente -> comprovante que ele tinha antes (para liberar)
+        """
+        if not atribuicoes:
+            return {}
+        anteriores = {}
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            for cliente_id, arquivo in atribuicoes.items():
+                cursor.execute('SELECT comprovante FROM clientes WHERE id = ?', (cliente_id,))
+                linha = cursor.fetchone()
+                if linha is None:
+                    continue
+                anteriores[cliente_id] = linha[0]
+                cursor.execute('UPDATE clientes SET comprovante = ? WHERE id = ?', (arquivo, cliente_id))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao gravar comprovantes: {e}")
+            raise
+
+        if len(anteriores) > LIMITE_NOTIFICACOES_INDIVIDUAIS:
+            self._notificar(EVENTO_RECARREGADO)
+        else:
+            for cliente_id in anteriores:
+                self._notificar(EVENTO_ATUALIZADO, cliente_id)
+        return anteriores
+
+    def iterar_comprovantes_referenciados(self):
+        """Gera os nomes dos arquivos de comprovante em uso, lidos aos poucos do cursor."""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT arquivo FROM comprovantes WHERE referencias > 0')
+        for (arquivo,) in cursor:
+            yield arquivo
+
+    def renomear_comprovante(self, antigo: str, novo: str) -> int:
+        """
+        Troca o arquivo de comprovante de todos os clientes que usam 'antigo'.
+
+        Returns:
+            int: Quantidade de clientes atualizados
+        """
+        return self.renomear_comprovantes({antigo: novo})
+
+    def renomear_comprovantes(self, renomeacoes: dict) -> int:
+        """
+        Troca vários arquivos de comprovante em uma única transação.
+
+        Args:
+            renomeacoes (dict): Nome antigo -> nome novo
+
+        Returns:
+            int: Quantidade de clientes atualizados
+        """
+        if not renomeacoes:
+            return 0
+        alterados = 0
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            for antigo, novo in renomeacoes.items():
+                cursor.execute('UPDATE clientes SET comprovante = ? WHERE comprovante = ?', (novo, antigo))
+                alterados += cursor.rowcount
+                cursor.execute('DELETE FROM comprovantes WHERE arquivo = ? AND referencias <= 0', (antigo,))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao renomear comprovantes: {e}")
+            raise
+        if alterados:
+            self._notificar(EVENTO_RECARREGADO)
+        return alterados
 
     def fechar_conexao(self):
         self.conn.close()
@@ -112,45 +862,194 @@ class Database:
             WHERE id = ?
         ''', (novo_status, cliente_id))
         self.conn.commit()
+        self._notificar(EVENTO_ATUALIZADO, cliente_id)
 
-    def pesquisar_clientes(self, criterio: str, valores: list) -> List[Tuple]:
+    def recalcular_status(self, hoje: Optional[int] = None) -> None:
+        """Recalcula o status de todos os clientes com uma única comparação inteira no SQL.
+
+        Args:
+            hoje (Optional[int]): Número de dia de referência (padrão: hoje)
+        """
+        if hoje is None:
+            hoje = hoje_dia()
         cursor = self.conn.cursor()
+        cursor.execute(
+            f'UPDATE clientes SET status = {SQL_STATUS}, proxima_transicao = {SQL_PROXIMA_TRANSICAO}',
+            {'hoje': hoje, 'dias': DIAS_EXPIRANDO}
+        )
+        self.conn.commit()
+        self._notificar(EVENTO_RECARREGADO)
 
-        mapeamento = {
-            'Nome': 'nome',
-            'Telefone': 'telefone',
-            'CPF/CNPJ': 'cpf_cnpj',
-            'E-mail': 'email',
-            'Vencimento (DD/MM/AAAA)': 'vencimento',
-            'Status': 'status',
-            'Estado': 'estado'
-        }
+    def atualizar_transicoes(self, hoje: Optional[int] = None) -> List[int]:
+        """Atualiza o status apenas dos clientes cuja próxima transição já chegou.
 
-        coluna = mapeamento.get(criterio)
-        if not coluna or not valores:
-            return []
+        Usa o índice de proxima_transicao, então o custo é proporcional aos
+        clientes que mudam de faixa, não ao total de clientes.
+
+        Args:
+            hoje (Optional[int]): Número de dia de referência (padrão: hoje)
 
+        Returns:
+            List[int]: IDs dos clientes cujo status mudou
+        """
+        if hoje is None:
+            hoje = hoje_dia()
+        cursor = self.conn.cursor()
         try:
-            # Busca parcial para textos
-            if criterio in ['Nome', 'Telefone', 'CPF/CNPJ', 'E-mail']:
-                query = f"SELECT * FROM clientes WHERE {coluna} LIKE ?"
-                cursor.execute(query, (f'%{valores[0]}%',))
+            cursor.execute('BEGIN')
+            cursor.execute(
+                'SELECT id, vencimento, status FROM clientes WHERE proxima_transicao <= ?',
+                (hoje,)
+            )
+            alteracoes = []
+            alterados = []
+            for cliente_id, vencimento, status in cursor.fetchall():
+                novo_status = 'Data inválida' if vencimento is None else status_por_dias(vencimento - hoje)
+                alteracoes.append((novo_status, proxima_transicao(vencimento, hoje), cliente_id))
+                if novo_status != status:
+                    alterados.append(cliente_id)
+            cursor.executemany(
+                'UPDATE clientes SET status = ?, proxima_transicao = ? WHERE id = ?',
+                alteracoes
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao atualizar transições de status: {e}")
+            raise
 
-            # Data exata
-            elif criterio == 'Vencimento (DD/MM/AAAA)':
-                data = datetime.strptime(valores[0], "%d/%m/%Y").strftime("%Y-%m-%d")
-                cursor.execute(f"SELECT * FROM clientes WHERE {coluna} = ?", (data,))
+        if len(alterados) > LIMITE_NOTIFICACOES_INDIVIDUAIS:
+            self._notificar(EVENTO_RECARREGADO)
+        else:
+            for cliente_id in alterados:
+                self._notificar(EVENTO_ATUALIZADO, cliente_id)
+        return alterados
 
-            # Seleção múltipla
-            else:
-                placeholders = ','.join(['?'] * len(valores))
-                cursor.execute(f"SELECT * FROM clientes WHERE {coluna} IN ({placeholders})", valores)
+    def consulta_busca_rapida(self, texto: str) -> ConsultaClientes:
+        """
+        Monta a consulta do filtro rápido (nome, telefone, CPF/CNPJ, e-mail ou município).
+
+        Args:
+            texto (str): Texto digitado pelo usuário
 
-            return cursor.fetchall()
+        Returns:
+            ConsultaClientes: Busca no índice FTS5 ou, sem ele, LIKE nas colunas de texto
+        """
+        if self.busca_indexada:
+            self.atualizar_busca_indexada()
+            return ConsultaClientes().adicionar('Busca rápida', [texto])
 
-        except Exception as e:
-            print(f"Erro na pesquisa: {e}")
-            return []
+        consulta = ConsultaClientes()
+        for criterio in ('Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Municipio'):
+            consulta.adicionar(criterio, [texto], 'OR')
+        return consulta
+
+    def contar_clientes(self, consulta: Optional[ConsultaClientes] = None) -> int:
+        """Quantidade de clientes (opcionalmente restrita aos critérios da consulta)."""
+        filtro, parametros = consulta.montar_filtro() if consulta else ('', [])
+        sql = 'SELECT COUNT(*) FROM clientes'
+        if filtro:
+            sql += ' WHERE ' + filtro
+        cursor = self.conn.cursor()
+        cursor.execute(sql, parametros)
+        return cursor.fetchone()[0]
+
+    def paginar_clientes(self, consulta: Optional[ConsultaClientes] = None, ordenar_por: str = 'id',
+                         decrescente: bool = False, tamanho_pagina: int = 500) -> PaginadorClientes:
+        """
+        Cria um paginador sobre os clientes (opcionalmente filtrados).
+
+        Args:
+            consulta (Optional[ConsultaClientes]): Critérios de filtro
+            ordenar_por (str): Nome da coluna de ordenação (uma de COLUNAS)
+            decrescente (bool): Ordem decrescente
+            tamanho_pagina (int): Quantidade de clientes por página
+
+        Returns:
+            PaginadorClientes: Paginador posicionado na primeira página
+        """
+        filtro, parametros = consulta.montar_filtro() if consulta else ('', [])
+        return PaginadorClientes(self.conn, filtro, parametros, ordenar_por, decrescente, tamanho_pagina)
+
+    def pesquisar_por_vencimento(self, inicio: int, fim: int) -> List[Tuple]:
+        """
+        Busca clientes com vencimento no intervalo fechado [inicio, fim].
+
+        A consulta percorre apenas o trecho correspondente do índice
+        idx_clientes_vencimento e já retorna os clientes ordenados por vencimento.
+
+        Args:
+            inicio (int): Primeiro dia do intervalo (número de dia)
+            fim (int): Último dia do intervalo (número de dia)
+
+        Returns:
+            List[Tuple]: Clientes encontrados, do vencimento mais próximo ao mais distante
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"{SELECT_CLIENTES} WHERE vencimento BETWEEN ? AND ? ORDER BY vencimento, id",
+            (inicio, fim)
+        )
+        return [_linha_para_tupla(linha) for linha in cursor.fetchall()]
+
+    def selecionar_campanha(self, status: Optional[list] = None, inicio: Optional[int] = None,
+                            fim: Optional[int] = None, somente_nao_avisados: bool = True) -> List[Tuple]:
+        """
+        Seleciona os clientes de uma campanha de aviso em uma única consulta.
+
+        Com status, a busca percorre idx_clientes_status_vencimento (um trecho
+        por status, já limitado à janela de vencimento); só com a janela, usa
+        idx_clientes_vencimento.
+
+        Args:
+            status (Optional[list]): Status aceitos (None: qualquer status)
+            inicio (Optional[int]): Primeiro dia da janela de vencimento (número de dia)
+            fim (Optional[int]): Último dia da janela de vencimento (número de dia)
+            somente_nao_avisados (bool): Ignora os clientes já marcados como avisados
+
+        Returns:
+            List[Tuple]: Clientes encontrados, do vencimento mais antigo ao mais distante
+        """
+        condicoes = []
+        parametros = []
+        if status:
+            condicoes.append(f"status IN ({', '.join(['?'] * len(status))})")
+            parametros.extend(status)
+        if inicio is not None:
+            condicoes.append('vencimento >= ?')
+            parametros.append(inicio)
+        if fim is not None:
+            condicoes.append('vencimento <= ?')
+            parametros.append(fim)
+        if somente_nao_avisados:
+            condicoes.append('COALESCE(avisado, 0) = 0')
+
+        sql = SELECT_CLIENTES
+        if condicoes:
+            sql += ' WHERE ' + ' AND '.join(condicoes)
+        cursor = self.conn.cursor()
+        cursor.execute(sql + ' ORDER BY vencimento, id', parametros)
+        return [_linha_para_tupla(linha) for linha in cursor.fetchall()]
+
+    def obter_cliente_tupla(self, cliente_id: int, consulta: Optional[ConsultaClientes] = None) -> Optional[Tuple]:
+        """
+        Obtém um cliente como tupla (mesmo formato de listar_clientes).
+
+        Args:
+            cliente_id (int): ID do cliente
+            consulta (Optional[ConsultaClientes]): Se informada, o cliente só é
+                retornado quando também atende aos critérios da consulta
+
+        Returns:
+            Optional[Tuple]: Tupla do cliente ou None
+        """
+        filtro, parametros = consulta.montar_filtro() if consulta else ('', [])
+        sql = f'{SELECT_CLIENTES} WHERE id = ?'
+        if filtro:
+            sql += f' AND ({filtro})'
+        cursor = self.conn.cursor()
+        cursor.execute(sql, [cliente_id] + parametros)
+        return _linha_para_tupla(cursor.fetchone())
 
     def obter_cliente_por_id(self, cliente_id: int) -> Optional[dict]:
         """
@@ -164,18 +1063,14 @@ class Database:
         """
         try:
             cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM clientes WHERE id = ?', (cliente_id,))
-            cliente_tupla = cursor.fetchone()
+            cursor.execute(f'{SELECT_CLIENTES} WHERE id = ?', (cliente_id,))
+            cliente_tupla = _linha_para_tupla(cursor.fetchone())
 
             if not cliente_tupla:
                 return None
 
-            # Obter os nomes das colunas da tabela
-            cursor.execute("PRAGMA table_info(clientes)")
-            colunas = [info[1] for info in cursor.fetchall()]
-
             # Criar um dicionário mapeando cada nome de coluna ao valor correspondente
-            cliente_dict = {colunas[i]: cliente_tupla[i] for i in range(len(colunas))}
+            cliente_dict = dict(zip(COLUNAS, cliente_tupla))
 
             return cliente_dict
         except sqlite3.Error as e:
@@ -187,12 +1082,168 @@ class Database:
         try:
             cursor = self.conn.cursor()
             sql = "UPDATE clientes SET data_aviso = ?, avisado = ? WHERE id = ?"
-            cursor.execute(sql, (data_aviso, avisado, cliente_id))
+            cursor.execute(sql, (data_para_dia(data_aviso), avisado, cliente_id))
             self.conn.commit()
+            self._notificar(EVENTO_ATUALIZADO, cliente_id)
         except Exception as e:
             print("Erro ao atualizar aviso:", e)
             raise
 
+    def enfileirar_avisos(self, avisos: list, agora: Optional[float] = None) -> List[int]:
+        """
+        Grava avisos na caixa de saída em uma única transação.
+
+        Args:
+            avisos (list): [(cliente_id, telefone, mensagem)]
+            agora (Optional[float]): Instante de referência (padrão: time.time())
+
+        Returns:
+            List[int]: IDs dos avisos, na ordem recebida
+        """
+        agora = time.time() if agora is None else agora
+        ids = []
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            for cliente_id, telefone, mensagem in avisos:
+                cursor.execute(
+                    'INSERT INTO avisos_saida (cliente_id, telefone, mensagem, estado, proxima_tentativa, criado_em) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (cliente_id, telefone, mensagem, AVISO_PENDENTE, agora, agora)
+                )
+                ids.append(cursor.lastrowid)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao enfileirar avisos: {e}")
+            raise
+        return ids
+
+    def reservar_avisos(self, limite: int, agora: Optional[float] = None) -> List[Tuple]:
+        """
+        Reserva para envio os próximos avisos da fila.
+
+        Entram os pendentes cuja próxima tentativa já chegou e os reservados
+        há mais de PRAZO_RESERVA_AVISO (envio interrompido). A reserva é
+        feita com BEGIN IMMEDIATE, então dois despachantes não pegam o mesmo aviso.
+
+        Args:
+            limite (int): Quantidade máxima de avisos
+            agora (Optional[float]): Instante de referência (padrão: time.time())
+
+        Returns:
+            List[Tuple]: [(id, cliente_id, telefone, mensagem, tentativas)]
+        """
+        agora = time.time() if agora is None else agora
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(
+                'SELECT id, cliente_id, telefone, mensagem, tentativas FROM avisos_saida '
+                'WHERE estado IN (?, ?) AND proxima_tentativa <= ? ORDER BY proxima_tentativa, id LIMIT ?',
+                (AVISO_PENDENTE, AVISO_ENVIANDO, agora, limite)
+            )
+            reservados = cursor.fetchall()
+            # Enquanto reservado, proxima_tentativa marca o fim do prazo da reserva
+            cursor.executemany(
+                'UPDATE avisos_saida SET estado = ?, proxima_tentativa = ? WHERE id = ?',
+                [(AVISO_ENVIANDO, agora + PRAZO_RESERVA_AVISO, aviso[0]) for aviso in reservados]
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao reservar avisos: {e}")
+            raise
+        return reservados
+
+    def registrar_entregas(self, resultados: list, agora: Optional[float] = None) -> None:
+        """
+        Grava o resultado dos envios de um lote em uma única transação.
+
+        Avisos entregues marcam o cliente como avisado na data do envio; os que
+        falharam voltam para a fila (ou desistem) conforme o estado informado.
+
+        Args:
+            resultados (list): [(aviso_id, cliente_id, estado, erro, proxima_tentativa)],
+                com estado AVISO_ENVIADO, AVISO_PENDENTE (nova tentativa) ou AVISO_FALHOU
+            agora (Optional[float]): Instante do envio (padrão: time.time())
+        """
+        if not resultados:
+            return
+        agora = time.time() if agora is None else agora
+        entregues = [cliente_id for _, cliente_id, estado, _, _ in resultados if estado == AVISO_ENVIADO]
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            cursor.executemany(
+                'UPDATE avisos_saida SET estado = ?, erro = ?, tentativas = tentativas + 1, '
+                'proxima_tentativa = COALESCE(?, proxima_tentativa), '
+                'enviado_em = CASE WHEN ? = ? THEN ? ELSE enviado_em END '
+                'WHERE id = ? AND estado = ?',
+                [(estado, erro, proxima, estado, AVISO_ENVIADO, agora, aviso_id, AVISO_ENVIANDO)
+                 for aviso_id, _, estado, erro, proxima in resultados]
+            )
+            dia = date.fromtimestamp(agora).toordinal()
+            cursor.executemany('UPDATE clientes SET data_aviso = ?, avisado = 1 WHERE id = ?',
+                               [(dia, cliente_id) for cliente_id in entregues])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao registrar entregas: {e}")
+            raise
+
+        if len(entregues) > LIMITE_NOTIFICACOES_INDIVIDUAIS:
+            self._notificar(EVENTO_RECARREGADO)
+        else:
+            for cliente_id in entregues:
+                self._notificar(EVENTO_ATUALIZADO, cliente_id)
+
+    def devolver_avisos(self, aviso_ids: list) -> None:
+        """Devolve à fila, sem contar tentativa, avisos reservados que não chegaram a ser enviados."""
+        cursor = self.conn.cursor()
+        # Voltam para a frente da fila, de onde saíram
+        cursor.executemany(
+            'UPDATE avisos_saida SET estado = ?, proxima_tentativa = 0 WHERE id = ? AND estado = ?',
+            [(AVISO_PENDENTE, aviso_id, AVISO_ENVIANDO) for aviso_id in aviso_ids]
+        )
+        self.conn.commit()
+
+    def cancelar_avisos(self, aviso_ids: list) -> List[int]:
+        """
+        Cancela os avisos que ainda estão na fila (os já reservados seguem o envio).
+
+        Returns:
+            List[int]: IDs dos avisos cancelados
+        """
+        cancelados = []
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            for aviso_id in aviso_ids:
+                cursor.execute('UPDATE avisos_saida SET estado = ? WHERE id = ? AND estado = ?',
+                               (AVISO_CANCELADO, aviso_id, AVISO_PENDENTE))
+                if cursor.rowcount:
+                    cancelados.append(aviso_id)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Erro ao cancelar avisos: {e}")
+            raise
+        return cancelados
+
+    def proxima_tentativa_aviso(self) -> Optional[float]:
+        """Instante do próximo aviso a enviar (inclusive reservas vencidas) ou None se a fila está vazia."""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT MIN(proxima_tentativa) FROM avisos_saida WHERE estado IN (?, ?)',
+                       (AVISO_PENDENTE, AVISO_ENVIANDO))
+        return cursor.fetchone()[0]
+
+    def contar_avisos_saida(self) -> dict:
+        """Quantidade de avisos na caixa de saída por estado."""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT estado, COUNT(*) FROM avisos_saida GROUP BY estado')
+        return dict(cursor.fetchall())
+
     def importar_csv(self, arquivo_csv: str) -> tuple[int, int]:
         """Importa dados de um arquivo CSV para o banco de dados.
 
@@ -204,67 +1255,85 @@ class Database:
         """
         from datetime import datetime
         import csv
-        from utils.validators import validar_cpf_cnpj, validar_email
+        from itertools import islice
+        from utils.validators import validar_cpf_cnpj_lote, validar_email_lote
 
         registros_importados = 0
         registros_falhos = 0
 
+        # Uma única notificação ao final, em vez de uma por linha importada
+        self._notificacoes_suspensas = True
         try:
             with open(arquivo_csv, 'r', encoding='utf-8') as file:
                 leitor_csv = csv.DictReader(file)
-                
-                for linha in leitor_csv:
-                    try:
-                        # Validações básicas
-                        if not linha['nome'].strip():
-                            raise ValueError('Nome é obrigatório')
-                        
-                        # Permitir CPF/CNPJ vazio ou validar se preenchido
-                        if linha['cpf_cnpj']:
-                            cpf_cnpj_limpo = ''.join(filter(str.isdigit, linha['cpf_cnpj']))
-                            if not validar_cpf_cnpj(cpf_cnpj_limpo):
+
+                while True:
+                    bloco = list(islice(leitor_csv, LINHAS_POR_BLOCO_IMPORTACAO))
+                    if not bloco:
+                        break
+                    # CPF/CNPJ e e-mails do bloco inteiro validados de uma vez
+                    documentos_validos = validar_cpf_cnpj_lote([linha.get('cpf_cnpj') for linha in bloco])
+                    emails_validos = validar_email_lote([linha.get('email') for linha in bloco])
+
+                    for linha, documento_valido, email_valido in zip(bloco, documentos_validos, emails_validos):
+                        try:
+                            # Validações básicas
+                            if not linha['nome'].strip():
+                                raise ValueError('Nome é obrigatório')
+
+                            # Permitir CPF/CNPJ vazio ou validar se preenchido
+                            if linha['cpf_cnpj'] and not documento_valido:
                                 raise ValueError(f'CPF/CNPJ inválido: {linha["cpf_cnpj"]}')
-                        
-                        if linha['email'] and not validar_email(linha['email']):
-                            raise ValueError('E-mail inválido')
-
-                        # Conversão de datas
-                        ultimo_pagamento = datetime.strptime(linha['ultimo_pagamento'], '%Y-%m-%d').date() if linha['ultimo_pagamento'] else None
-                        vencimento = datetime.strptime(linha['vencimento'], '%Y-%m-%d').date() if linha['vencimento'] else None
-                        data_aviso = datetime.strptime(linha['data_aviso'], '%Y-%m-%d').date() if linha['data_aviso'] else None
-
-                        # Mapeamento de status
-                        status = linha['status']
-                        if status == 'Ativo':
-                            status = 'Em dia'
-
-                        # Preparação dos dados para inserção
-                        cliente = (
-                            linha['nome'],
-                            linha['telefone'],
-                            linha['cpf_cnpj'],
-                            linha['email'],
-                            int(linha['periodo_assinatura']) if linha['periodo_assinatura'] else 0,
-                            ultimo_pagamento.strftime('%Y-%m-%d') if ultimo_pagamento else None,
-                            vencimento.strftime('%Y-%m-%d') if vencimento else None,
-                            data_aviso.strftime('%Y-%m-%d') if data_aviso else None,
-                            bool(int(linha['avisado'])) if linha['avisado'] else False,
-                            status,
-                            linha['estado'],
-                            linha['cidade'],
-                            linha['observacao'],
-                            linha['comprovante']
-                        )
-
-                        self.adicionar_cliente(cliente)
-                        registros_importados += 1
-
-                    except Exception as e:
-                        print(f'Erro ao importar linha: {e}')
-                        registros_falhos += 1
+
+                            if linha['email'] and not email_valido:
+                                raise ValueError('E-mail inválido')
+
+                            # Conversão de datas
+                            ultimo_pagamento = datetime.strptime(linha['ultimo_pagamento'], '%Y-%m-%d').date() if linha['ultimo_pagamento'] else None
+                            vencimento = datetime.strptime(linha['vencimento'], '%Y-%m-%d').date() if linha['vencimento'] else None
+                            data_aviso = datetime.strptime(linha['data_aviso'], '%Y-%m-%d').date() if linha['data_aviso'] else None
+
+                            # Mapeamento de status
+                            status = linha['status']
+                            if status == 'Ativo':
+                                status = 'Em dia'
+
+                            # Preparação dos dados para inserção
+                            cliente = (
+                                linha['nome'],
+                                linha['telefone'],
+                                linha['cpf_cnpj'],
+                                linha['email'],
+                                int(linha['periodo_assinatura']) if linha['periodo_assinatura'] else 0,
+                                ultimo_pagamento.strftime('%Y-%m-%d') if ultimo_pagamento else None,
+                                vencimento.strftime('%Y-%m-%d') if vencimento else None,
+                                data_aviso.strftime('%Y-%m-%d') if data_aviso else None,
+                                bool(int(linha['avisado'])) if linha['avisado'] else False,
+                                status,
+                                linha['estado'],
+                                linha['cidade'],
+                                linha['observacao'],
+                                linha['comprovante']
+                            )
+
+                            self.adicionar_cliente(cliente)
+                            registros_importados += 1
+
+                        except Exception as e:
+                            print(f'Erro ao importar linha: {e}')
+                            registros_falhos += 1
+
+            # O status do CSV pode não corresponder ao vencimento (e as linhas sem
+            # vencimento não passam pela verificação de transições): recalcula tudo
+            if registros_importados:
+                self.recalcular_status()
 
             return registros_importados, registros_falhos
 
         except Exception as e:
             print(f'Erro ao abrir arquivo CSV: {e}')
             raise
+        finally:
+            self._notificacoes_suspensas = False
+            if registros_importados:
+                self._notificar(EVENTO_RECARREGADO)
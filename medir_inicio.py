@@ -0,0 +1,90 @@
+# medir_inicio.py
+"""Mede a inicialização da janela principal em relação ao orçamento.
+
+A janela é aberta sobre uma cópia temporária do banco e da pasta de
+comprovantes: as migrações, a organização em subpastas, a coleta de órfãos e
+o envio de avisos feitos na abertura nunca tocam os dados reais.
+
+Uso:
+    python medir_inicio.py [--banco clientes.db] [--pasta PASTA_COMPROVANTES] [--sem-comprovantes]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import QApplication
+
+from utils.directory_helper import VARIAVEL_PASTA_COMPROVANTES, ensure_comprovantes_dir, get_resource_path
+
+PASTA_ICONES = 'icones'
+
+
+def preparar_copia(banco: str, pasta: str, destino: str, com_comprovantes: bool = True) -> None:
+    """
+    Copia o banco, os comprovantes e os ícones para a pasta temporária.
+
+    A caixa de saída da cópia é esvaziada: a medição não envia avisos.
+    Sem banco de origem, a janela abre sobre um banco novo (vazio).
+    """
+    if os.path.exists(banco):
+        copia_banco = os.path.join(destino, 'clientes.db')
+        # backup() também leva o que ainda estiver no WAL do banco de origem
+        origem = sqlite3.connect(f'file:{banco}?mode=ro', uri=True)
+        copia = sqlite3.connect(copia_banco)
+        try:
+            origem.backup(copia)
+            if copia.execute("SELECT 1 FROM sqlite_master WHERE name = 'avisos_saida'").fetchone():
+                copia.execute('DELETE FROM avisos_saida')
+                copia.commit()
+        finally:
+            copia.close()
+            origem.close()
+
+    pasta_copia = os.path.join(destino, 'comprovantes')
+    if com_comprovantes and os.path.isdir(pasta):
+        shutil.copytree(pasta, pasta_copia)
+    else:
+        os.makedirs(pasta_copia)
+
+    # Os ícones são lidos em relação à pasta atual
+    icones = get_resource_path(PASTA_ICONES)
+    if os.path.isdir(icones):
+        shutil.copytree(icones, os.path.join(destino, PASTA_ICONES))
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Mede a inicialização da janela principal.')
+    parser.add_argument('--banco', default='clientes.db', help='Banco de dados copiado para a medição (padrão: clientes.db)')
+    parser.add_argument('--pasta', default=None, help='Pasta dos comprovantes copiada (padrão: a da aplicação)')
+    parser.add_argument('--sem-comprovantes', action='store_true',
+                        help='Mede com a pasta de comprovantes vazia (não copia o acervo)')
+    args = parser.parse_args(argumentos)
+
+    banco = os.path.abspath(args.banco)
+    pasta = os.path.abspath(args.pasta or ensure_comprovantes_dir())
+    diretorio_atual = os.getcwd()
+
+    temporario = tempfile.mkdtemp(prefix='climaterra-inicio-')
+    try:
+        preparar_copia(banco, pasta, temporario, not args.sem_comprovantes)
+        # A aplicação abre 'clientes.db' na pasta atual e os comprovantes na pasta da variável
+        os.environ[VARIAVEL_PASTA_COMPROVANTES] = os.path.join(temporario, 'comprovantes')
+        os.chdir(temporario)
+
+        from utils.startup_timing import executar_medicao
+        app = QApplication(sys.argv[:1])
+        resultado = executar_medicao(app)
+        # Tarefas iniciadas na abertura (miniaturas, coleta) ainda podem estar usando a cópia
+        QThreadPool.globalInstance().waitForDone()
+        return resultado
+    finally:
+        os.chdir(diretorio_atual)
+        shutil.rmtree(temporario, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# relatorios.py
+"""Geração dos relatórios sem interface gráfica (ex.: tarefa agendada no servidor).
+
+Uso:
+    python relatorios.py --banco clientes.db --saida relatorios --formatos png,pdf
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from database.database import Database
+from utils.chart_renderer import RELATORIOS, dados_relatorio
+
+FORMATOS_SUPORTADOS = ('png', 'pdf', 'svg')
+
+
+def _renderizar_relatorio(nome: str, dados: dict, pasta: str, formatos: tuple) -> list:
+    """Desenha um relatório e o salva em cada formato (executado em processo separado)."""
+    from utils.chart_renderer import criar_figura
+
+    _, tipo, titulo, _ = RELATORIOS[nome]
+    figura = criar_figura(tipo, dados, titulo)
+    arquivos = []
+    for formato in formatos:
+        caminho = os.path.join(pasta, f'{nome}.{formato}')
+        figura.savefig(caminho, format=formato, bbox_inches='tight', dpi=100)
+        arquivos.append(caminho)
+    return arquivos
+
+
+def _salvar_csv(caminho: str, dados: dict) -> None:
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(['categoria', 'quantidade'])
+        escritor.writerows(dados.items())
+
+
+def gerar_relatorios(banco: str, pasta: str, nomes: list, formatos: tuple, processos: int) -> int:
+    """
+    Agrega os dados no banco e renderiza os gráficos em paralelo.
+
+    Args:
+        banco (str): Caminho do banco SQLite
+        pasta (str): Pasta de saída (criada se necessário)
+        nomes (list): Relatórios a gerar (chaves de RELATORIOS)
+        formatos (tuple): Formatos dos gráficos
+        processos (int): Quantidade máxima de processos de renderização
+
+    Returns:
+        int: Quantidade de relatórios que falharam
+    """
+    os.makedirs(pasta, exist_ok=True)
+
+    # As consultas são rápidas e usam uma única conexão; só o desenho é paralelizado
+    database = Database(banco)
+    try:
+        agregados = {}
+        for nome in nomes:
+            metodo = RELATORIOS[nome][0]
+            # CSV com todas as categorias; o gráfico usa as agrupadas
+            _salvar_csv(os.path.join(pasta, f'{nome}.csv'), getattr(database, metodo)())
+            agregados[nome] = dados_relatorio(database, nome)
+    finally:
+        database.fechar_conexao()
+
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        tarefas = {}
+        for nome, dados in agregados.items():
+            if not dados:
+                print(f'{nome}: sem dados, gráfico não gerado')
+                continue
+            tarefas[executor.submit(_renderizar_relatorio, nome, dados, pasta, formatos)] = nome
+
+        for tarefa in as_completed(tarefas):
+            nome = tarefas[tarefa]
+            try:
+                for caminho in tarefa.result():
+                    print(f'{nome}: {caminho}')
+            except Exception as e:
+                print(f'Erro ao gerar relatório {nome}: {e}')
+                falhas += 1
+    return falhas
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Gera os relatórios de clientes sem abrir a interface.')
+    parser.add_argument('--banco', default='clientes.db', help='Banco de dados SQLite (padrão: clientes.db)')
+    parser.add_argument('--saida', default=os.path.join('relatorios', date.today().isoformat()),
+                        help='Pasta de saída (padrão: relatorios/AAAA-MM-DD)')
+    parser.add_argument('--formatos', default='png,pdf',
+                        help=f"Formatos separados por vírgula ({', '.join(FORMATOS_SUPORTADOS)})")
+    parser.add_argument('--relatorios', default=','.join(RELATORIOS),
+                        help=f"Relatórios separados por vírgula ({', '.join(RELATORIOS)})")
+    parser.add_argument('--processos', type=int, default=None,
+                        help='Processos de renderização (padrão: um por relatório, até o número de CPUs)')
+    args = parser.parse_args(argumentos)
+
+    formatos = tuple(f.strip().lower() for f in args.formatos.split(',') if f.strip())
+    nomes = [n.strip() for n in args.relatorios.split(',') if n.strip()]
+    invalidos = [f for f in formatos if f not in FORMATOS_SUPORTADOS] + [n for n in nomes if n not in RELATORIOS]
+    if invalidos:
+        parser.error(f"Valores inválidos: {', '.join(invalidos)}")
+    if not os.path.exists(args.banco):
+        parser.error(f'Banco de dados não encontrado: {args.banco}')
+
+    processos = args.processos or min(len(nomes), os.cpu_count() or 1)
+
+    inicio = time.perf_counter()
+    falhas = gerar_relatorios(args.banco, args.saida, nomes, formatos, max(processos, 1))
+    print(f'Concluído em {time.perf_counter() - inicio:.1f} s ({falhas} falha(s))')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
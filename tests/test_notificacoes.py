@@ -0,0 +1,349 @@
+# tests/test_notificacoes.py
+"""Envio da caixa de saída contra um gateway HTTP de mentira (http.server em uma porta livre).
+
+Uso (na raiz do projeto):
+    python -m unittest discover -s tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PyQt5.QtCore import QCoreApplication
+
+from database.database import Database, AVISO_ENVIADO, AVISO_FALHOU, AVISO_PENDENTE
+from utils import notificacoes
+from utils.notificacoes import (ATRASO_INICIAL_AVISO, ATRASO_MAXIMO_AVISO, MAXIMO_TENTATIVAS_AVISO,
+                                VARIACAO_ATRASO_AVISO, DespachanteAvisos, EspacamentoEnvios, TransporteHttp,
+                                atraso_nova_tentativa, despachar_lote)
+
+TELEFONE = '(11) 98765-4321'
+NUMERO = '5511987654321'
+
+
+class GatewayFalso:
+    """Gateway de mensagens de mentira, com a resposta de cada número roteirizada.
+
+    respostas[numero] é a lista de códigos HTTP devolvidos, em ordem (o último
+    se repete); números sem roteiro recebem 200.
+    """
+
+    def __init__(self, atraso: float = 0.0):
+        self.atraso = atraso
+        self.respostas = {}
+        self.recebidos = []  # (numero, mensagem, authorization, instante)
+        self.simultaneos = 0
+        self.maximo_simultaneos = 0
+        self._trava = threading.Lock()
+        gateway = self
+
+        class Requisicao(BaseHTTPRequestHandler):
+            def do_POST(self):
+                corpo = json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+                gateway._entrar(corpo, self.headers.get('Authorization'))
+                try:
+                    time.sleep(gateway.atraso)
+                    codigo = gateway._proxima_resposta(corpo['telefone'])
+                finally:
+                    gateway._sair()
+                self.send_response(codigo)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, formato, *argumentos):
+                pass
+
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), Requisicao)
+        self.url = f'http://127.0.0.1:{self.servidor.server_address[1]}/mensagens'
+        self._thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _entrar(self, corpo: dict, autorizacao: str):
+        with self._trava:
+            self.recebidos.append((corpo['telefone'], corpo['mensagem'], autorizacao, time.monotonic()))
+            self.simultaneos += 1
+            self.maximo_simultaneos = max(self.maximo_simultaneos, self.simultaneos)
+
+    def _sair(self):
+        with self._trava:
+            self.simultaneos -= 1
+
+    def _proxima_resposta(self, numero: str) -> int:
+        with self._trava:
+            roteiro = self.respostas.get(numero)
+            if not roteiro:
+                return 200
+            return roteiro.pop(0) if len(roteiro) > 1 else roteiro[0]
+
+    def fechar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+class TesteEnvioAvisos(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp(prefix='teste-avisos-')
+        self.db_name = os.path.join(self.pasta, 'clientes.db')
+        self.database = Database(self.db_name)
+        self.gateway = GatewayFalso()
+
+    def tearDown(self):
+        self.gateway.fechar()
+        self.database.fechar_conexao()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _enfileirar(self, telefones: list) -> list:
+        """Cadastra um cliente por telefone e enfileira um aviso para cada; retorna os IDs dos clientes."""
+        clientes = [
+            self.database.adicionar_cliente((f'Cliente {i}', telefone, '', '', 'Mensal', None, None, None, 0,
+                                             'Vencido', '', '', '', None))
+            for i, telefone in enumerate(telefones)
+        ]
+        self.database.enfileirar_avisos([(cliente_id, telefone, f'Aviso {cliente_id}')
+                                         for cliente_id, telefone in zip(clientes, telefones)])
+        return clientes
+
+    def _transporte(self, **opcoes) -> TransporteHttp:
+        opcoes.setdefault('intervalo', 0.0)
+        return TransporteHttp(self.gateway.url, opcoes.pop('token', 'segredo'), **opcoes)
+
+    def _aviso(self, cliente_id: int) -> tuple:
+        return self.database.conn.execute(
+            'SELECT estado, tentativas, proxima_tentativa, erro FROM avisos_saida WHERE cliente_id = ?',
+            (cliente_id,)
+        ).fetchone()
+
+    def _avisado(self, cliente_id: int) -> tuple:
+        return self.database.conn.execute('SELECT avisado, data_aviso FROM clientes WHERE id = ?',
+                                          (cliente_id,)).fetchone()
+
+    def _liberar_novas_tentativas(self):
+        """Antecipa as novas tentativas agendadas (simula a passagem do tempo)."""
+        self.database.conn.execute('UPDATE avisos_saida SET proxima_tentativa = 0 WHERE estado = ?',
+                                   (AVISO_PENDENTE,))
+        self.database.conn.commit()
+
+    def test_entrega_marca_cliente_avisado(self):
+        cliente_id, = self._enfileirar([TELEFONE])
+
+        resultados = despachar_lote(self.database, self._transporte())
+
+        self.assertEqual([(r[1], r[2]) for r in resultados], [(cliente_id, AVISO_ENVIADO)])
+        self.assertEqual(self.gateway.recebidos[0][:3], (NUMERO, f'Aviso {cliente_id}', 'Bearer segredo'))
+        self.assertEqual(self._aviso(cliente_id)[:2], (AVISO_ENVIADO, 1))
+        self.assertEqual(self._avisado(cliente_id), (1, date.today().toordinal()))
+
+    def test_lote_limita_avisos_reservados(self):
+        clientes = self._enfileirar([TELEFONE] * 5)
+        transporte = self._transporte(lote=2)
+
+        self.assertEqual(len(despachar_lote(self.database, transporte)), 2)
+        self.assertEqual(self.database.contar_avisos_saida(), {AVISO_ENVIADO: 2, AVISO_PENDENTE: 3})
+        self.assertEqual(len(despachar_lote(self.database, transporte)), 2)
+        self.assertEqual(len(despachar_lote(self.database, transporte)), 1)
+        self.assertEqual(despachar_lote(self.database, transporte), [])
+        self.assertEqual(len(self.gateway.recebidos), 5)
+        self.assertTrue(all(self._avisado(cliente_id)[0] == 1 for cliente_id in clientes))
+
+    def test_concorrencia_limita_envios_simultaneos(self):
+        self.gateway.atraso = 0.2
+        self._enfileirar([TELEFONE] * 9)
+
+        resultados = despachar_lote(self.database, self._transporte(lote=9, concorrencia=3))
+
+        self.assertEqual(len(resultados), 9)
+        self.assertEqual(self.gateway.maximo_simultaneos, 3)
+
+    def test_intervalo_espaca_inicio_dos_envios(self):
+        self._enfileirar([TELEFONE] * 4)
+
+        despachar_lote(self.database, self._transporte(lote=4, concorrencia=4, intervalo=0.15))
+
+        instantes = sorted(recebido[3] for recebido in self.gateway.recebidos)
+        self.assertEqual(len(instantes), 4)
+        for anterior, seguinte in zip(instantes, instantes[1:]):
+            self.assertGreaterEqual(seguinte - anterior, 0.12)
+
+    def test_falha_temporaria_agenda_nova_tentativa(self):
+        for codigo in (503, 429, 408):
+            with self.subTest(codigo=codigo):
+                self.gateway.respostas[NUMERO] = [codigo, 200]
+                cliente_id, = self._enfileirar([TELEFONE])
+
+                antes = time.time()
+                resultado, = despachar_lote(self.database, self._transporte())
+
+                self.assertEqual(resultado[2], AVISO_PENDENTE)
+                estado, tentativas, proxima, erro = self._aviso(cliente_id)
+                self.assertEqual((estado, tentativas), (AVISO_PENDENTE, 1))
+                self.assertIn(str(codigo), erro)
+                self.assertGreaterEqual(proxima, antes + ATRASO_INICIAL_AVISO * (1 - VARIACAO_ATRASO_AVISO))
+                self.assertEqual(self._avisado(cliente_id)[0], 0)
+
+                # Antes da hora marcada o aviso não sai de novo
+                self.assertEqual(despachar_lote(self.database, self._transporte()), [])
+
+                self._liberar_novas_tentativas()
+                resultado, = despachar_lote(self.database, self._transporte())
+                self.assertEqual(resultado[2], AVISO_ENVIADO)
+                self.assertEqual(self._aviso(cliente_id)[:2], (AVISO_ENVIADO, 2))
+                self.assertEqual(self._avisado(cliente_id)[0], 1)
+
+    def test_falha_definitiva_nao_tenta_de_novo(self):
+        self.gateway.respostas[NUMERO] = [400]
+        cliente_id, = self._enfileirar([TELEFONE])
+
+        resultado, = despachar_lote(self.database, self._transporte())
+
+        self.assertEqual(resultado[2], AVISO_FALHOU)
+        self.assertEqual(self._aviso(cliente_id)[:2], (AVISO_FALHOU, 1))
+        self._liberar_novas_tentativas()
+        self.assertEqual(despachar_lote(self.database, self._transporte()), [])
+        self.assertEqual(len(self.gateway.recebidos), 1)
+        self.assertEqual(self._avisado(cliente_id)[0], 0)
+
+    def test_telefone_invalido_falha_sem_requisicao(self):
+        cliente_id, = self._enfileirar(['123'])
+
+        resultado, = despachar_lote(self.database, self._transporte())
+
+        self.assertEqual(resultado[2], AVISO_FALHOU)
+        self.assertEqual(self.gateway.recebidos, [])
+
+    def test_desiste_apos_maximo_de_tentativas(self):
+        self.gateway.respostas[NUMERO] = [500]
+        cliente_id, = self._enfileirar([TELEFONE])
+
+        for _ in range(MAXIMO_TENTATIVAS_AVISO):
+            self._liberar_novas_tentativas()
+            despachar_lote(self.database, self._transporte())
+
+        self.assertEqual(self._aviso(cliente_id)[:2], (AVISO_FALHOU, MAXIMO_TENTATIVAS_AVISO))
+        self._liberar_novas_tentativas()
+        self.assertEqual(despachar_lote(self.database, self._transporte()), [])
+        self.assertEqual(len(self.gateway.recebidos), MAXIMO_TENTATIVAS_AVISO)
+
+    def test_gateway_inacessivel_e_falha_temporaria(self):
+        cliente_id, = self._enfileirar([TELEFONE])
+        self.gateway.fechar()
+
+        resultado, = despachar_lote(self.database, self._transporte(tempo_limite=2))
+
+        self.assertEqual(resultado[2], AVISO_PENDENTE)
+        self.assertIn('inacessível', self._aviso(cliente_id)[3])
+        self.gateway = GatewayFalso()  # tearDown fecha um gateway ativo
+
+    def test_envio_interrompido_devolve_avisos_a_fila(self):
+        self._enfileirar([TELEFONE] * 3)
+        enviados = []
+
+        def continuar():
+            return len(enviados) < 1
+
+        transporte = self._transporte(lote=3, concorrencia=1)
+        enviar = transporte.enviar
+        transporte.enviar = lambda telefone, mensagem: (enviar(telefone, mensagem), enviados.append(telefone))
+
+        resultados = despachar_lote(self.database, transporte, EspacamentoEnvios(transporte), continuar)
+
+        self.assertEqual(len(resultados), 1)
+        self.assertEqual(self.database.contar_avisos_saida(), {AVISO_ENVIADO: 1, AVISO_PENDENTE: 2})
+        pendentes = self.database.conn.execute('SELECT tentativas FROM avisos_saida WHERE estado = ?',
+                                               (AVISO_PENDENTE,)).fetchall()
+        self.assertEqual(pendentes, [(0,), (0,)])
+
+
+class TesteAtrasoNovaTentativa(unittest.TestCase):
+
+    def test_atraso_dobra_ate_o_maximo(self):
+        for tentativas in range(1, 12):
+            esperado = min(ATRASO_MAXIMO_AVISO, ATRASO_INICIAL_AVISO * 2 ** (tentativas - 1))
+            for _ in range(20):
+                atraso = atraso_nova_tentativa(tentativas)
+                self.assertGreaterEqual(atraso, esperado * (1 - VARIACAO_ATRASO_AVISO))
+                self.assertLessEqual(atraso, esperado * (1 + VARIACAO_ATRASO_AVISO))
+
+
+class TesteDespachanteAvisos(unittest.TestCase):
+    """A tarefa em segundo plano esvazia a fila e emite os resultados na thread principal."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp(prefix='teste-despachante-')
+        self.db_name = os.path.join(self.pasta, 'clientes.db')
+        self.database = Database(self.db_name)
+        self.gateway = GatewayFalso()
+        self.despachantes = []
+
+    def tearDown(self):
+        # Parado, o despachante não fica esperando novas tentativas agendadas
+        for despachante in self.despachantes:
+            despachante.parar()
+        notificacoes.pool_despacho().waitForDone()
+        self.gateway.fechar()
+        self.database.fechar_conexao()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _esperar(self, condicao, limite: float = 10.0) -> bool:
+        fim = time.monotonic() + limite
+        while time.monotonic() < fim:
+            self.app.processEvents()
+            if condicao():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def _despachante(self, transporte) -> DespachanteAvisos:
+        despachante = DespachanteAvisos(self.db_name, transporte)
+        self.despachantes.append(despachante)
+        return despachante
+
+    def test_esvazia_a_fila_e_emite_resultados(self):
+        self.gateway.respostas['5511900000003'] = [404]
+        clientes = [self.database.adicionar_cliente((f'Cliente {i}', f'119000000{i:02d}', '', '', 'Mensal', None,
+                                                     None, None, 0, 'Vencido', '', '', '', None))
+                    for i in range(7)]
+        self.database.enfileirar_avisos([(cliente_id, f'119000000{i:02d}', 'Aviso')
+                                         for i, cliente_id in enumerate(clientes)])
+        processados = []
+        despachante = self._despachante(TransporteHttp(self.gateway.url, lote=3, concorrencia=2, intervalo=0.0))
+        despachante.processados.connect(processados.extend)
+
+        despachante.acordar()
+
+        self.assertTrue(self._esperar(lambda: len(processados) == 7))
+        self.assertTrue(self._esperar(lambda: not despachante._em_execucao))
+        self.assertEqual(self.database.contar_avisos_saida(), {AVISO_ENVIADO: 6, AVISO_FALHOU: 1})
+        avisados = dict(self.database.conn.execute('SELECT id, avisado FROM clientes').fetchall())
+        self.assertEqual([avisados[cliente_id] for cliente_id in clientes], [1, 1, 1, 0, 1, 1, 1])
+
+    def test_pausado_nao_envia_ate_continuar(self):
+        cliente_id = self.database.adicionar_cliente(('Cliente', TELEFONE, '', '', 'Mensal', None, None, None, 0,
+                                                      'Vencido', '', '', '', None))
+        self.database.enfileirar_avisos([(cliente_id, TELEFONE, 'Aviso')])
+        processados = []
+        despachante = self._despachante(TransporteHttp(self.gateway.url, intervalo=0.0))
+        despachante.processados.connect(processados.extend)
+
+        despachante.pausar()
+        despachante.acordar()
+        self.assertFalse(self._esperar(lambda: processados, limite=0.5))
+        self.assertEqual(self.gateway.recebidos, [])
+
+        despachante.continuar()
+        self.assertTrue(self._esperar(lambda: processados))
+        self.assertEqual(processados[0][2], AVISO_ENVIADO)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# utils/campanha.py
+from string import Formatter
+
+from utils.date_helper import data_para_dia, hoje_dia
+from utils.formatters import formatar_data
+from utils.whatsapp import telefone_whatsapp
+
+# Status oferecidos na seleção da campanha (os dois primeiros vêm marcados)
+STATUS_CAMPANHA = ('Expirando', 'Inadimplente', 'Em dia')
+
+MODELO_PADRAO = (
+    'Olá, {primeiro_nome}! Sua assinatura Climaterra {prazo} ({vencimento}). '
+    'Para renovar, é só responder esta mensagem.'
+)
+
+# Campos aceitos no modelo da mensagem: nome -> descrição exibida na tela
+CAMPOS_MODELO = {
+    'nome': 'nome completo',
+    'primeiro_nome': 'primeiro nome',
+    'vencimento': 'data de vencimento (DD/MM/AAAA)',
+    'prazo': '"vence em 3 dias", "vence hoje", "venceu há 2 dias"...',
+    'dias': 'dias até o vencimento (negativo se vencido)',
+    'status': 'status atual',
+    'cidade': 'município',
+    'periodo': 'período da assinatura (meses)',
+}
+
+
+def validar_modelo(modelo: str):
+    """
+    Confere se o modelo pode ser usado na campanha.
+
+    Returns:
+        Optional[str]: Descrição do problema ou None se o modelo for válido
+    """
+    if not modelo.strip():
+        return 'O modelo da mensagem está vazio.'
+    try:
+        campos = [campo for _, campo, _, _ in Formatter().parse(modelo) if campo is not None]
+    except ValueError as e:
+        return f'Chaves mal formadas no modelo: {e}'
+    for campo in campos:
+        if campo not in CAMPOS_MODELO:
+            return f'Campo desconhecido no modelo: {{{campo}}}'
+    return None
+
+
+def _prazo(dias) -> str:
+    if dias is None:
+        return 'está com o vencimento em aberto'
+    if dias > 1:
+        return f'vence em {dias} dias'
+    if dias == 1:
+        return 'vence amanhã'
+    if dias == 0:
+        return 'vence hoje'
+    if dias == -1:
+        return 'venceu ontem'
+    return f'venceu há {-dias} dias'
+
+
+def campos_cliente(cliente, hoje: int = None) -> dict:
+    """Valores dos campos do modelo para um cliente (tupla no formato de COLUNAS)."""
+    hoje = hoje_dia() if hoje is None else hoje
+    vencimento = data_para_dia(cliente[7])
+    dias = vencimento - hoje if vencimento is not None else None
+    nome = (cliente[1] or '').strip()
+    return {
+        'nome': nome,
+        'primeiro_nome': nome.split()[0].capitalize() if nome else '',
+        'vencimento': formatar_data(cliente[7]) if cliente[7] else '',
+        'prazo': _prazo(dias),
+        'dias': '' if dias is None else str(dias),
+        'status': cliente[10] or '',
+        'cidade': cliente[12] or '',
+        'periodo': '' if cliente[5] is None else str(cliente[5]),
+    }
+
+
+def renderizar_mensagem(modelo: str, cliente, hoje: int = None) -> str:
+    """Preenche o modelo (já validado) com os dados do cliente."""
+    return modelo.format_map(campos_cliente(cliente, hoje))
+
+
+def preparar_envios(clientes: list, modelo: str, hoje: int = None) -> tuple:
+    """
+    Gera a mensagem de cada cliente da campanha.
+
+    Returns:
+        Tuple[list, list]: [(cliente_id, nome, telefone, mensagem)] a enviar e
+        [(cliente_id, nome)] sem telefone válido
+    """
+    hoje = hoje_dia() if hoje is None else hoje
+    envios = []
+    sem_telefone = []
+    for cliente in clientes:
+        if telefone_whatsapp(cliente[2]) is None:
+            sem_telefone.append((cliente[0], cliente[1]))
+        else:
+            envios.append((cliente[0], cliente[1], cliente[2], renderizar_mensagem(modelo, cliente, hoje)))
+    return envios, sem_telefone
@@ -0,0 +1,158 @@
+# utils/chart_renderer.py
+
+# Quantidade máxima de categorias desenhadas; as demais viram "Outros"
+MAX_CATEGORIAS = 12
+ROTULO_OUTROS = 'Outros'
+
+# Categorias com participação menor que esta também vão para "Outros"
+PARTICIPACAO_MINIMA = 0.01
+
+# Tamanho (polegadas) e resolução da imagem renderizada. A resolução é o
+# dobro da exibida em zoom 100%, então o zoom só reescala a imagem pronta
+TAMANHO_GRAFICO = (10, 8)
+DPI_GRAFICO = 200
+
+
+def agrupar_categorias(contagem: dict, limite: int = MAX_CATEGORIAS,
+                       participacao_minima: float = PARTICIPACAO_MINIMA) -> dict:
+    """
+    Mantém as maiores categorias e soma as restantes em "Outros".
+
+    Args:
+        contagem (dict): Categoria -> quantidade
+        limite (int): Número máximo de fatias/barras, incluindo "Outros"
+        participacao_minima (float): Fração do total abaixo da qual a categoria vai para "Outros"
+
+    Returns:
+        dict: Categorias em ordem decrescente de quantidade
+    """
+    ordenadas = sorted(contagem.items(), key=lambda item: item[1], reverse=True)
+    total = sum(qtd for _, qtd in ordenadas)
+    if len(ordenadas) <= limite and all(qtd >= total * participacao_minima for _, qtd in ordenadas):
+        return dict(ordenadas)
+
+    principais = {}
+    outros = 0
+    for categoria, quantidade in ordenadas:
+        if len(principais) < limite - 1 and quantidade >= total * participacao_minima:
+            principais[categoria] = quantidade
+        else:
+            outros += quantidade
+    if outros:
+        principais[ROTULO_OUTROS] = principais.get(ROTULO_OUTROS, 0) + outros
+    return principais
+
+
+def _desenhar_pizza(figura, dados: dict, titulo: str):
+    ax = figura.add_subplot(111)
+
+    labels = list(dados.keys())
+    sizes = list(dados.values())
+
+    # Rótulos com percentual e número absoluto
+    total = sum(sizes)
+    custom_labels = [f'{label}\n{size} ({size/total*100:.1f}%)' for label, size in zip(labels, sizes)]
+
+    ax.pie(sizes, labels=custom_labels, startangle=90)
+    ax.axis('equal')
+    ax.set_title(titulo, pad=20)
+
+
+def _desenhar_barras(figura, dados: dict, titulo: str, rotulo_y: str = 'Quantidade de Clientes'):
+    ax = figura.add_subplot(111)
+    bars = ax.bar(range(len(dados)), list(dados.values()))
+
+    ax.set_title(titulo)
+    ax.set_ylabel(rotulo_y)
+
+    # Rótulos do eixo x inclinados para não se sobreporem
+    ax.set_xticks(range(len(dados)))
+    ax.set_xticklabels(list(dados.keys()), rotation=45, ha='right')
+
+    # Valores sobre as barras
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height, f'{int(height)}', ha='center', va='bottom')
+
+
+TIPOS_GRAFICO = {
+    'pizza': _desenhar_pizza,
+    'barras': _desenhar_barras,
+}
+
+
+# Relatórios disponíveis: nome -> (método do Database, tipo de gráfico, título,
+# agrupar categorias pequenas em "Outros")
+RELATORIOS = {
+    'estado': ('contar_por_estado', 'pizza', 'Distribuição de Clientes por Estado', True),
+    'municipio': ('contar_por_municipio', 'pizza', 'Distribuição de Clientes por Município', True),
+    'inadimplencia': ('relatorio_inadimplencia', 'barras', 'Clientes Inadimplentes por Dias em Atraso', False),
+    'renovacoes': ('previsao_renovacoes', 'barras', 'Previsão de Renovações nos Próximos 12 Meses', False),
+}
+
+
+def dados_relatorio(database, nome: str) -> dict:
+    """
+    Executa a agregação do relatório e prepara os dados para o gráfico.
+
+    Args:
+        database (Database): Conexão usada nas consultas
+        nome (str): Chave de RELATORIOS
+
+    Returns:
+        dict: Categoria -> quantidade (vazio se não houver nada a exibir)
+    """
+    metodo, _, _, agrupar = RELATORIOS[nome]
+    dados = getattr(database, metodo)()
+    if agrupar:
+        return agrupar_categorias(dados)
+    # Faixas fixas mantêm a ordem; sem nenhum cliente não há gráfico
+    return dados if any(dados.values()) else {}
+
+
+def criar_figura(tipo: str, dados: dict, titulo: str):
+    """
+    Desenha o gráfico em uma figura Agg, sem pyplot nem widgets.
+
+    Args:
+        tipo (str): Chave de TIPOS_GRAFICO ('pizza' ou 'barras')
+        dados (dict): Categoria -> quantidade, já agrupadas
+        titulo (str): Título do gráfico
+
+    Returns:
+        Figure: Figura desenhada, pronta para savefig
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if tipo not in TIPOS_GRAFICO:
+        raise ValueError(f'Tipo de gráfico desconhecido: {tipo}')
+
+    figura = Figure(figsize=TAMANHO_GRAFICO, dpi=DPI_GRAFICO)
+    FigureCanvasAgg(figura)
+    TIPOS_GRAFICO[tipo](figura, dados, titulo)
+    figura.tight_layout()
+    return figura
+
+
+def renderizar_grafico(tipo: str, dados: dict, titulo: str):
+    """
+    Desenha o gráfico em um buffer Agg (seguro fora da thread da interface).
+
+    Args:
+        tipo (str): Chave de TIPOS_GRAFICO ('pizza' ou 'barras')
+        dados (dict): Categoria -> quantidade, já agrupadas
+        titulo (str): Título do gráfico
+
+    Returns:
+        Tuple[Figure, QImage]: Figura (usada na exportação) e imagem pronta para exibição
+    """
+    from PyQt5.QtGui import QImage
+
+    figura = criar_figura(tipo, dados, titulo)
+    canvas = figura.canvas
+    canvas.draw()
+
+    largura, altura = canvas.get_width_height()
+    imagem = QImage(bytes(canvas.buffer_rgba()), largura, altura, QImage.Format_RGBA8888).copy()
+    return figura, imagem
@@ -0,0 +1,225 @@
+# utils/comprovante_gc.py
+import os
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThread, pyqtSignal
+
+from database.database import Database
+from utils.comprovante_store import caminho_comprovante, iterar_comprovantes, subpasta_comprovante
+from utils.directory_helper import PASTA_MINIATURAS, PASTA_ORIGINAIS
+from utils.thumbnail_cache import caminho_miniatura
+
+# Arquivos sem referência só são recolhidos depois deste tempo sem alteração
+# (protege comprovantes que estão sendo gravados no momento)
+CARENCIA_ORFAOS = 24 * 60 * 60
+# Tempo que um órfão fica na quarentena antes de ser excluído de vez
+RETENCAO_QUARENTENA = 30 * 24 * 60 * 60
+
+# Subpasta (dentro dos comprovantes) para onde os órfãos são movidos
+PASTA_QUARENTENA = 'quarentena'
+
+# Temporários deixados por cópias ou recompressões interrompidas
+PREFIXOS_TEMPORARIOS = ('.tmp-', '.ingest-')
+
+# Entradas da pasta examinadas entre duas pausas da coleta em segundo plano
+ENTRADAS_POR_LOTE = 200
+PAUSA_ENTRE_LOTES_MS = 20
+
+
+def _novo_resumo() -> dict:
+    return {
+        'analisados': 0,
+        'orfaos': 0, 'bytes_orfaos': 0,
+        'temporarios': 0, 'bytes_temporarios': 0,
+        'excluidos': 0, 'bytes_excluidos': 0,
+        'restaurados': 0,
+        'miniaturas': 0, 'bytes_miniaturas': 0,
+        'originais': 0, 'bytes_originais': 0,
+    }
+
+
+def _remover(caminho: str, simular: bool) -> None:
+    if not simular:
+        os.remove(caminho)
+
+
+def coletar_comprovantes(database, pasta: str, carencia: float = CARENCIA_ORFAOS,
+                         retencao: float = RETENCAO_QUARENTENA, agora: float = None,
+                         simular: bool = False):
+    """
+    Recolhe os comprovantes que nenhum cliente referencia, em etapas.
+
+    Os nomes em uso são lidos do banco para um conjunto e a pasta (raiz e
+    subpastas de hash) é percorrida com os.scandir. Órfãos mais antigos que a carência vão para a quarentena,
+    e os que passaram da retenção na quarentena são excluídos. Um arquivo da
+    quarentena que voltou a ser referenciado é restaurado. Também são apagados
+    os temporários abandonados e as miniaturas de comprovantes que não existem
+    mais (ou que ficaram fora da subpasta atual). Os originais guardados
+    (nomeados pelo comprovante armazenado) seguem o seu comprovante: vão para
+    a quarentena, voltam dela e são excluídos pelas mesmas regras.
+
+    Args:
+        database (Database): Banco com a contagem de referências
+        pasta (str): Pasta dos comprovantes
+        carencia (float): Idade mínima, em segundos, para recolher um órfão
+        retencao (float): Tempo, em segundos, que um órfão fica na quarentena
+        agora (float): Instante de referência (padrão: time.time())
+        simular (bool): Apenas contabiliza, sem mover nem excluir nada
+
+    Yields:
+        dict: Resumo acumulado, a cada ENTRADAS_POR_LOTE entradas examinadas
+    """
+    agora = time.time() if agora is None else agora
+    resumo = _novo_resumo()
+    referenciados = set(database.iterar_comprovantes_referenciados())
+    quarentena = os.path.join(pasta, PASTA_QUARENTENA)
+
+    for entrada in iterar_comprovantes(pasta):
+        resumo['analisados'] += 1
+        if resumo['analisados'] % ENTRADAS_POR_LOTE == 0:
+            yield resumo
+
+        nome = entrada.name
+        if nome in referenciados:
+            continue
+        info = entrada.stat()
+        if agora - info.st_mtime < carencia:
+            continue
+
+        if nome.startswith(PREFIXOS_TEMPORARIOS):
+            _remover(entrada.path, simular)
+            resumo['temporarios'] += 1
+            resumo['bytes_temporarios'] += info.st_size
+            continue
+
+        # Confirma no banco: o arquivo pode ter sido reaproveitado após a leitura dos nomes
+        if database.referencias_comprovante(nome) > 0:
+            continue
+        if not simular:
+            os.makedirs(quarentena, exist_ok=True)
+            destino = os.path.join(quarentena, nome)
+            os.replace(entrada.path, destino)
+            os.utime(destino)  # A retenção conta a partir da entrada na quarentena
+        resumo['orfaos'] += 1
+        resumo['bytes_orfaos'] += info.st_size
+
+    if os.path.isdir(quarentena):
+        with os.scandir(quarentena) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file(follow_symlinks=False):
+                    continue
+                if entrada.name in referenciados or database.referencias_comprovante(entrada.name) > 0:
+                    if not simular:
+                        destino = os.path.join(pasta, subpasta_comprovante(entrada.name), entrada.name)
+                        os.makedirs(os.path.dirname(destino), exist_ok=True)
+                        os.replace(entrada.path, destino)
+                    resumo['restaurados'] += 1
+                    continue
+                info = entrada.stat()
+                if agora - info.st_mtime >= retencao:
+                    _remover(entrada.path, simular)
+                    resumo['excluidos'] += 1
+                    resumo['bytes_excluidos'] += info.st_size
+
+    # Originais: referenciados quando o comprovante com o mesmo nome (sem a extensão) é
+    # referenciado. Um original reaproveitado tem a data renovada, e a carência o protege.
+    originais = os.path.join(pasta, PASTA_ORIGINAIS)
+    quarentena_originais = os.path.join(quarentena, PASTA_ORIGINAIS)
+    radicais = {os.path.splitext(nome)[0] for nome in referenciados}
+    if os.path.isdir(originais):
+        for entrada in iterar_comprovantes(originais):
+            if os.path.splitext(entrada.name)[0] in radicais:
+                continue
+            info = entrada.stat()
+            if agora - info.st_mtime < carencia:
+                continue
+            if entrada.name.startswith(PREFIXOS_TEMPORARIOS):
+                _remover(entrada.path, simular)
+                resumo['temporarios'] += 1
+                resumo['bytes_temporarios'] += info.st_size
+                continue
+            if not simular:
+                os.makedirs(quarentena_originais, exist_ok=True)
+                destino = os.path.join(quarentena_originais, entrada.name)
+                os.replace(entrada.path, destino)
+                os.utime(destino)
+            resumo['originais'] += 1
+            resumo['bytes_originais'] += info.st_size
+
+    if os.path.isdir(quarentena_originais):
+        with os.scandir(quarentena_originais) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file(follow_symlinks=False):
+                    continue
+                if os.path.splitext(entrada.name)[0] in radicais:
+                    if not simular:
+                        destino = os.path.join(originais, subpasta_comprovante(entrada.name), entrada.name)
+                        os.makedirs(os.path.dirname(destino), exist_ok=True)
+                        os.replace(entrada.path, destino)
+                    resumo['restaurados'] += 1
+                    continue
+                info = entrada.stat()
+                if agora - info.st_mtime >= retencao:
+                    _remover(entrada.path, simular)
+                    resumo['excluidos'] += 1
+                    resumo['bytes_excluidos'] += info.st_size
+
+    miniaturas = os.path.join(pasta, PASTA_MINIATURAS)
+    if os.path.isdir(miniaturas):
+        for entrada in iterar_comprovantes(miniaturas):
+            # Miniatura "<comprovante>.jpg" (ou ".jpg.tmp" durante a gravação)
+            comprovante = entrada.name
+            for sufixo in ('.jpg.tmp', '.jpg'):
+                if entrada.name.endswith(sufixo):
+                    comprovante = entrada.name[:-len(sufixo)]
+                    break
+            # Mantida se o comprovante existe e ela está no lugar atual (não na raiz antiga)
+            if (os.path.exists(caminho_comprovante(comprovante, pasta))
+                    and os.path.dirname(entrada.path) == os.path.dirname(caminho_miniatura(comprovante, miniaturas))):
+                continue
+            info = entrada.stat()
+            if agora - info.st_mtime < carencia:
+                continue
+            _remover(entrada.path, simular)
+            resumo['miniaturas'] += 1
+            resumo['bytes_miniaturas'] += info.st_size
+
+    yield resumo
+
+
+def executar_coleta(database, pasta: str, **opcoes) -> dict:
+    """Executa a coleta inteira de uma vez e retorna o resumo final."""
+    resumo = _novo_resumo()
+    for resumo in coletar_comprovantes(database, pasta, **opcoes):
+        pass
+    return resumo
+
+
+class SinaisColeta(QObject):
+    concluida = pyqtSignal(dict)  # resumo da coleta
+    falhou = pyqtSignal(str)
+
+
+class TarefaColeta(QRunnable):
+    """Coleta em segundo plano, com conexão própria e pausas entre os lotes."""
+
+    def __init__(self, db_name: str, pasta: str):
+        super().__init__()
+        self.db_name = db_name
+        self.pasta = pasta
+        self.sinais = SinaisColeta()
+
+    def run(self):
+        try:
+            database = Database(self.db_name)
+            try:
+                resumo = _novo_resumo()
+                for resumo in coletar_comprovantes(database, self.pasta):
+                    QThread.msleep(PAUSA_ENTRE_LOTES_MS)  # Cede o disco à interface
+            finally:
+                database.fechar_conexao()
+        except Exception as e:
+            print(f"Erro na coleta de comprovantes: {e}")
+            self.sinais.falhou.emit(str(e))
+            return
+        self.sinais.concluida.emit(resumo)
@@ -0,0 +1,167 @@
+# utils/comprovante_lote.py
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from utils.comprovante_store import armazenar_comprovante, liberar_comprovante
+from utils.image_ingest import preparar_comprovante
+from utils.text_helper import somente_digitos
+
+EXTENSOES_COMPROVANTE = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Quantidade de dígitos de um CPF e de um CNPJ
+TAMANHOS_DOCUMENTO = (11, 14)
+
+# Números no nome do arquivo, com ou sem a pontuação do documento
+_SEQUENCIA_NUMERICA = re.compile(r'\d[\d.\-]*\d')
+
+# Arquivos copiados (e recomprimidos) ao mesmo tempo
+ARQUIVOS_SIMULTANEOS = min(8, os.cpu_count() or 1)
+
+# A tarefa do lote fica esperando as suas threads, e o Qt usa o QThreadPool
+# global ao converter e reduzir imagens grandes; se a tarefa ocupasse uma
+# thread do pool global as duas podiam se bloquear. Por isso ela tem pool próprio
+_pool_lote = None
+
+
+def documentos_do_nome(nome_arquivo: str) -> list:
+    """
+    Extrai os possíveis CPF/CNPJ do nome de um arquivo.
+
+    Ex.: '123.456.789-09 marco.jpg' e 'recibo_12345678909.png' -> ['12345678909']
+
+    Returns:
+        list: Sequências de 11 ou 14 dígitos, na ordem em que aparecem
+    """
+    base = os.path.splitext(os.path.basename(nome_arquivo))[0]
+    documentos = (somente_digitos(sequencia) for sequencia in _SEQUENCIA_NUMERICA.findall(base))
+    return [documento for documento in documentos if len(documento) in TAMANHOS_DOCUMENTO]
+
+
+def associar_arquivos(pasta_origem: str, indice: dict) -> tuple:
+    """
+    Associa os arquivos da pasta aos clientes pelo documento no nome.
+
+    Args:
+        pasta_origem (str): Pasta com os comprovantes digitalizados
+        indice (dict): Dígitos do documento -> IDs (Database.indice_documentos)
+
+    Returns:
+        Tuple[list, list]: [(caminho, cliente_id)] associados e
+        [(arquivo, motivo)] dos que não puderam ser associados
+    """
+    associados = []
+    nao_associados = []
+    clientes_usados = {}
+    with os.scandir(pasta_origem) as entradas:
+        arquivos = sorted((entrada for entrada in entradas if entrada.is_file()), key=lambda e: e.name)
+
+    for entrada in arquivos:
+        nome = entrada.name
+        if os.path.splitext(nome)[1].lower() not in EXTENSOES_COMPROVANTE:
+            nao_associados.append((nome, 'formato não suportado'))
+            continue
+        documentos = documentos_do_nome(nome)
+        if not documentos:
+            nao_associados.append((nome, 'nenhum CPF/CNPJ no nome'))
+            continue
+        ids = next((indice[documento] for documento in documentos if documento in indice), None)
+        if ids is None:
+            nao_associados.append((nome, 'CPF/CNPJ não cadastrado'))
+        elif len(ids) > 1:
+            nao_associados.append((nome, 'CPF/CNPJ cadastrado em mais de um cliente'))
+        elif ids[0] in clientes_usados:
+            nao_associados.append((nome, f'cliente já recebeu {clientes_usados[ids[0]]}'))
+        else:
+            clientes_usados[ids[0]] = nome
+            associados.append((entrada.path, ids[0]))
+    return associados, nao_associados
+
+
+def _armazenar_arquivo(origem: str, pasta: str) -> str:
+    """Recomprime (se valer a pena) e armazena um comprovante; executado nas threads do lote."""
+    preparado = preparar_comprovante(origem, pasta)
+    try:
+        return armazenar_comprovante(preparado, pasta)
+    finally:
+        if preparado != origem and os.path.exists(preparado):
+            os.remove(preparado)
+
+
+def armazenar_lote(associados: list, pasta: str, progresso=None) -> tuple:
+    """
+    Copia e calcula o hash dos comprovantes associados, vários ao mesmo tempo.
+
+    Args:
+        associados (list): [(caminho, cliente_id)] de associar_arquivos
+        pasta (str): Pasta dos comprovantes
+        progresso (callable): Chamada como progresso(concluidos, total)
+
+    Returns:
+        Tuple[dict, list]: {cliente_id: arquivo armazenado} e [(arquivo, motivo)] das falhas
+    """
+    atribuicoes = {}
+    falhas = []
+    with ThreadPoolExecutor(max_workers=ARQUIVOS_SIMULTANEOS) as executor:
+        tarefas = {executor.submit(_armazenar_arquivo, caminho, pasta): (caminho, cliente_id)
+                   for caminho, cliente_id in associados}
+        for concluidos, tarefa in enumerate(as_completed(tarefas), 1):
+            caminho, cliente_id = tarefas[tarefa]
+            try:
+                atribuicoes[cliente_id] = tarefa.result()
+            except Exception as e:
+                print(f"Erro ao armazenar comprovante {caminho}: {e}")
+                falhas.append((os.path.basename(caminho), f'erro ao copiar: {e}'))
+            if progresso is not None:
+                progresso(concluidos, len(tarefas))
+    return atribuicoes, falhas
+
+
+def gravar_anexos(database, atribuicoes: dict, pasta: str) -> int:
+    """
+    Grava os comprovantes no banco (uma transação) e libera os substituídos.
+
+    Returns:
+        int: Quantidade de clientes atualizados
+    """
+    anteriores = database.atribuir_comprovantes(atribuicoes)
+    for cliente_id, antigo in anteriores.items():
+        if antigo and antigo != atribuicoes[cliente_id]:
+            liberar_comprovante(database, antigo, pasta)
+    return len(anteriores)
+
+
+class SinaisAnexoLote(QObject):
+    progresso = pyqtSignal(int, int)  # arquivos concluídos, total
+    concluido = pyqtSignal(object, object)  # {cliente_id: arquivo}, [(arquivo, motivo)]
+    falhou = pyqtSignal(str)
+
+
+class TarefaAnexoLote(QRunnable):
+    """Armazena os arquivos associados em segundo plano; o banco é gravado pela interface."""
+
+    def __init__(self, associados: list, pasta: str):
+        super().__init__()
+        self.associados = associados
+        self.pasta = pasta
+        self.sinais = SinaisAnexoLote()
+
+    def run(self):
+        try:
+            atribuicoes, falhas = armazenar_lote(self.associados, self.pasta, self.sinais.progresso.emit)
+        except Exception as e:
+            print(f"Erro ao anexar comprovantes: {e}")
+            self.sinais.falhou.emit(str(e))
+            return
+        self.sinais.concluido.emit(atribuicoes, falhas)
+
+
+def pool_lote() -> QThreadPool:
+    """Pool próprio das tarefas de anexo em lote (um lote por vez)."""
+    global _pool_lote
+    if _pool_lote is None:
+        _pool_lote = QThreadPool()
+        _pool_lote.setMaxThreadCount(1)
+    return _pool_lote
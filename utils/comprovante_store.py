@@ -0,0 +1,284 @@
+# utils/comprovante_store.py
+import hashlib
+import os
+import re
+import tempfile
+
+from utils.directory_helper import ARQUIVO_CONFIGURACAO, PASTA_ORIGINAIS, ensure_comprovantes_dir
+
+# Tamanho dos blocos lidos ao copiar (e calcular o hash de) um comprovante
+TAMANHO_BLOCO = 1024 * 1024
+
+# Os arquivos ficam em subpastas pelos primeiros caracteres do hash
+# (ab/cd/abcd....jpg), para nenhuma pasta acumular dezenas de milhares de arquivos
+NIVEIS_SUBPASTAS = 2
+CARACTERES_POR_NIVEL = 2
+
+_NOME_POR_HASH = re.compile(r'^[0-9a-f]{64}(\.[^.]*)?$')
+_NOME_SUBPASTA = re.compile(r'^[0-9a-f]{%d}$' % CARACTERES_POR_NIVEL)
+
+
+class CopiaCancelada(Exception):
+    """O armazenamento do comprovante foi cancelado pelo usuário."""
+
+
+def nome_comprovante(digest: str, origem: str) -> str:
+    """Nome do arquivo armazenado: SHA-256 do conteúdo mais a extensão original."""
+    return f"{digest}{os.path.splitext(origem)[1].lower()}"
+
+
+def subpasta_comprovante(arquivo: str) -> str:
+    """Subpasta relativa (ex.: 'ab/cd') de um comprovante; '' para nomes que não são hash."""
+    nome = os.path.basename(arquivo)
+    if not _NOME_POR_HASH.match(nome):
+        return ''
+    return os.path.join(*(nome[i * CARACTERES_POR_NIVEL:(i + 1) * CARACTERES_POR_NIVEL]
+                          for i in range(NIVEIS_SUBPASTAS)))
+
+
+def caminho_comprovante(arquivo: str, pasta: str = None) -> str:
+    """
+    Caminho em disco de um comprovante a partir do nome gravado no banco.
+
+    Args:
+        arquivo (str): Nome do arquivo (valor da coluna comprovante)
+        pasta (str): Pasta dos comprovantes (padrão: a da aplicação)
+
+    Returns:
+        str: Caminho na subpasta do hash; se o arquivo ainda estiver na raiz
+        (pasta não migrada), o caminho antigo
+    """
+    pasta = pasta or ensure_comprovantes_dir()
+    nome = os.path.basename(arquivo)
+    caminho = os.path.join(pasta, subpasta_comprovante(nome), nome)
+    if not os.path.exists(caminho):
+        antigo = os.path.join(pasta, nome)
+        if os.path.exists(antigo):
+            return antigo
+    return caminho
+
+
+def caminho_original(arquivo: str, extensao: str, pasta: str = None) -> str:
+    """
+    Caminho do original guardado para um comprovante armazenado.
+
+    O original recebe o nome do comprovante armazenado (o hash da versão
+    recomprimida) com a sua própria extensão, na subpasta de originais.
+
+    Args:
+        arquivo (str): Nome do comprovante armazenado (valor da coluna comprovante)
+        extensao (str): Extensão do arquivo original (ex.: '.png')
+        pasta (str): Pasta dos comprovantes (padrão: a da aplicação)
+
+    Returns:
+        str: Caminho em originais/<subpasta do hash>/
+    """
+    pasta = pasta or ensure_comprovantes_dir()
+    nome = os.path.splitext(os.path.basename(arquivo))[0] + extensao.lower()
+    return os.path.join(pasta, PASTA_ORIGINAIS, subpasta_comprovante(nome), nome)
+
+
+def localizar_original(arquivo: str, pasta: str = None):
+    """Caminho do original guardado para o comprovante armazenado, ou None se não houver."""
+    radical = os.path.splitext(os.path.basename(arquivo))[0]
+    diretorio = os.path.dirname(caminho_original(arquivo, '', pasta))
+    try:
+        with os.scandir(diretorio) as entradas:
+            for entrada in entradas:
+                if os.path.splitext(entrada.name)[0] == radical and entrada.is_file(follow_symlinks=False):
+                    return entrada.path
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def iterar_comprovantes(pasta: str = None):
+    """
+    Percorre (com os.scandir) os arquivos da raiz e das subpastas de hash.
+
+    As demais subpastas (miniaturas, originais, quarentena) não são visitadas,
+    e o arquivo de configuração da raiz não é listado.
+
+    Yields:
+        os.DirEntry: Entrada de cada arquivo encontrado
+    """
+    pendentes = [(pasta or ensure_comprovantes_dir(), 0)]
+    while pendentes:
+        atual, nivel = pendentes.pop()
+        with os.scandir(atual) as entradas:
+            for entrada in entradas:
+                if entrada.is_file(follow_symlinks=False):
+                    if nivel == 0 and entrada.name == ARQUIVO_CONFIGURACAO:
+                        continue
+                    yield entrada
+                elif (nivel < NIVEIS_SUBPASTAS and _NOME_SUBPASTA.match(entrada.name)
+                      and entrada.is_dir(follow_symlinks=False)):
+                    pendentes.append((entrada.path, nivel + 1))
+
+
+def _copiar_em_blocos(origem: str, descritor: int, progresso=None):
+    """Copia a origem para o descritor (fechado ao final), gravando em disco (fsync).
+
+    Returns:
+        hashlib.sha256: Hash do conteúdo copiado
+    """
+    sha256 = hashlib.sha256()
+    with open(origem, 'rb') as entrada, os.fdopen(descritor, 'wb') as saida:
+        total = os.fstat(entrada.fileno()).st_size
+        copiados = 0
+        for bloco in iter(lambda: entrada.read(TAMANHO_BLOCO), b''):
+            sha256.update(bloco)
+            saida.write(bloco)
+            copiados += len(bloco)
+            if progresso is not None:
+                progresso(copiados, total)
+        saida.flush()
+        os.fsync(saida.fileno())
+    return sha256
+
+
+def armazenar_comprovante(origem: str, pasta: str = None, progresso=None) -> str:
+    """
+    Copia o comprovante para a pasta, nomeado pelo hash do seu conteúdo.
+
+    O hash é calculado durante a própria cópia (em blocos); se um arquivo
+    idêntico já estiver armazenado, a cópia temporária é descartada. A cópia
+    é gravada em disco (fsync) antes de receber o nome definitivo.
+
+    Args:
+        origem (str): Caminho do arquivo escolhido pelo usuário
+        pasta (str): Pasta dos comprovantes (padrão: a da aplicação)
+        progresso (callable): Chamada como progresso(bytes_copiados, total) a
+            cada bloco; uma exceção lançada por ela (ex.: CopiaCancelada)
+            interrompe a cópia e descarta o temporário
+
+    Returns:
+        str: Nome do arquivo armazenado (gravado na coluna comprovante)
+    """
+    pasta = pasta or ensure_comprovantes_dir()
+    os.makedirs(pasta, exist_ok=True)
+
+    descritor, temporario = tempfile.mkstemp(prefix='.tmp-', dir=pasta)
+    try:
+        sha256 = _copiar_em_blocos(origem, descritor, progresso)
+        nome = nome_comprovante(sha256.hexdigest(), origem)
+        destino = os.path.join(pasta, subpasta_comprovante(nome), nome)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        if os.path.exists(destino):
+            os.remove(temporario)  # Mesmo conteúdo já armazenado
+            os.utime(destino)  # Reaproveitado: a coleta de órfãos não deve recolhê-lo agora
+        else:
+            os.replace(temporario, destino)
+        return nome
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def guardar_original(origem: str, arquivo: str, pasta: str = None, progresso=None) -> str:
+    """
+    Guarda o arquivo original de um comprovante armazenado recomprimido.
+
+    O original fica em caminho_original(), ligado ao comprovante pelo nome:
+    é excluído junto com ele em liberar_comprovante() e acompanha a coleta
+    de órfãos. Se já houver um original para o mesmo comprovante, ele é mantido.
+
+    Args:
+        origem (str): Arquivo escolhido pelo usuário
+        arquivo (str): Nome do comprovante armazenado (retorno de armazenar_comprovante)
+        pasta (str): Pasta dos comprovantes (padrão: a da aplicação)
+        progresso (callable): Como em armazenar_comprovante()
+
+    Returns:
+        str: Caminho do original guardado
+    """
+    existente = localizar_original(arquivo, pasta)
+    if existente:
+        os.utime(existente)  # Reaproveitado: a coleta de órfãos não deve recolhê-lo agora
+        return existente
+
+    destino = caminho_original(arquivo, os.path.splitext(origem)[1], pasta)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(destino))
+    try:
+        _copiar_em_blocos(origem, descritor, progresso)
+        os.replace(temporario, destino)
+        return destino
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def liberar_comprovante(database, arquivo: str, pasta: str = None) -> bool:
+    """
+    Exclui o arquivo do comprovante (e o original guardado, se houver)
+    quando nenhum cliente o referencia mais.
+
+    Args:
+        database (Database): Banco com a contagem de referências
+        arquivo (str): Nome do arquivo (valor da coluna comprovante)
+        pasta (str): Pasta dos comprovantes (padrão: a da aplicação)
+
+    Returns:
+        bool: True se o arquivo foi excluído
+    """
+    if not arquivo:
+        return False
+    if not database.remover_registro_comprovante(arquivo):
+        return False
+
+    caminho = caminho_comprovante(arquivo, pasta)
+    excluido = False
+    try:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+            excluido = True
+        original = localizar_original(arquivo, pasta)
+        if original:
+            os.remove(original)
+    except OSError as e:
+        print(f"Erro ao excluir comprovante {arquivo}: {e}")
+    return excluido
+
+
+def migrar_para_subpastas(database, pasta: str = None) -> int:
+    """
+    Move os comprovantes da raiz da pasta para as subpastas de hash.
+
+    Arquivos já nomeados pelo hash só mudam de pasta (o nome no banco não
+    muda). Arquivos com nomes antigos são copiados com o nome do hash, as
+    referências são reescritas em uma única transação e só então os
+    originais são apagados; interrompida, a migração pode ser repetida.
+    Depois da migração a raiz só tem subpastas, e a verificação é imediata.
+
+    Args:
+        database (Database): Banco com as referências aos comprovantes
+        pasta (str): Pasta dos comprovantes (padrão: a da aplicação)
+
+    Returns:
+        int: Quantidade de arquivos migrados
+    """
+    pasta = pasta or ensure_comprovantes_dir()
+    with os.scandir(pasta) as entradas:
+        arquivos = [entrada.path for entrada in entradas
+                    if entrada.is_file(follow_symlinks=False) and not entrada.name.startswith('.')
+                    and entrada.name != ARQUIVO_CONFIGURACAO]
+    if not arquivos:
+        return 0
+
+    renomeacoes = {}
+    for caminho in arquivos:
+        nome = os.path.basename(caminho)
+        if _NOME_POR_HASH.match(nome):
+            destino = os.path.join(pasta, subpasta_comprovante(nome), nome)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(caminho, destino)
+        else:
+            renomeacoes[nome] = armazenar_comprovante(caminho, pasta)
+
+    database.renomear_comprovantes(renomeacoes)
+    for nome in renomeacoes:
+        os.remove(os.path.join(pasta, nome))
+    return len(arquivos)
@@ -0,0 +1,52 @@
+# utils/date_helper.py
+from datetime import date, datetime
+from typing import Optional
+
+# Formatos aceitos ao converter textos legados em datas
+FORMATOS_DATA = ("%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S")
+
+
+def data_para_dia(valor) -> Optional[int]:
+    """Converte uma data em número de dia (ordinal gregoriano).
+
+    Aceita date, datetime, int (já convertido) ou texto nos formatos ISO
+    e brasileiro. Retorna None para valores vazios ou inválidos.
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor
+    if isinstance(valor, datetime):
+        return valor.date().toordinal()
+    if isinstance(valor, date):
+        return valor.toordinal()
+
+    texto = str(valor).strip()
+    if not texto or texto.lower() in ('none', 'null'):
+        return None
+
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date().toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def dia_para_data(dia: Optional[int]) -> Optional[date]:
+    """Converte um número de dia em date (ou None)."""
+    if dia is None:
+        return None
+    return date.fromordinal(int(dia))
+
+
+def dia_para_iso(dia: Optional[int]) -> Optional[str]:
+    """Converte um número de dia no texto ISO (YYYY-MM-DD) usado pela interface."""
+    if dia is None:
+        return None
+    return date.fromordinal(int(dia)).isoformat()
+
+
+def hoje_dia() -> int:
+    """Número de dia correspondente à data atual."""
+    return date.today().toordinal()
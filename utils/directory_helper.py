@@ -1,6 +1,18 @@
 import os
 import sys
 
+# Subpasta (dentro dos comprovantes) com as miniaturas de pré-visualização
+PASTA_MINIATURAS = 'miniaturas'
+
+# Subpasta (dentro dos comprovantes) com os originais das versões recomprimidas
+PASTA_ORIGINAIS = 'originais'
+
+# Configuração da entrada de comprovantes, na raiz da pasta dos comprovantes
+ARQUIVO_CONFIGURACAO = 'ingestao.ini'
+
+# Variável de ambiente que troca a pasta dos comprovantes (usada em medições e testes)
+VARIAVEL_PASTA_COMPROVANTES = 'CLIMATERRA_COMPROVANTES'
+
 def get_base_path():
     # Get the base path for the application, works both in development and when compiled
     if getattr(sys, 'frozen', False):
@@ -10,12 +22,24 @@ def get_base_path():
         # If the application is run from a Python interpreter
         return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+def get_resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
 def ensure_comprovantes_dir():
     # Get the base path
     base_path = get_base_path()
     
     # Define the comprovantes directory path
-    if getattr(sys, 'frozen', False):
+    if os.environ.get(VARIAVEL_PASTA_COMPROVANTES):
+        # Alternative folder, e.g. a temporary copy used by medir_inicio.py
+        comprovantes_dir = os.environ[VARIAVEL_PASTA_COMPROVANTES]
+    elif getattr(sys, 'frozen', False):
         # When compiled, create comprovantes in the same directory as the executable
         comprovantes_dir = os.path.join(os.path.dirname(sys.executable), 'comprovantes')
     else:
@@ -26,4 +50,11 @@ def ensure_comprovantes_dir():
     if not os.path.exists(comprovantes_dir):
         os.makedirs(comprovantes_dir)
     
-    return comprovantes_dir
\ No newline at end of file
+    return comprovantes_dir
+
+def ensure_miniaturas_dir():
+    # Thumbnails of the receipts live inside the comprovantes directory
+    miniaturas_dir = os.path.join(ensure_comprovantes_dir(), PASTA_MINIATURAS)
+    if not os.path.exists(miniaturas_dir):
+        os.makedirs(miniaturas_dir)
+    return miniaturas_dir
@@ -0,0 +1,68 @@
+# utils/formatters.py
+from datetime import datetime
+from functools import lru_cache
+
+# Tamanho máximo de cada cache; telefones e documentos são praticamente
+# únicos por cliente, enquanto as datas se repetem muito
+TAMANHO_CACHE_DATAS = 4096
+TAMANHO_CACHE_DOCUMENTOS = 65536
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_DOCUMENTOS)
+def formatar_telefone(telefone: str) -> str:
+    numeros = ''.join(filter(str.isdigit, telefone))
+    if len(numeros) == 11:
+        return f"({numeros[:2]}) {numeros[2:7]}-{numeros[7:]}"
+    # Se não tiver 11 dígitos, retorna o formato original
+    return telefone
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_DOCUMENTOS)
+def formatar_cpf_cnpj(valor: str) -> str:
+    numeros = ''.join(filter(str.isdigit, valor))
+    if len(numeros) == 11:
+        return f"{numeros[:3]}.{numeros[3:6]}.{numeros[6:9]}-{numeros[9:]}"
+    elif len(numeros) == 14:
+        return f"{numeros[:2]}.{numeros[2:5]}.{numeros[5:8]}/{numeros[8:12]}-{numeros[12:]}"
+    return valor
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_DATAS)
+def formatar_data(valor) -> str:
+    """Converte uma data ISO (YYYY-MM-DD) para DD/MM/AAAA; outros valores voltam como texto."""
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").strftime("%d/%m/%Y")
+    except (ValueError, TypeError):
+        return str(valor)
+
+
+_CACHES = {
+    'data': formatar_data,
+    'telefone': formatar_telefone,
+    'cpf_cnpj': formatar_cpf_cnpj,
+}
+
+
+def estatisticas_cache() -> dict:
+    """
+    Retorna o uso dos caches de formatação.
+
+    Returns:
+        dict: Nome do cache -> {'acertos', 'falhas', 'tamanho', 'taxa_acerto'}
+    """
+    estatisticas = {}
+    for nome, funcao in _CACHES.items():
+        info = funcao.cache_info()
+        consultas = info.hits + info.misses
+        estatisticas[nome] = {
+            'acertos': info.hits,
+            'falhas': info.misses,
+            'tamanho': info.currsize,
+            'taxa_acerto': info.hits / consultas if consultas else 0.0,
+        }
+    return estatisticas
+
+
+def limpar_caches() -> None:
+    for funcao in _CACHES.values():
+        funcao.cache_clear()
@@ -0,0 +1,46 @@
+# utils/icon_cache.py
+from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtCore import Qt
+from utils.directory_helper import get_resource_path
+
+# Ícones usados pela interface, carregados uma única vez na inicialização
+ICONES_APLICACAO = (
+    'icones/icone.png', 'icones/add.png', 'icones/edit.png', 'icones/delete.png',
+    'icones/aviso.png', 'icones/search.png', 'icones/refresh.png', 'icones/money.png',
+    'icones/request_quote.png', 'icones/chart.png', 'icones/csv.png',
+    'icones/whatsapp.png', 'icones/check.png'
+)
+
+# Caches do processo: (caminho, largura, altura) -> QPixmap e caminho -> QIcon
+_pixmaps = {}
+_icones = {}
+
+
+def obter_pixmap(caminho_relativo: str, largura: int = None, altura: int = None) -> QPixmap:
+    """Retorna o pixmap do recurso, decodificado e redimensionado apenas na primeira vez."""
+    chave = (caminho_relativo, largura, altura)
+    pixmap = _pixmaps.get(chave)
+    if pixmap is None:
+        if largura is None and altura is None:
+            pixmap = QPixmap(get_resource_path(caminho_relativo))
+        else:
+            original = obter_pixmap(caminho_relativo)
+            pixmap = original.scaled(largura or original.width(), altura or original.height(),
+                                     Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        _pixmaps[chave] = pixmap
+    return pixmap
+
+
+def obter_icone(caminho_relativo: str) -> QIcon:
+    """Retorna o QIcon do recurso, compartilhado por todas as janelas."""
+    icone = _icones.get(caminho_relativo)
+    if icone is None:
+        icone = QIcon(obter_pixmap(caminho_relativo))
+        _icones[caminho_relativo] = icone
+    return icone
+
+
+def precarregar_icones() -> None:
+    """Decodifica os ícones da aplicação de uma vez (requer QApplication criado)."""
+    for caminho in ICONES_APLICACAO:
+        obter_icone(caminho)
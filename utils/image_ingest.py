@@ -0,0 +1,392 @@
+# utils/image_ingest.py
+import configparser
+import os
+import tempfile
+import threading
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, QEventLoop, pyqtSignal
+from PyQt5.QtGui import QImageReader
+
+from utils.comprovante_store import CopiaCancelada, armazenar_comprovante, guardar_original
+from utils.directory_helper import ARQUIVO_CONFIGURACAO
+
+# Padrões da entrada de comprovantes: maior lado (px) e qualidade JPEG da
+# versão armazenada, e se o arquivo original também deve ser guardado.
+# Valem quando o arquivo de configuração não define outro valor.
+LADO_MAXIMO_COMPROVANTE = 2400
+QUALIDADE_COMPROVANTE = 80
+MANTER_ORIGINAL = False
+
+# Seção do ARQUIVO_CONFIGURACAO (lido a cada entrada) com as opções acima
+SECAO_CONFIGURACAO = 'comprovantes'
+
+
+def _nova_configuracao() -> configparser.ConfigParser:
+    parser = configparser.ConfigParser()
+    parser.BOOLEAN_STATES = dict(parser.BOOLEAN_STATES, sim=True, nao=False, **{'não': False})
+    return parser
+
+
+def ler_configuracao_ingestao(pasta: str) -> dict:
+    """
+    Lê a configuração da entrada de comprovantes.
+
+    Cada chave ausente ou inválida fica com o padrão do módulo.
+
+    Args:
+        pasta (str): Pasta dos comprovantes (onde fica ARQUIVO_CONFIGURACAO)
+
+    Returns:
+        dict: {'lado_maximo': int, 'qualidade': int, 'manter_original': bool}
+    """
+    configuracao = {
+        'lado_maximo': LADO_MAXIMO_COMPROVANTE,
+        'qualidade': QUALIDADE_COMPROVANTE,
+        'manter_original': MANTER_ORIGINAL,
+    }
+    arquivo = os.path.join(pasta, ARQUIVO_CONFIGURACAO)
+    parser = _nova_configuracao()
+    try:
+        parser.read(arquivo, encoding='utf-8')
+    except configparser.Error as e:
+        print(f"Erro ao ler {arquivo}: {e}")
+        return configuracao
+    if not parser.has_section(SECAO_CONFIGURACAO):
+        return configuracao
+
+    secao = parser[SECAO_CONFIGURACAO]
+    validos = {
+        'lado_maximo': (secao.getint, lambda valor: valor >= 1),
+        'qualidade': (secao.getint, lambda valor: 0 <= valor <= 100),
+        'manter_original': (secao.getboolean, lambda valor: True),
+    }
+    for chave, (ler, valido) in validos.items():
+        try:
+            valor = ler(chave, configuracao[chave])
+        except ValueError as e:
+            print(f"Configuração inválida em {arquivo} ({chave}): {e}")
+            continue
+        if valido(valor):
+            configuracao[chave] = valor
+        else:
+            print(f"Configuração inválida em {arquivo}: {chave} = {valor}")
+    return configuracao
+
+
+def gravar_configuracao_ingestao(pasta: str, **valores) -> dict:
+    """
+    Altera a configuração da entrada de comprovantes.
+
+    Args:
+        pasta (str): Pasta dos comprovantes
+        **valores: lado_maximo, qualidade e/ou manter_original (None mantém o atual)
+
+    Returns:
+        dict: Configuração resultante, como em ler_configuracao_ingestao()
+    """
+    configuracao = ler_configuracao_ingestao(pasta)
+    configuracao.update({chave: valor for chave, valor in valores.items()
+                         if chave in configuracao and valor is not None})
+    if configuracao['lado_maximo'] < 1 or not 0 <= configuracao['qualidade'] <= 100:
+        raise ValueError('Lado máximo deve ser positivo e qualidade entre 0 e 100')
+
+    parser = _nova_configuracao()
+    parser[SECAO_CONFIGURACAO] = {
+        'lado_maximo': str(configuracao['lado_maximo']),
+        'qualidade': str(configuracao['qualidade']),
+        'manter_original': 'sim' if configuracao['manter_original'] else 'nao',
+    }
+    os.makedirs(pasta, exist_ok=True)
+    arquivo = os.path.join(pasta, ARQUIVO_CONFIGURACAO)
+    temporario = arquivo + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as saida:
+        parser.write(saida)
+    os.replace(temporario, arquivo)
+    return configuracao
+
+
+def recomprimir_imagem(origem: str, destino: str, lado_maximo: int = LADO_MAXIMO_COMPROVANTE,
+                       qualidade: int = QUALIDADE_COMPROVANTE, economia_minima: float = 0.0) -> bool:
+    """
+    Reduz a imagem ao lado máximo e a regrava como JPEG.
+
+    Pode ser chamada fora da thread da interface (e em outros processos).
+
+    Args:
+        origem (str): Imagem original
+        destino (str): Caminho do JPEG gerado
+        lado_maximo (int): Maior lado permitido, em pixels
+        qualidade (int): Qualidade JPEG (0 a 100)
+        economia_minima (float): Redução mínima (fração do tamanho original)
+            para a nova versão valer a perda de qualidade
+
+    Returns:
+        bool: True se o JPEG foi gravado e ficou menor que o original; caso
+        contrário nada é gravado e o original deve ser usado como está
+    """
+    leitor = QImageReader(origem)
+    leitor.setAutoTransform(True)
+    tamanho = leitor.size()
+    if not tamanho.isValid():
+        return False  # Não é uma imagem legível: guarda o arquivo como veio
+
+    if max(tamanho.width(), tamanho.height()) > lado_maximo:
+        leitor.setScaledSize(tamanho.scaled(QSize(lado_maximo, lado_maximo), Qt.KeepAspectRatio))
+
+    imagem = leitor.read()
+    if imagem.isNull():
+        return False
+
+    if not imagem.save(destino, 'JPG', qualidade):
+        raise OSError(f'Falha ao gravar imagem recomprimida: {destino}')
+
+    tamanho_original = os.path.getsize(origem)
+    tamanho_novo = os.path.getsize(destino)
+    if tamanho_novo >= tamanho_original or tamanho_novo > tamanho_original * (1 - economia_minima):
+        os.remove(destino)
+        return False
+    return True
+
+
+def preparar_comprovante(origem: str, pasta: str, lado_maximo: int = None, qualidade: int = None) -> str:
+    """
+    Gera a versão a ser armazenada de um comprovante.
+
+    Lado máximo e qualidade não informados vêm da configuração da pasta.
+
+    Returns:
+        str: Caminho de um JPEG temporário (dentro da pasta, a ser apagado
+        após o armazenamento) ou o próprio caminho de origem
+    """
+    if lado_maximo is None or qualidade is None:
+        configuracao = ler_configuracao_ingestao(pasta)
+        lado_maximo = configuracao['lado_maximo'] if lado_maximo is None else lado_maximo
+        qualidade = configuracao['qualidade'] if qualidade is None else qualidade
+    os.makedirs(pasta, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix='.ingest-', suffix='.jpg', dir=pasta)
+    os.close(descritor)
+    try:
+        if recomprimir_imagem(origem, temporario, lado_maximo, qualidade):
+            return temporario
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    return origem
+
+
+class SinaisIngestao(QObject):
+    pronto = pyqtSignal(str, str)  # arquivo escolhido, arquivo a armazenar
+    falhou = pyqtSignal(str, str)  # arquivo escolhido, mensagem
+
+
+class TarefaIngestao(QRunnable):
+    """Prepara (reduz e recomprime) o comprovante escolhido em segundo plano."""
+
+    def __init__(self, origem: str, pasta: str, descartada: threading.Event, trava: threading.Lock):
+        super().__init__()
+        self.origem = origem
+        self.pasta = pasta
+        self.descartada = descartada
+        self.trava = trava
+        self.preparado = None
+        self.sinais = SinaisIngestao()
+
+    def run(self):
+        try:
+            preparado = preparar_comprovante(self.origem, self.pasta)
+        except Exception as e:
+            print(f"Erro ao preparar comprovante {self.origem}: {e}")
+            self.sinais.falhou.emit(self.origem, str(e))
+            return
+        with self.trava:
+            if self.descartada.is_set():
+                # Ninguém mais espera o resultado (o diálogo pode já ter sido fechado)
+                if preparado != self.origem and os.path.exists(preparado):
+                    os.remove(preparado)
+                return
+            self.preparado = preparado
+        self.sinais.pronto.emit(self.origem, preparado)
+
+
+class SinaisArmazenamento(QObject):
+    progresso = pyqtSignal(int)  # percentual copiado
+    concluido = pyqtSignal(str)  # nome do arquivo armazenado
+    falhou = pyqtSignal(str)  # mensagem
+    cancelado = pyqtSignal()
+
+
+class TarefaArmazenamento(QRunnable):
+    """Copia o comprovante preparado para a pasta (e o original, se a configuração pedir)."""
+
+    def __init__(self, preparado: str, origem: str, pasta: str, cancelar: threading.Event):
+        super().__init__()
+        self.preparado = preparado
+        self.origem = origem
+        self.pasta = pasta
+        self.cancelar = cancelar
+        self.sinais = SinaisArmazenamento()
+
+    def _progresso(self, copiados: int, total: int):
+        if self.cancelar.is_set():
+            raise CopiaCancelada()
+        self.sinais.progresso.emit(copiados * 100 // total if total else 100)
+
+    def run(self):
+        try:
+            nome = armazenar_comprovante(self.preparado, self.pasta, self._progresso)
+            if self.preparado != self.origem and ler_configuracao_ingestao(self.pasta)['manter_original']:
+                guardar_original(self.origem, nome, self.pasta, self._progresso)
+        except CopiaCancelada:
+            self.sinais.cancelado.emit()
+            return
+        except Exception as e:
+            print(f"Erro ao armazenar comprovante {self.origem}: {e}")
+            self.sinais.falhou.emit(str(e))
+            return
+        self.sinais.concluido.emit(nome)
+
+
+class PreparacaoComprovante:
+    """Acompanha, em um diálogo, a preparação do comprovante escolhido pelo usuário.
+
+    A preparação começa assim que o arquivo é escolhido; ao salvar, a cópia
+    para a pasta também roda em segundo plano e o diálogo continua respondendo.
+    """
+
+    def __init__(self, origem: str, pasta: str):
+        self.origem = origem
+        self.pasta = pasta
+        self.preparado = None
+        self.concluida = False
+        self.descartada = False
+        self.cancelada = False
+        self._loop = None
+        self._cancelar_copia = threading.Event()
+        self._copiando = False
+        self._nome = None
+        self._erro = None
+        self._descarte = threading.Event()
+        self._trava = threading.Lock()
+
+        # A tarefa é mantida para que descartar() encontre o temporário mesmo
+        # antes de o sinal "pronto" chegar
+        self._tarefa = TarefaIngestao(origem, pasta, self._descarte, self._trava)
+        self.sinais = self._tarefa.sinais
+        self.sinais.pronto.connect(self._pronto)
+        self.sinais.falhou.connect(self._falhou)
+        QThreadPool.globalInstance().start(self._tarefa)
+
+    def _pronto(self, origem, preparado):
+        self._concluir(preparado)
+
+    def _falhou(self, origem, mensagem):
+        self._concluir(self.origem)  # Armazena o arquivo como veio
+
+    def _concluir(self, preparado):
+        self.preparado = preparado
+        self.concluida = True
+        if self.descartada:
+            self._remover_temporario()
+        self._acordar()
+
+    def _acordar(self):
+        if self._loop is not None:
+            self._loop.quit()
+
+    def _esperar(self):
+        self._loop = QEventLoop()
+        self._loop.exec_()
+        self._loop = None
+
+    def _remover_temporario(self):
+        if self.preparado and self.preparado != self.origem and os.path.exists(self.preparado):
+            os.remove(self.preparado)
+
+    def descartar(self):
+        """Abandona a preparação (outro arquivo escolhido ou diálogo fechado): o temporário é apagado."""
+        self.descartada = True
+        with self._trava:
+            self._descarte.set()
+            if self.preparado is None:
+                self.preparado = self._tarefa.preparado
+        if self.concluida or self.preparado is not None:
+            self._remover_temporario()
+
+    def cancelar(self):
+        """Interrompe a espera ou a cópia em andamento; armazenar() lança CopiaCancelada."""
+        self.cancelada = True
+        self._cancelar_copia.set()
+        self._acordar()
+
+    def aguardar(self) -> str:
+        """Espera a preparação (mantendo a interface viva) e retorna o arquivo a armazenar."""
+        while not self.concluida and not self.cancelada:
+            self._esperar()
+        return self.preparado
+
+    def _copia_concluida(self, nome):
+        self._nome = nome
+        self._copia_encerrada()
+
+    def _copia_falhou(self, mensagem):
+        self._erro = OSError(mensagem)
+        self._copia_encerrada()
+
+    def _copia_cancelada(self):
+        self._erro = CopiaCancelada()
+        self._copia_encerrada()
+
+    def _copia_encerrada(self):
+        self._copiando = False
+        self._acordar()
+
+    def armazenar(self, progresso=None) -> str:
+        """
+        Armazena a versão preparada (e o original, se a configuração pedir).
+
+        A cópia roda em segundo plano; enquanto isso os eventos da interface
+        continuam sendo processados. Só retorna depois que o arquivo está
+        gravado em disco, então o cliente pode ser salvo no banco em seguida.
+
+        Args:
+            progresso (QProgressDialog): Diálogo atualizado com o percentual
+                copiado; o botão de cancelar interrompe o armazenamento
+
+        Returns:
+            str: Nome do arquivo armazenado (valor da coluna comprovante)
+
+        Raises:
+            CopiaCancelada: O usuário cancelou (nada foi gravado)
+        """
+        self.cancelada = False
+        self._cancelar_copia.clear()
+        if progresso is not None:
+            progresso.canceled.connect(self.cancelar)
+
+        preparado = self.aguardar()
+        if self.cancelada:
+            raise CopiaCancelada()
+
+        self._nome = self._erro = None
+        self._copiando = True
+        tarefa = TarefaArmazenamento(preparado, self.origem, self.pasta, self._cancelar_copia)
+        self.sinais_armazenamento = tarefa.sinais
+        self.sinais_armazenamento.concluido.connect(self._copia_concluida)
+        self.sinais_armazenamento.falhou.connect(self._copia_falhou)
+        self.sinais_armazenamento.cancelado.connect(self._copia_cancelada)
+        if progresso is not None:
+            progresso.setRange(0, 100)
+            self.sinais_armazenamento.progresso.connect(progresso.setValue)
+        QThreadPool.globalInstance().start(tarefa)
+
+        # Mesmo cancelada, espera a tarefa terminar: ela apaga o próprio temporário
+        while self._copiando:
+            self._esperar()
+        if self._erro is not None:
+            raise self._erro
+
+        self._remover_temporario()
+        return self._nome
@@ -0,0 +1,351 @@
+# utils/notificacoes.py
+"""Envio dos avisos gravados na caixa de saída (tabela avisos_saida).
+
+O despachante reserva um lote de avisos, entrega cada um pelo transporte
+configurado e grava o resultado do lote de uma vez. Um transporte é qualquer
+objeto com:
+
+    lote (int): avisos reservados por vez
+    concorrencia (int): envios simultâneos
+    intervalo (float): espera mínima, em segundos, entre o início de dois envios
+    enviar(telefone, mensagem): entrega a mensagem ou lança ErroEnvio
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal, pyqtSlot
+
+from database.database import Database, AVISO_ENVIADO, AVISO_FALHOU, AVISO_PENDENTE
+from utils.whatsapp import abrir_link_whatsapp, telefone_whatsapp, url_whatsapp
+
+# Gateway HTTP de mensagens; sem ele os avisos são abertos no wa.me
+URL_GATEWAY = None
+TOKEN_GATEWAY = None
+TEMPO_LIMITE_GATEWAY = 15  # segundos por requisição
+LOTE_GATEWAY = 50
+ENVIOS_SIMULTANEOS_GATEWAY = 4
+INTERVALO_GATEWAY = 0.1
+
+# Abrir centenas de conversas de uma vez trava o navegador e pode levar o
+# número a ser bloqueado pelo WhatsApp: um link por vez, espaçados
+INTERVALO_WAME = 8.0
+# Espera máxima (s) pela interface ao abrir um link
+TEMPO_LIMITE_ABERTURA = 15
+
+# Novas tentativas: espera dobra a cada falha (com variação de ±10% para
+# não sincronizar os reenvios), até o máximo; depois o aviso é desistido
+MAXIMO_TENTATIVAS_AVISO = 5
+ATRASO_INICIAL_AVISO = 60
+ATRASO_MAXIMO_AVISO = 60 * 60
+VARIACAO_ATRASO_AVISO = 0.1
+
+# Maior espera do despachante antes de consultar a fila de novo
+ESPERA_MAXIMA_FILA = 60
+# Granularidade das esperas (resposta a pausar/parar)
+PASSO_ESPERA = 0.2
+
+_pool_despacho = None
+
+
+class ErroEnvio(Exception):
+    """Falha na entrega de um aviso; se definitiva, não há nova tentativa."""
+
+    def __init__(self, mensagem: str, definitivo: bool = False):
+        super().__init__(mensagem)
+        self.definitivo = definitivo
+
+
+class _AberturaLinks(QObject):
+    """Abre os links na thread da interface, a pedido da thread do despachante."""
+
+    pedido = pyqtSignal(str, object)  # link, resposta {'aberto': bool, 'pronto': Event}
+
+    def __init__(self):
+        super().__init__()
+        self.pedido.connect(self._abrir)
+
+    @pyqtSlot(str, object)
+    def _abrir(self, url, resposta):
+        try:
+            resposta['aberto'] = abrir_link_whatsapp(url)
+        except Exception as e:
+            print(f"Erro ao abrir o WhatsApp: {e}")
+        finally:
+            resposta['pronto'].set()
+
+
+class TransporteWaMe:
+    """Abre o link wa.me de cada aviso; o envio em si é confirmado pelo usuário no WhatsApp."""
+
+    lote = 1
+    concorrencia = 1
+
+    def __init__(self, intervalo: float = INTERVALO_WAME):
+        self.intervalo = intervalo
+        # Criado na thread da interface, onde os links precisam ser abertos
+        self._abertura = _AberturaLinks()
+        app = QCoreApplication.instance()
+        if app is not None:
+            self._abertura.moveToThread(app.thread())
+
+    def enviar(self, telefone: str, mensagem: str) -> None:
+        url = url_whatsapp(telefone, mensagem)
+        if url is None:
+            raise ErroEnvio('telefone inválido', definitivo=True)
+        resposta = {'aberto': False, 'pronto': threading.Event()}
+        self._abertura.pedido.emit(url, resposta)
+        if not resposta['pronto'].wait(TEMPO_LIMITE_ABERTURA):
+            raise ErroEnvio('a interface não respondeu ao abrir o link')
+        if not resposta['aberto']:
+            raise ErroEnvio('não foi possível abrir o link do WhatsApp')
+
+
+class TransporteHttp:
+    """Entrega os avisos a um gateway HTTP de mensagens.
+
+    Cada aviso é um POST com o corpo JSON {"telefone": "55...", "mensagem": "..."}
+    (e "Authorization: Bearer <token>", se houver token). Respostas 2xx são
+    entregas; 408, 429, 5xx e falhas de conexão são tentadas de novo; os
+    demais 4xx são definitivos.
+    """
+
+    def __init__(self, url: str, token: str = None, lote: int = LOTE_GATEWAY,
+                 concorrencia: int = ENVIOS_SIMULTANEOS_GATEWAY, intervalo: float = INTERVALO_GATEWAY,
+                 tempo_limite: float = TEMPO_LIMITE_GATEWAY):
+        self.url = url
+        self.token = token
+        self.lote = lote
+        self.concorrencia = concorrencia
+        self.intervalo = intervalo
+        self.tempo_limite = tempo_limite
+
+    def enviar(self, telefone: str, mensagem: str) -> None:
+        # Importados só quando há gateway: não pesam na abertura da aplicação
+        import json
+        import urllib.error
+        import urllib.request
+
+        numero = telefone_whatsapp(telefone)
+        if numero is None:
+            raise ErroEnvio('telefone inválido', definitivo=True)
+        cabecalhos = {'Content-Type': 'application/json; charset=utf-8'}
+        if self.token:
+            cabecalhos['Authorization'] = f'Bearer {self.token}'
+        corpo = json.dumps({'telefone': numero, 'mensagem': mensagem}).encode('utf-8')
+        requisicao = urllib.request.Request(self.url, data=corpo, headers=cabecalhos, method='POST')
+        try:
+            with urllib.request.urlopen(requisicao, timeout=self.tempo_limite) as resposta:
+                resposta.read()
+        except urllib.error.HTTPError as e:
+            definitivo = 400 <= e.code < 500 and e.code not in (408, 429)
+            raise ErroEnvio(f'gateway respondeu HTTP {e.code}', definitivo) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise ErroEnvio(f'gateway inacessível: {getattr(e, "reason", e)}') from e
+
+
+def transporte_padrao():
+    """Gateway HTTP se URL_GATEWAY estiver configurado; senão, os links wa.me."""
+    if URL_GATEWAY:
+        return TransporteHttp(URL_GATEWAY, TOKEN_GATEWAY)
+    return TransporteWaMe()
+
+
+def atraso_nova_tentativa(tentativas: int) -> float:
+    """Espera, em segundos, antes da próxima tentativa após `tentativas` falhas."""
+    atraso = min(ATRASO_MAXIMO_AVISO, ATRASO_INICIAL_AVISO * 2 ** (tentativas - 1))
+    return atraso * random.uniform(1 - VARIACAO_ATRASO_AVISO, 1 + VARIACAO_ATRASO_AVISO)
+
+
+class EspacamentoEnvios:
+    """Distribui o início dos envios, de todas as threads, a pelo menos `transporte.intervalo` segundos."""
+
+    def __init__(self, transporte):
+        self.transporte = transporte
+        self._trava = threading.Lock()
+        self._proximo = 0.0
+
+    def aguardar(self, continuar=None) -> bool:
+        """Espera a vez do próximo envio; retorna False se `continuar()` deixou de valer."""
+        with self._trava:
+            agora = time.monotonic()
+            inicio = max(agora, self._proximo)
+            self._proximo = inicio + self.transporte.intervalo
+        while True:
+            if continuar is not None and not continuar():
+                return False
+            restante = inicio - time.monotonic()
+            if restante <= 0:
+                return True
+            time.sleep(min(restante, PASSO_ESPERA))
+
+
+def _resultado_falha(aviso: tuple, erro: ErroEnvio) -> tuple:
+    aviso_id, cliente_id, _, _, tentativas = aviso
+    tentativas += 1
+    if erro.definitivo or tentativas >= MAXIMO_TENTATIVAS_AVISO:
+        return aviso_id, cliente_id, AVISO_FALHOU, str(erro), None
+    return aviso_id, cliente_id, AVISO_PENDENTE, str(erro), time.time() + atraso_nova_tentativa(tentativas)
+
+
+def despachar_lote(database, transporte, espacamento: EspacamentoEnvios = None, continuar=None) -> list:
+    """
+    Reserva um lote da fila, envia (até transporte.concorrencia ao mesmo
+    tempo) e grava todos os resultados em uma única transação.
+
+    Args:
+        database (Database): Banco com a caixa de saída
+        transporte: Meio de entrega (TransporteWaMe, TransporteHttp...)
+        espacamento (EspacamentoEnvios): Limite de ritmo compartilhado entre lotes
+        continuar (callable): Consultado antes de cada envio; se retornar
+            False, os avisos ainda não enviados voltam para a fila
+
+    Returns:
+        list: [(aviso_id, cliente_id, estado, erro, proxima_tentativa)] dos avisos enviados ou com falha
+    """
+    reservados = database.reservar_avisos(transporte.lote)
+    if not reservados:
+        return []
+    espacamento = espacamento or EspacamentoEnvios(transporte)
+
+    def enviar(aviso):
+        if not espacamento.aguardar(continuar):
+            return None
+        aviso_id, cliente_id, telefone, mensagem, _ = aviso
+        try:
+            transporte.enviar(telefone, mensagem)
+        except ErroEnvio as e:
+            return _resultado_falha(aviso, e)
+        except Exception as e:
+            print(f"Erro ao enviar o aviso {aviso_id}: {e}")
+            return _resultado_falha(aviso, ErroEnvio(str(e)))
+        return aviso_id, cliente_id, AVISO_ENVIADO, None, None
+
+    with ThreadPoolExecutor(max_workers=max(1, transporte.concorrencia)) as executor:
+        resultados = list(executor.map(enviar, reservados))
+
+    devolvidos = [aviso[0] for aviso, resultado in zip(reservados, resultados) if resultado is None]
+    resultados = [resultado for resultado in resultados if resultado is not None]
+    database.registrar_entregas(resultados)
+    if devolvidos:
+        database.devolver_avisos(devolvidos)
+    return resultados
+
+
+class SinaisDespacho(QObject):
+    processados = pyqtSignal(object)  # resultados de um lote (ver despachar_lote)
+    encerrado = pyqtSignal()
+    falhou = pyqtSignal(str)
+
+
+class TarefaDespacho(QRunnable):
+    """Esvazia a caixa de saída em segundo plano, com conexão própria, até não restar aviso."""
+
+    def __init__(self, despachante: 'DespachanteAvisos'):
+        super().__init__()
+        self.despachante = despachante
+        self.sinais = SinaisDespacho()
+
+    def run(self):
+        despachante = self.despachante
+        try:
+            database = Database(despachante.db_name)
+            try:
+                espacamento = EspacamentoEnvios(despachante.transporte)
+                while not despachante.parado:
+                    if despachante.pausado:
+                        despachante.esperar(ESPERA_MAXIMA_FILA)
+                        continue
+                    resultados = despachar_lote(database, despachante.transporte, espacamento, despachante.ativo)
+                    if resultados:
+                        self.sinais.processados.emit(resultados)
+                        continue
+                    proxima = database.proxima_tentativa_aviso()
+                    if proxima is None:
+                        if despachante.encerrar_se_ocioso():
+                            break
+                        continue
+                    # Só há novas tentativas agendadas: dorme até a primeira (ou até ser acordado)
+                    despachante.esperar(min(max(proxima - time.time(), 0.0), ESPERA_MAXIMA_FILA))
+            finally:
+                database.fechar_conexao()
+                despachante.encerrar_se_ocioso(forcar=True)
+        except Exception as e:
+            print(f"Erro no envio de avisos: {e}")
+            self.sinais.falhou.emit(str(e))
+            return
+        self.sinais.encerrado.emit()
+
+
+class DespachanteAvisos(QObject):
+    """Controla a tarefa de envio: inicia quando há avisos, pausa, retoma e para.
+
+    Os métodos de consulta (ativo, esperar...) são chamados pela thread da tarefa.
+    """
+
+    processados = pyqtSignal(object)  # resultados de cada lote enviado
+    falhou = pyqtSignal(str)
+
+    def __init__(self, db_name: str, transporte=None, parent=None):
+        super().__init__(parent)
+        self.db_name = db_name
+        self.transporte = transporte or transporte_padrao()
+        self.pausado = False
+        self.parado = False
+        self._em_execucao = False
+        self._acordado = False
+        self._trava = threading.Lock()
+        self._sinal = threading.Event()
+
+    def acordar(self):
+        """Avisa que há avisos novos na fila; inicia a tarefa se ela não estiver rodando."""
+        with self._trava:
+            self._acordado = True
+            self._sinal.set()
+            if self._em_execucao or self.parado:
+                return
+            self._em_execucao = True
+        tarefa = TarefaDespacho(self)
+        self.sinais_tarefa = tarefa.sinais
+        self.sinais_tarefa.processados.connect(self.processados.emit)
+        self.sinais_tarefa.falhou.connect(self.falhou.emit)
+        pool_despacho().start(tarefa)
+
+    def pausar(self):
+        self.pausado = True
+        self._sinal.set()
+
+    def continuar(self):
+        self.pausado = False
+        self._sinal.set()
+
+    def parar(self):
+        """Encerra a tarefa; avisos reservados e não enviados voltam para a fila."""
+        self.parado = True
+        self._sinal.set()
+
+    def ativo(self) -> bool:
+        return not self.parado and not self.pausado
+
+    def esperar(self, segundos: float):
+        self._sinal.wait(segundos)
+        self._sinal.clear()
+
+    def encerrar_se_ocioso(self, forcar: bool = False) -> bool:
+        """Chamado pela tarefa com a fila vazia: encerra, a menos que tenha sido acordada nesse meio tempo."""
+        with self._trava:
+            if self._acordado and not forcar:
+                self._acordado = False
+                return False
+            self._em_execucao = False
+            return True
+
+
+def pool_despacho() -> QThreadPool:
+    """Pool próprio da tarefa de envio, que passa a maior parte do tempo esperando."""
+    global _pool_despacho
+    if _pool_despacho is None:
+        _pool_despacho = QThreadPool()
+        _pool_despacho.setMaxThreadCount(1)
+    return _pool_despacho
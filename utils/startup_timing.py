@@ -0,0 +1,129 @@
+# utils/startup_timing.py
+import os
+import subprocess
+import sys
+import time
+
+from PyQt5.QtCore import QEvent, QObject, QTimer
+
+# Orçamentos da inicialização, em milissegundos
+ORCAMENTO_IMPORTACAO_MS = 300
+ORCAMENTO_PRIMEIRA_PINTURA_MS = 1000
+ORCAMENTO_TABELA_MS = 2000
+
+MODULO_JANELA = 'views.main_window'
+
+
+def medir_importacao(modulo: str = MODULO_JANELA, quantidade: int = 10):
+    """
+    Importa o módulo em um processo novo com `python -X importtime`.
+
+    Args:
+        modulo (str): Módulo a importar
+        quantidade (int): Quantos módulos mais lentos listar
+
+    Returns:
+        Tuple[float, list]: Tempo total da importação (ms) e os módulos mais
+        lentos como (tempo próprio em ms, nome)
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        capture_output=True, text=True, cwd=raiz
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f'Falha ao importar {modulo}:\n{resultado.stderr}')
+
+    total_ms = 0.0
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        # Formato: "import time: <próprio us> | <acumulado us> | <módulo>"
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        nome = nome.strip()
+        modulos.append((int(proprio) / 1000, nome))
+        if nome == modulo:
+            total_ms = int(acumulado) / 1000
+
+    modulos.sort(reverse=True)
+    return total_ms, modulos[:quantidade]
+
+
+class _ObservadorPintura(QObject):
+    """Guarda o instante do primeiro evento de pintura da aplicação."""
+
+    def __init__(self, inicio: float):
+        super().__init__()
+        self.inicio = inicio
+        self.primeira_pintura_ms = None
+
+    def eventFilter(self, objeto, evento):
+        if self.primeira_pintura_ms is None and evento.type() == QEvent.Paint:
+            self.primeira_pintura_ms = (time.perf_counter() - self.inicio) * 1000
+        return False
+
+
+def medir_inicializacao(app) -> dict:
+    """
+    Abre a janela principal e mede cada etapa da inicialização.
+
+    A janela abre o banco e os comprovantes da pasta atual: use pelo
+    medir_inicio.py, que prepara uma cópia temporária dos dados.
+
+    Args:
+        app (QApplication): Aplicação já criada
+
+    Returns:
+        dict: Tempos em ms ('importacao', 'janela', 'primeira_pintura', 'tabela')
+    """
+    inicio = time.perf_counter()
+    observador = _ObservadorPintura(inicio)
+    app.installEventFilter(observador)
+
+    from views.main_window import MainWindow
+    tempos = {'importacao': (time.perf_counter() - inicio) * 1000}
+
+    janela = MainWindow()
+    tempos['janela'] = (time.perf_counter() - inicio) * 1000
+
+    def concluir():
+        tempos['tabela'] = (time.perf_counter() - inicio) * 1000
+        # Mais uma volta no loop para garantir a pintura da tabela preenchida
+        QTimer.singleShot(0, app.quit)
+
+    janela.carregamentoConcluido.connect(concluir)
+    app.exec_()
+
+    app.removeEventFilter(observador)
+    tempos['primeira_pintura'] = observador.primeira_pintura_ms
+    janela.close()
+    return tempos
+
+
+def executar_medicao(app) -> int:
+    """Imprime o relatório de inicialização e retorna 0 se tudo ficou dentro do orçamento."""
+    importacao_ms, mais_lentos = medir_importacao()
+    tempos = medir_inicializacao(app)
+
+    print(f'Importação de {MODULO_JANELA} (-X importtime): {importacao_ms:.0f} ms '
+          f'(orçamento {ORCAMENTO_IMPORTACAO_MS} ms)')
+    for proprio_ms, nome in mais_lentos:
+        print(f'    {proprio_ms:8.1f} ms  {nome}')
+    print(f"Janela construída: {tempos['janela']:.0f} ms")
+
+    primeira_pintura = tempos['primeira_pintura']
+    if primeira_pintura is None:
+        print('Primeira pintura: não detectada')
+    else:
+        print(f'Primeira pintura: {primeira_pintura:.0f} ms (orçamento {ORCAMENTO_PRIMEIRA_PINTURA_MS} ms)')
+    print(f"Tabela carregada: {tempos['tabela']:.0f} ms (orçamento {ORCAMENTO_TABELA_MS} ms)")
+
+    dentro_do_orcamento = (
+        importacao_ms <= ORCAMENTO_IMPORTACAO_MS
+        and primeira_pintura is not None
+        and primeira_pintura <= ORCAMENTO_PRIMEIRA_PINTURA_MS
+        and tempos['tabela'] <= ORCAMENTO_TABELA_MS
+    )
+    print('Dentro do orçamento' if dentro_do_orcamento else 'ACIMA DO ORÇAMENTO')
+    return 0 if dentro_do_orcamento else 1
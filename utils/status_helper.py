@@ -1,11 +1,58 @@
 # status_helper.py
-from datetime import datetime
+from datetime import date, datetime
+from numbers import Integral
+
+# Número de dias antes do vencimento em que o cliente passa a "Expirando"
+DIAS_EXPIRANDO = 5
+
+# Códigos devolvidos por calcular_status_lote (índices de STATUS_CODIGOS)
+STATUS_CODIGOS = ("Em dia", "Expirando", "Inadimplente", "Data inválida")
+CODIGO_EM_DIA, CODIGO_EXPIRANDO, CODIGO_INADIMPLENTE, CODIGO_DATA_INVALIDA = range(4)
+
+# Ordinal gregoriano de 1970-01-01, origem do datetime64 do NumPy
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def status_por_dias(dias_restantes: int) -> str:
+    """Status correspondente à quantidade de dias até o vencimento"""
+    if dias_restantes < 0:
+        return "Inadimplente"
+    elif dias_restantes <= DIAS_EXPIRANDO:
+        return "Expirando"
+    else:
+        return "Em dia"
+
+
+def proxima_transicao(vencimento: int, hoje: int):
+    """Número do dia em que o status atual deixa de valer (None se não muda mais).
+
+    Args:
+        vencimento (int): Vencimento como número de dia (ou None)
+        hoje (int): Número de dia de referência
+
+    Returns:
+        Optional[int]: Dia em que o cliente passa a Expirando ou a Inadimplente
+    """
+    if vencimento is None or vencimento < hoje:
+        return None
+    if vencimento - hoje <= DIAS_EXPIRANDO:
+        return vencimento + 1
+    return vencimento - DIAS_EXPIRANDO
+
 
 def calcular_status(vencimento, hoje=None) -> str:
     """Calcula o status considerando múltiplos formatos de data"""
     if hoje is None:
         hoje = datetime.now().date()
 
+    # Números de dia (formato do banco) são comparados diretamente
+    if isinstance(vencimento, int) and not isinstance(vencimento, bool):
+        hoje_dia = hoje if isinstance(hoje, int) else hoje.toordinal()
+        return status_por_dias(vencimento - hoje_dia)
+
+    if isinstance(hoje, int):
+        hoje = date.fromordinal(hoje)
+
     # Converte strings para date
     if isinstance(vencimento, str):
         try:
@@ -20,9 +67,89 @@ def calcular_status(vencimento, hoje=None) -> str:
 
     dias_restantes = (vencimento - hoje).days
 
-    if dias_restantes < 0:
-        return "Inadimplente"
-    elif dias_restantes <= 5:
-        return "Expirando"
+    return status_por_dias(dias_restantes)
+
+
+def _vencimento_para_ordinal(vencimento):
+    """Ordinal do vencimento aceito por calcular_status, ou NaN se inválido/ausente."""
+    if isinstance(vencimento, Integral) and not isinstance(vencimento, bool):
+        return int(vencimento)
+    if isinstance(vencimento, datetime):
+        return float('nan')
+    if isinstance(vencimento, date):
+        return vencimento.toordinal()
+    if isinstance(vencimento, str):
+        for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+            try:
+                return datetime.strptime(vencimento, formato).date().toordinal()
+            except ValueError:
+                continue
+    return float('nan')
+
+
+def vencimentos_para_datas(vencimentos):
+    """
+    Converte uma coluna de vencimentos em um array datetime64[D].
+
+    Args:
+        vencimentos: Sequência de números de dia (formato do banco), date ou
+            textos ISO/brasileiros; None e valores inválidos são aceitos
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Datas (NaT onde inválido) e máscara de válidos
+    """
+    # NumPy só é carregado no primeiro cálculo em lote (não pesa na abertura da janela)
+    import numpy as np
+
+    vencimentos = list(vencimentos)
+    if set(map(type, vencimentos)) <= {int, type(None)}:
+        # Caminho rápido: números de dia vindos do banco (None vira NaN). Textos
+        # só de dígitos também seriam convertidos pelo NumPy, por isso não entram aqui
+        ordinais = np.array(vencimentos, dtype=np.float64)
     else:
-        return "Em dia"
\ No newline at end of file
+        ordinais = np.array([_vencimento_para_ordinal(v) for v in vencimentos], dtype=np.float64)
+    ordinais = ordinais.reshape(-1)
+
+    validos = ~np.isnan(ordinais)
+    datas = np.full(ordinais.shape, np.datetime64('NaT'), dtype='datetime64[D]')
+    datas[validos] = (ordinais[validos].astype(np.int64) - _ORDINAL_EPOCA).astype('datetime64[D]')
+    return datas, validos
+
+
+def calcular_status_lote(vencimentos, hoje=None):
+    """
+    Versão vetorizada de calcular_status para uma coluna inteira de vencimentos.
+
+    Args:
+        vencimentos: Mesmos formatos aceitos por vencimentos_para_datas
+        hoje: date ou número de dia de referência (padrão: hoje)
+
+    Returns:
+        Tuple[np.ma.MaskedArray, np.ndarray]: Dias restantes (mascarados onde a
+        data é inválida) e códigos de status (índices de STATUS_CODIGOS)
+    """
+    import numpy as np
+
+    if hoje is None:
+        hoje = datetime.now().date()
+    if isinstance(hoje, Integral):
+        hoje = date.fromordinal(int(hoje))
+
+    datas, validos = vencimentos_para_datas(vencimentos)
+    dias = np.zeros(datas.shape, dtype=np.int64)
+    dias[validos] = (datas[validos] - np.datetime64(hoje, 'D')).astype(np.int64)
+
+    codigos = np.select(
+        [~validos, dias < 0, dias <= DIAS_EXPIRANDO],
+        [CODIGO_DATA_INVALIDA, CODIGO_INADIMPLENTE, CODIGO_EXPIRANDO],
+        default=CODIGO_EM_DIA,
+    ).astype(np.int8)
+    return np.ma.masked_array(dias, mask=~validos), codigos
+
+
+def status_lote(vencimentos, hoje=None) -> list:
+    """Textos de status para cada vencimento (mesmo resultado de calcular_status)."""
+    import numpy as np
+
+    _, codigos = calcular_status_lote(vencimentos, hoje)
+    return np.array(STATUS_CODIGOS, dtype=object)[codigos].tolist()
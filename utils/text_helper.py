@@ -0,0 +1,50 @@
+# utils/text_helper.py
+import re
+import unicodedata
+
+# Texto composto só de dígitos e da pontuação usual de telefones e documentos
+_PADRAO_NUMERICO = re.compile(r'^[\d\s().\-/+]*\d[\d\s().\-/+]*$')
+
+
+def normalizar_texto(texto) -> str:
+    """Remove acentos e diferenças de maiúsculas/minúsculas ("São" -> "sao")."""
+    if texto is None:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return sem_acentos.casefold()
+
+
+def somente_digitos(texto) -> str:
+    if texto is None:
+        return ''
+    return ''.join(filter(str.isdigit, str(texto)))
+
+
+def termos_busca(texto: str) -> list:
+    """Divide o texto digitado em termos normalizados.
+
+    Termos numéricos (telefone, CPF/CNPJ com pontuação) ficam só com os dígitos.
+    """
+    # Telefone ou documento digitado com espaços, ex.: "(48) 9665-5452"
+    if _PADRAO_NUMERICO.match(str(texto).strip()):
+        return [somente_digitos(texto)]
+
+    termos = []
+    for palavra in str(texto).split():
+        if _PADRAO_NUMERICO.match(palavra):
+            palavra = somente_digitos(palavra)
+        palavra = normalizar_texto(palavra)
+        if palavra:
+            termos.append(palavra)
+    return termos
+
+
+def chave_busca_cliente(nome, telefone, cpf_cnpj, email, cidade) -> str:
+    """Texto normalizado em que a busca rápida procura os termos digitados.
+
+    Usado pelo filtro em memória e pelo índice FTS5 (Database.atualizar_busca_indexada),
+    para que os dois encontrem exatamente os mesmos clientes.
+    """
+    partes = (nome, telefone, somente_digitos(telefone), somente_digitos(cpf_cnpj), email, cidade)
+    return normalizar_texto(' '.join(str(p) for p in partes if p))
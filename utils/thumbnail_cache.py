@@ -0,0 +1,136 @@
+# utils/thumbnail_cache.py
+import os
+import threading
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QSize, pyqtSignal
+from PyQt5.QtGui import QImageReader
+
+from utils.comprovante_store import subpasta_comprovante
+from utils.directory_helper import ensure_miniaturas_dir
+
+# Maior lado da miniatura (pré-visualização rápida; o botão "Ver em resolução
+# original" abre o comprovante inteiro)
+LADO_MINIATURA = 600
+QUALIDADE_MINIATURA = 85
+
+# Miniaturas sendo geradas: caminho do comprovante -> sinais da tarefa. A trava
+# garante que quem conecta aos sinais de uma tarefa em andamento o faz antes
+# de ela emitir (a tarefa sai da lista, com a trava, antes de emitir)
+_em_andamento = {}
+_trava_andamento = threading.Lock()
+
+
+class SinaisMiniatura(QObject):
+    pronta = pyqtSignal(str, str)  # caminho do comprovante, caminho da miniatura
+    falhou = pyqtSignal(str, str)  # caminho do comprovante, mensagem
+
+
+def caminho_miniatura(comprovante_path: str, pasta_miniaturas: str = None) -> str:
+    """Caminho da miniatura de um comprovante (existindo ou não), na mesma subpasta de hash."""
+    nome = os.path.basename(comprovante_path)
+    return os.path.join(pasta_miniaturas or ensure_miniaturas_dir(), subpasta_comprovante(nome), nome + '.jpg')
+
+
+def miniatura_atualizada(comprovante_path: str):
+    """Caminho da miniatura se ela existir, for mais nova que o comprovante e
+    estiver no tamanho atual (LADO_MINIATURA); senão None."""
+    miniatura = caminho_miniatura(comprovante_path)
+    try:
+        if os.path.getmtime(miniatura) < os.path.getmtime(comprovante_path):
+            return None
+    except OSError:
+        return None
+    # Miniaturas maiores, geradas com um LADO_MINIATURA anterior, são refeitas
+    tamanho = QImageReader(miniatura).size()
+    if not tamanho.isValid() or max(tamanho.width(), tamanho.height()) > LADO_MINIATURA:
+        return None
+    return miniatura
+
+
+def gerar_miniatura(comprovante_path: str, lado: int = LADO_MINIATURA) -> str:
+    """
+    Decodifica o comprovante já reduzido (QImageReader) e grava a miniatura.
+
+    Pode ser chamada fora da thread da interface.
+
+    Args:
+        comprovante_path (str): Caminho do comprovante original
+        lado (int): Maior lado da miniatura em pixels
+
+    Returns:
+        str: Caminho da miniatura gravada
+    """
+    leitor = QImageReader(comprovante_path)
+    leitor.setAutoTransform(True)  # Respeita a orientação EXIF das fotos de celular
+    tamanho = leitor.size()
+    if not tamanho.isValid():
+        raise ValueError(f'Imagem inválida: {leitor.errorString()}')
+
+    # Decodifica direto no tamanho reduzido (JPEG pula a maior parte do trabalho)
+    if max(tamanho.width(), tamanho.height()) > lado:
+        leitor.setScaledSize(tamanho.scaled(QSize(lado, lado), Qt.KeepAspectRatio))
+
+    imagem = leitor.read()
+    if imagem.isNull():
+        raise ValueError(f'Falha ao decodificar: {leitor.errorString()}')
+
+    miniatura = caminho_miniatura(comprovante_path)
+    os.makedirs(os.path.dirname(miniatura), exist_ok=True)
+    temporario = miniatura + '.tmp'
+    if not imagem.save(temporario, 'JPG', QUALIDADE_MINIATURA):
+        raise OSError(f'Falha ao gravar miniatura: {miniatura}')
+    os.replace(temporario, miniatura)
+    return miniatura
+
+
+class TarefaMiniatura(QRunnable):
+    def __init__(self, comprovante_path: str, sinais: SinaisMiniatura):
+        super().__init__()
+        self.comprovante_path = comprovante_path
+        self.sinais = sinais
+
+    def run(self):
+        try:
+            miniatura = gerar_miniatura(self.comprovante_path)
+        except Exception as e:
+            print(f"Erro ao gerar miniatura de {self.comprovante_path}: {e}")
+            with _trava_andamento:
+                _em_andamento.pop(self.comprovante_path, None)
+            self.sinais.falhou.emit(self.comprovante_path, str(e))
+            return
+        # Sai da lista antes de emitir: quem pedir depois já encontra o arquivo pronto
+        with _trava_andamento:
+            _em_andamento.pop(self.comprovante_path, None)
+        self.sinais.pronta.emit(self.comprovante_path, miniatura)
+
+
+def agendar_miniatura(comprovante_path: str, pronta=None, falhou=None) -> SinaisMiniatura:
+    """
+    Gera a miniatura em segundo plano (QThreadPool global).
+
+    Se a mesma miniatura já estiver sendo gerada, devolve os sinais da
+    tarefa existente em vez de agendar outra. Os slots são conectados antes
+    de a tarefa poder emitir; ainda assim, quem chegou depois de uma tarefa
+    terminar deve conferir miniatura_atualizada após a chamada.
+
+    Args:
+        comprovante_path (str): Caminho do comprovante
+        pronta (callable): Slot de SinaisMiniatura.pronta (opcional)
+        falhou (callable): Slot de SinaisMiniatura.falhou (opcional)
+
+    Returns:
+        SinaisMiniatura: Sinais emitidos quando a miniatura fica pronta ou falha
+    """
+    with _trava_andamento:
+        sinais = _em_andamento.get(comprovante_path)
+        nova = sinais is None
+        if nova:
+            sinais = SinaisMiniatura()
+            _em_andamento[comprovante_path] = sinais
+        if pronta is not None:
+            sinais.pronta.connect(pronta)
+        if falhou is not None:
+            sinais.falhou.connect(falhou)
+    if nova:
+        QThreadPool.globalInstance().start(TarefaMiniatura(comprovante_path, sinais))
+    return sinais
@@ -1,9 +1,23 @@
 # utils/validators.py
 import re
 
+# Compilados uma vez: as funções são chamadas para cada linha importada
+_NAO_DIGITOS = re.compile(r'\D')
+_PADRAO_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Pesos dos dígitos verificadores (o segundo dígito usa também o primeiro)
+PESOS_CPF = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_CNPJ = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Separa os documentos ao limpar o lote inteiro com uma única substituição
+_SEPARADOR_LOTE = '\x00'
+_NAO_DIGITOS_LOTE = re.compile(r'[^\d\x00]')
+# Em texto ASCII, \d é só 0-9: a limpeza pode ser feita byte a byte
+_BYTES_NAO_DIGITOS = bytes(b for b in range(128) if not (48 <= b <= 57 or b == 0))
+
 def validar_cpf_cnpj(documento: str) -> bool:
     # Remove caracteres não numéricos
-    doc = re.sub(r'\D', '', documento)
+    doc = _NAO_DIGITOS.sub('', documento)
     
     # Validação de CPF
     if len(doc) == 11:
@@ -37,5 +51,91 @@ def validar_cpf_cnpj(documento: str) -> bool:
     return False
 
 def validar_email(email: str) -> bool:
-    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(padrao, email) is not None
\ No newline at end of file
+    return _PADRAO_EMAIL.match(email) is not None
+
+
+def _digitos_conferem(np, matriz, pesos: tuple):
+    """Confere os dois dígitos verificadores de cada linha de uma matriz de dígitos."""
+    pesos1 = np.array(pesos, dtype=np.int64)
+    pesos2 = np.array((pesos[0] + 1,) + pesos, dtype=np.int64)
+    corpo = len(pesos)
+
+    resto = matriz[:, :corpo] @ pesos1 % 11
+    digito1 = np.where(resto < 2, 0, 11 - resto)
+    resto = matriz[:, :corpo + 1] @ pesos2 % 11
+    digito2 = np.where(resto < 2, 0, 11 - resto)
+    return (matriz[:, corpo] == digito1) & (matriz[:, corpo + 1] == digito2)
+
+
+def validar_cpf_cnpj_lote(documentos):
+    """
+    Versão vetorizada de validar_cpf_cnpj para uma coluna inteira de documentos.
+
+    A pontuação de todos os documentos é removida com uma única substituição
+    e os dígitos verificadores são calculados com NumPy sobre uma matriz de
+    dígitos (uma linha por documento) para os CPFs e outra para os CNPJs.
+
+    Args:
+        documentos: Sequência de textos (None e valores vazios são inválidos)
+
+    Returns:
+        np.ndarray: Array booleano, True onde validar_cpf_cnpj retornaria True
+    """
+    # NumPy só é carregado na primeira validação em lote (não pesa na abertura da janela)
+    import numpy as np
+
+    documentos = list(documentos)
+    try:
+        texto = _SEPARADOR_LOTE.join(documentos)
+    except TypeError:
+        documentos = [documento if isinstance(documento, str) else '' for documento in documentos]
+        texto = _SEPARADOR_LOTE.join(documentos)
+
+    if texto.isascii():
+        limpos = texto.encode('ascii').translate(None, _BYTES_NAO_DIGITOS).decode('ascii').split(_SEPARADOR_LOTE)
+    else:
+        limpos = _NAO_DIGITOS_LOTE.sub('', texto).split(_SEPARADOR_LOTE)
+    if len(limpos) != len(documentos):
+        # Algum documento continha o próprio separador: limpa um a um
+        limpos = [_NAO_DIGITOS.sub('', documento) for documento in documentos]
+
+    validos = np.zeros(len(documentos), dtype=bool)
+    tamanhos = np.fromiter(map(len, limpos), dtype=np.int64, count=len(limpos))
+    for tamanho, pesos in ((11, PESOS_CPF), (14, PESOS_CNPJ)):
+        indices = np.flatnonzero(tamanhos == tamanho)
+        if not len(indices):
+            continue
+        selecionados = [limpos[i] for i in indices]
+        ascii = np.fromiter(map(str.isascii, selecionados), dtype=bool, count=len(selecionados))
+        if not ascii.all():
+            # Dígitos de outros sistemas de escrita (aceitos por \d): caminho escalar
+            for i in np.flatnonzero(~ascii):
+                validos[indices[i]] = validar_cpf_cnpj(selecionados[i])
+            selecionados = [selecionados[i] for i in np.flatnonzero(ascii)]
+            indices = indices[ascii]
+        if not selecionados:
+            continue
+        matriz = (np.frombuffer(''.join(selecionados).encode('ascii'), dtype=np.uint8)
+                  .reshape(-1, tamanho).astype(np.int64) - ord('0'))
+        validos[indices] = _digitos_conferem(np, matriz, pesos)
+    return validos
+
+
+def validar_email_lote(emails):
+    """
+    Versão em lote de validar_email (mesmo padrão, já compilado).
+
+    Args:
+        emails: Sequência de textos (None e valores não textuais são inválidos)
+
+    Returns:
+        np.ndarray: Array booleano, True onde validar_email retornaria True
+    """
+    import numpy as np
+
+    emails = list(emails)
+    try:
+        return np.fromiter(map(bool, map(_PADRAO_EMAIL.match, emails)), dtype=bool, count=len(emails))
+    except TypeError:
+        return np.fromiter((isinstance(email, str) and _PADRAO_EMAIL.match(email) is not None for email in emails),
+                           dtype=bool, count=len(emails))
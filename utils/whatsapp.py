@@ -2,8 +2,51 @@
 from PyQt5.QtGui import QDesktopServices
 from PyQt5.QtCore import QUrl
 from PyQt5.QtWidgets import QMessageBox
+from urllib.parse import quote
 import traceback
 
+# Quantidade mínima de dígitos de um telefone aceito
+DIGITOS_MINIMOS_TELEFONE = 8
+
+
+def telefone_whatsapp(telefone):
+    """
+    Número no formato internacional usado pelo WhatsApp (55 + DDD + número).
+
+    Returns:
+        Optional[str]: Somente dígitos, ou None se o telefone for inválido
+    """
+    if not telefone or not isinstance(telefone, str):
+        return None
+    telefone_limpo = ''.join(filter(str.isdigit, telefone))
+    if len(telefone_limpo) < DIGITOS_MINIMOS_TELEFONE:
+        return None
+    return f"55{telefone_limpo}"
+
+
+def url_whatsapp(telefone, mensagem=None):
+    """
+    Monta o link wa.me de um telefone, com a mensagem já codificada para a URL.
+
+    Returns:
+        Optional[str]: Link do WhatsApp ou None se o telefone for inválido
+    """
+    numero = telefone_whatsapp(telefone)
+    if numero is None:
+        return None
+    url = f"https://wa.me/{numero}"
+    if mensagem:
+        # Quebras de linha, acentos, "&" e "#" não podem ir crus na URL
+        url += f"?text={quote(mensagem, safe='')}"
+    return url
+
+
+def abrir_link_whatsapp(url) -> bool:
+    """Abre um link montado por url_whatsapp no navegador (ou no aplicativo do WhatsApp)."""
+    # O link já está codificado: o modo estrito impede o QUrl de reinterpretá-lo
+    return QDesktopServices.openUrl(QUrl(url, QUrl.StrictMode))
+
+
 def enviar_mensagem_whatsapp(telefone, mensagem=None):
     try:
         # Verifica se o telefone é válido
@@ -15,18 +58,15 @@ def enviar_mensagem_whatsapp(telefone, mensagem=None):
         telefone_limpo = ''.join(filter(str.isdigit, telefone))
         
         # Verifica se o telefone tem pelo menos 8 dígitos
-        if len(telefone_limpo) < 8:
+        if len(telefone_limpo) < DIGITOS_MINIMOS_TELEFONE:
             QMessageBox.warning(None, "Aviso", "Número de telefone muito curto ou inválido.")
             return False
             
         # Constrói a URL usando o prefixo "https://wa.me/55" seguido do telefone limpo
-        url = f"https://wa.me/55{telefone_limpo}"
-        # Se você quiser incluir uma mensagem pré-definida (opcional), use:
-        if mensagem:
-            url = f"https://wa.me/55{telefone_limpo}?text={mensagem}"
+        url = url_whatsapp(telefone, mensagem)
 
         # Tenta abrir a URL
-        return QDesktopServices.openUrl(QUrl(url))
+        return abrir_link_whatsapp(url)
     except Exception as e:
         # Captura qualquer erro e exibe uma mensagem amigável
         QMessageBox.critical(None, "Erro", f"Não foi possível abrir o WhatsApp: {str(e)}")
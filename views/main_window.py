@@ -1,76 +1,545 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QComboBox, QDateEdit,
-                             QCheckBox, QPushButton, QTableWidget,
-                             QTableWidgetItem, QMessageBox, QDialog,
-                             QFormLayout, QListWidget, QFileDialog, QScrollArea, QApplication
+                             QCheckBox, QPushButton, QTableView,
+                             QMessageBox, QDialog, QStyledItemDelegate, QStyle,
+                             QFormLayout, QListWidget, QFileDialog, QScrollArea, QApplication,
+                             QSpinBox, QProgressDialog, QPlainTextEdit, QListWidgetItem
                              )
-from PyQt5.QtGui import QIcon, QColor, QPixmap
-from PyQt5.QtCore import Qt, QDate, QSize
+from PyQt5.QtGui import QIcon, QColor, QPixmap, QImage
+from PyQt5.QtCore import (Qt, QDate, QSize, QAbstractTableModel, QModelIndex, pyqtSignal,
+                          QSortFilterProxyModel, QTimer, QEvent, QObject, QRunnable, QThreadPool)
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from utils.status_helper import calcular_status
-from database.database import Database
+from utils.status_helper import calcular_status, DIAS_EXPIRANDO
+from database.database import (Database, COLUNAS, EVENTO_INSERIDO, EVENTO_REMOVIDO,
+                               EVENTO_RECARREGADO, AVISO_ENVIADO, AVISO_ENVIANDO, AVISO_PENDENTE)
+from database.consulta import ConsultaClientes
 from utils.validators import validar_cpf_cnpj, validar_email
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from utils.text_helper import chave_busca_cliente, termos_busca
+from utils.formatters import formatar_telefone, formatar_cpf_cnpj, formatar_data
 import traceback
 import os
-import hashlib
-import shutil
-import sys
 from utils.whatsapp import enviar_mensagem_whatsapp
+from utils.campanha import (CAMPOS_MODELO, MODELO_PADRAO, STATUS_CAMPANHA, preparar_envios,
+                            renderizar_mensagem, validar_modelo)
+from utils.notificacoes import DespachanteAvisos, TransporteHttp
 from utils.directory_helper import ensure_comprovantes_dir
-
-# Get the base path for resources
-def get_resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller"""
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+from utils.comprovante_store import (CopiaCancelada, caminho_comprovante, liberar_comprovante,
+                                     migrar_para_subpastas)
+from utils.thumbnail_cache import agendar_miniatura, miniatura_atualizada
+from utils.image_ingest import PreparacaoComprovante
+from utils.comprovante_gc import TarefaColeta
+from utils.comprovante_lote import TarefaAnexoLote, associar_arquivos, gravar_anexos, pool_lote
+from utils.icon_cache import obter_icone, obter_pixmap, precarregar_icones
+from utils.chart_renderer import (dados_relatorio, renderizar_grafico,
+                                  DPI_GRAFICO, RELATORIOS)
 
 # Get the comprovantes directory path
 COMPROVANTES_DIR = ensure_comprovantes_dir()
 
+# Cabeçalhos da tabela de clientes (mesma ordem das colunas do banco)
+CABECALHOS_CLIENTES = [
+    'ID', 'Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Período',
+    'Último Pagamento', 'Vencimento', 'Data Aviso', 'Avisado',
+    'Status', 'Estado', 'Municipio', 'Observação', 'Comprovante'
+]
+
+COLUNA_VENCIMENTO = 7
+COLUNA_STATUS = 10
+COLUNA_COMPROVANTE = 14
+COLUNAS_DATAS = (6, 7, 8)  # Último Pagamento, Vencimento, Data Aviso
+COLUNAS_ALINHAMENTO_ESQUERDA = (1, 4, 13)  # Nome, E-mail, Observação
+
+# Quantidade de clientes lidos do banco a cada bloco da rolagem
+TAMANHO_BLOCO_CLIENTES = 500
+
+# Filtro rápido: até este total de clientes o filtro é feito em memória;
+# acima dele cada busca vira uma consulta indexada no banco
+LIMITE_FILTRO_MEMORIA = 5000
+ATRASO_FILTRO_MS = 250  # Espera após a última tecla antes de filtrar
+
+# Espera após a abertura antes de recolher os comprovantes órfãos em segundo plano
+ATRASO_COLETA_COMPROVANTES_MS = 60 * 1000
+
+# Cópias de comprovante mais rápidas que isto terminam sem mostrar o progresso
+ATRASO_PROGRESSO_COPIA_MS = 400
+
+CORES_STATUS = {
+    'Expirando': QColor(173, 216, 230),  # Azul claro
+    'Inadimplente': QColor(255, 182, 193),  # Vermelho claro
+}
+
+# Papel usado pelo delegate para saber se a linha tem comprovante
+PAPEL_TEM_COMPROVANTE = Qt.UserRole + 1
+
+
+class ClienteItemDelegate(QStyledItemDelegate):
+    """Desenha o fundo colorido do status e o ícone de comprovante direto na célula."""
+
+    def paint(self, painter, option, index):
+        coluna = index.column()
+
+        if coluna == COLUNA_STATUS and not option.state & QStyle.State_Selected:
+            cor = CORES_STATUS.get(index.data(Qt.DisplayRole))
+            if cor:
+                painter.fillRect(option.rect, cor)
+
+        if coluna == COLUNA_COMPROVANTE:
+            super().paint(painter, option, index)
+            if index.data(PAPEL_TEM_COMPROVANTE):
+                pixmap = obter_pixmap('icones/check.png', 20, 20)
+                x = option.rect.x() + (option.rect.width() - pixmap.width()) // 2
+                y = option.rect.y() + (option.rect.height() - pixmap.height()) // 2
+                painter.drawPixmap(x, y, pixmap)
+            return
+
+        super().paint(painter, option, index)
+
+
+class ClienteTableModel(QAbstractTableModel):
+    """Modelo virtual da tabela de clientes.
+
+    Guarda apenas as tuplas vindas do banco; texto e alinhamento são
+    calculados sob demanda, somente para as células que a view desenha
+    (cores de status e ícone de comprovante ficam com ClienteItemDelegate).
+    Quando ligado ao banco (carregar), as linhas chegam em blocos conforme
+    a rolagem, via canFetchMore/fetchMore. As gravações feitas no banco
+    chegam como eventos e atualizam apenas a linha afetada.
+    """
+
+    # Repassa os eventos do banco para a thread da interface
+    clienteAlterado = pyqtSignal(str, object)
+
+    def __init__(self, database=None, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self._clientes = []
+        self._linha_por_id = {}
+        self._ordenacao = None  # (coluna, ordem) aplicada também após recarregar
+        self._consulta = None
+        self._paginador = None
+        self._completo = False
+        self._total = 0
+        self._chaves_busca = {}  # ID -> texto normalizado usado pelo filtro rápido
+
+        ouvinte = self.clienteAlterado.emit
+        self.clienteAlterado.connect(self.aplicar_alteracao)
+        Database.registrar_ouvinte(ouvinte)
+        self.destroyed.connect(lambda: Database.remover_ouvinte(ouvinte))
+
+    def carregar(self, consulta=None, completo=False):
+        """Liga o modelo ao banco (opcionalmente filtrado) e lê apenas o primeiro bloco.
+
+        Com completo=True todos os blocos são lidos de uma vez (usado pelo
+        filtro rápido em memória).
+        """
+        self.beginResetModel()
+        self._consulta = consulta
+        self._completo = completo
+        self._chaves_busca = {}
+        self._total = self.database.contar_clientes(consulta)
+        coluna, ordem = self._ordenacao or (0, Qt.AscendingOrder)
+        self._paginador = self.database.paginar_clientes(
+            consulta,
+            ordenar_por=COLUNAS[coluna],
+            decrescente=(ordem == Qt.DescendingOrder),
+            tamanho_pagina=TAMANHO_BLOCO_CLIENTES
+        )
+        self._clientes = self._paginador.proxima_pagina()
+        while completo and not self._paginador.esgotado:
+            self._clientes.extend(self._paginador.proxima_pagina())
+        self._reindexar()
+        self.endResetModel()
+
+    def definir_clientes(self, clientes):
+        """Exibe uma lista já pronta de clientes (sem leitura incremental)."""
+        self.beginResetModel()
+        self._consulta = None
+        self._paginador = None
+        self._completo = False
+        self._chaves_busca = {}
+        self._clientes = list(clientes)
+        self._total = len(self._clientes)
+        if self._ordenacao:
+            self._ordenar(*self._ordenacao)
+        self._reindexar()
+        self.endResetModel()
+
+    def definir_ordenacao(self, coluna, ordem):
+        """Define a ordenação usada na próxima carga, sem recarregar agora."""
+        self._ordenacao = (coluna, ordem)
+
+    def total(self) -> int:
+        """Total de clientes do resultado, inclusive os ainda não carregados."""
+        return self._total
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._paginador is None:
+            return False
+        return not self._paginador.esgotado and len(self._clientes) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        # Linhas já inseridas por eventos não são repetidas
+        bloco = [c for c in self._paginador.proxima_pagina() if c[0] not in self._linha_por_id]
+        if not bloco:
+            return
+        inicio = len(self._clientes)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(bloco) - 1)
+        self._clientes.extend(bloco)
+        self._reindexar(inicio)
+        self.endInsertRows()
+
+    def _reindexar(self, inicio: int = 0):
+        """Atualiza o índice ID -> linha a partir da linha informada."""
+        if inicio == 0:
+            self._linha_por_id = {}
+        for linha in range(inicio, len(self._clientes)):
+            self._linha_por_id[self._clientes[linha][0]] = linha
+
+    def linha_do_cliente(self, cliente_id):
+        """Linha em que o cliente está carregado (ou None), em tempo constante."""
+        return self._linha_por_id.get(cliente_id)
+
+    def _ha_mais_para_carregar(self) -> bool:
+        return self._paginador is not None and not self._paginador.esgotado
+
+    def aplicar_alteracao(self, evento: str, cliente_id):
+        """Reflete na tabela uma gravação feita no banco, tocando só a linha afetada."""
+        if evento == EVENTO_RECARREGADO:
+            if self._paginador is not None:
+                self.carregar(self._consulta, self._completo)
+            return
+
+        self._chaves_busca.pop(cliente_id, None)
+
+        linha = self._linha_por_id.get(cliente_id)
+
+        if evento == EVENTO_REMOVIDO:
+            if linha is not None:
+                self._remover_linha(linha)
+                self._total -= 1
+            elif self._paginador is not None:
+                self._total = self.database.contar_clientes(self._consulta)
+            return
+
+        # Listas fixas (resultado pronto) só acompanham os clientes que já exibem
+        if self._paginador is None and (linha is None or evento == EVENTO_INSERIDO):
+            return
+
+        cliente = self.database.obter_cliente_tupla(cliente_id, self._consulta)
+        if cliente is None:
+            # Deixou de atender ao filtro atual
+            if linha is not None:
+                self._remover_linha(linha)
+                self._total -= 1
+            return
+
+        if linha is None:
+            self._total += 1
+            self._inserir_ordenado(cliente)
+        else:
+            self._substituir(linha, cliente)
+
+    def _remover_linha(self, linha: int):
+        cliente_id = self._clientes[linha][0]
+        self.beginRemoveRows(QModelIndex(), linha, linha)
+        del self._clientes[linha]
+        del self._linha_por_id[cliente_id]
+        self._reindexar(linha)
+        self.endRemoveRows()
+        if self._paginador is not None:
+            self._paginador.deslocar(-1)
+
+    def _inserir_ordenado(self, cliente):
+        posicao = self._posicao_ordenada(cliente)
+        if posicao == len(self._clientes) and self._ha_mais_para_carregar():
+            return  # Fica além do trecho carregado; chega com a rolagem
+
+        self.beginInsertRows(QModelIndex(), posicao, posicao)
+        self._clientes.insert(posicao, cliente)
+        self._reindexar(posicao)
+        self.endInsertRows()
+        if self._paginador is not None:
+            self._paginador.deslocar(1)
+
+    def _substituir(self, linha: int, cliente):
+        antigo = self._clientes[linha]
+        self._clientes[linha] = cliente
+
+        if self._chave_ordenacao(antigo) != self._chave_ordenacao(cliente):
+            # Calcula a nova posição sem a própria linha
+            del self._clientes[linha]
+            posicao = self._posicao_ordenada(cliente)
+            self._clientes.insert(linha, cliente)
+
+            if posicao == len(self._clientes) - 1 and self._ha_mais_para_carregar():
+                self._remover_linha(linha)
+                return
+
+            if posicao != linha:
+                destino = posicao + 1 if posicao > linha else posicao
+                self.beginMoveRows(QModelIndex(), linha, linha, QModelIndex(), destino)
+                del self._clientes[linha]
+                self._clientes.insert(posicao, cliente)
+                self._reindexar(min(linha, posicao))
+                self.endMoveRows()
+                linha = posicao
+
+        self.dataChanged.emit(self.index(linha, 0), self.index(linha, self.columnCount() - 1))
+
+    def _posicao_ordenada(self, cliente) -> int:
+        """Busca binária da posição do cliente entre as linhas carregadas."""
+        coluna, ordem = self._ordenacao or (0, Qt.AscendingOrder)
+        decrescente = ordem == Qt.DescendingOrder
+        chave = self._chave_ordenacao(cliente)
+        inicio, fim = 0, len(self._clientes)
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            chave_meio = self._chave_ordenacao(self._clientes[meio])
+            if (chave_meio > chave) if decrescente else (chave_meio < chave):
+                inicio = meio + 1
+            else:
+                fim = meio
+        return inicio
+
+    def _chave_ordenacao(self, cliente):
+        # Mesma ordem do SQLite: NULL antes de números, números antes de textos,
+        # desempate pelo ID
+        coluna = (self._ordenacao or (0, Qt.AscendingOrder))[0]
+        valor = cliente[coluna]
+        if valor is None:
+            return (0, 0, cliente[0])
+        if isinstance(valor, str):
+            return (2, valor, cliente[0])
+        return (1, valor, cliente[0])
+
+    def chave_busca(self, linha: int) -> str:
+        """Texto normalizado (sem acentos, minúsculo) de nome, telefone, documento,
+        e-mail e município; calculado uma vez por cliente e reaproveitado a cada tecla."""
+        cliente = self._clientes[linha]
+        chave = self._chaves_busca.get(cliente[0])
+        if chave is None:
+            chave = chave_busca_cliente(cliente[1], cliente[2], cliente[3], cliente[4], cliente[12])
+            self._chaves_busca[cliente[0]] = chave
+        return chave
+
+    def cliente(self, linha: int):
+        if 0 <= linha < len(self._clientes):
+            return self._clientes[linha]
+        return None
+
+    def cliente_id(self, linha: int):
+        cliente = self.cliente(linha)
+        return cliente[0] if cliente else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._clientes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(CABECALHOS_CLIENTES)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return CABECALHOS_CLIENTES[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        cliente = self._clientes[index.row()]
+        coluna = index.column()
+
+        if role == Qt.DisplayRole:
+            return self.texto_celula(cliente, coluna)
+
+        if role == Qt.TextAlignmentRole:
+            if coluna in COLUNAS_ALINHAMENTO_ESQUERDA:
+                return int(Qt.AlignLeft | Qt.AlignVCenter)
+            return int(Qt.AlignCenter)
+
+        if role == Qt.ForegroundRole and coluna == COLUNA_STATUS and cliente[COLUNA_STATUS] in CORES_STATUS:
+            return QColor(0, 0, 0)  # Texto preto para contraste
+
+        if role == PAPEL_TEM_COMPROVANTE and coluna == COLUNA_COMPROVANTE:
+            return bool(cliente[COLUNA_COMPROVANTE])
+
+        return None
+
+    @staticmethod
+    def texto_celula(cliente, coluna: int) -> str:
+        """Texto exibido para uma célula (telefone, documento e datas formatados)."""
+        valor = cliente[coluna]
+
+        if coluna == COLUNA_COMPROVANTE:
+            return ''  # Representado pelo ícone
+        if valor is None:
+            return ''
+        if coluna == 2:  # Telefone
+            return formatar_telefone(str(valor))
+        if coluna == 3:  # CPF/CNPJ
+            return formatar_cpf_cnpj(str(valor))
+        if coluna in COLUNAS_DATAS:
+            return formatar_data(valor)
+        if coluna == 9:  # Avisado
+            return "SIM" if valor in (1, "1") else "NÃO"
+        return str(valor)
+
+    def sort(self, coluna, ordem=Qt.AscendingOrder):
+        self._ordenacao = (coluna, ordem)
+
+        # Com leitura incremental a ordenação é feita pelo banco
+        if self._paginador is not None:
+            self.carregar(self._consulta, self._completo)
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        self._ordenar(coluna, ordem)
+        self._reindexar()
+        self.layoutChanged.emit()
+
+    def _ordenar(self, coluna, ordem):
+        # Ordena pelo valor bruto (datas ISO já ficam em ordem cronológica)
+        self._clientes.sort(key=self._chave_ordenacao, reverse=(ordem == Qt.DescendingOrder))
+
+
+class ClienteFilterProxyModel(QSortFilterProxyModel):
+    """Filtro rápido em memória sobre ClienteTableModel.
+
+    Cada termo digitado precisa aparecer na chave de busca normalizada da
+    linha. A ordenação continua com o modelo de origem.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._termos = []
+
+    def definir_termo(self, texto: str):
+        termos = termos_busca(texto)
+        if termos != self._termos:
+            self._termos = termos
+            self.invalidateFilter()
+
+    def filtrando(self) -> bool:
+        return bool(self._termos)
+
+    def filterAcceptsRow(self, linha, pai):
+        if not self._termos:
+            return True
+        chave = self.sourceModel().chave_busca(linha)
+        return all(termo in chave for termo in self._termos)
+
+    def sort(self, coluna, ordem=Qt.AscendingOrder):
+        # Datas e números são ordenados pelo valor bruto no modelo de origem
+        self.sourceModel().sort(coluna, ordem)
+
+
 class MainWindow(QMainWindow):
+    # Emitido quando os status e a primeira página da tabela terminam de carregar
+    carregamentoConcluido = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle('Climaterra - Gerenciamento de Clientes')
         self.resize(1000, 600)
 
-        self.setWindowIcon(QIcon(get_resource_path('icones/icone.png')))
+        # Decodifica os ícones uma única vez para todas as janelas
+        precarregar_icones()
+        self.setWindowIcon(obter_icone('icones/icone.png'))
 
         # Inicializa o banco de dados
         self.database = Database()
 
+        # Estado da pesquisa avançada e do filtro rápido
+        self.consulta_pesquisa = None
+        self.filtro_em_memoria = False
+        self.limite_filtro_memoria = LIMITE_FILTRO_MEMORIA
+
+        # Verificação de status na virada do dia (aplicação aberta de um dia para o outro)
+        self.timer_virada_dia = QTimer(self)
+        self.timer_virada_dia.setSingleShot(True)
+        self.timer_virada_dia.timeout.connect(self.recalcular_status_global)
+
+        # Envio dos avisos da caixa de saída (WhatsApp ou gateway) em segundo plano
+        self.despachante = DespachanteAvisos(self.database.db_name, parent=self)
+        self.despachante.processados.connect(self.avisos_processados)
+        self.despachante.falhou.connect(
+            lambda mensagem: self.statusBar().showMessage(f'Erro no envio de avisos: {mensagem}', 10000)
+        )
+
         # Cria a interface gráfica
+        self._carregamento_agendado = False
         self.criar_interface()
 
-        # Recalcula os status e atualiza a tabela
+        # **Aqui garantimos que a janela será maximizada ao iniciar**
+        self.showMaximized()
+
+    def event(self, evento):
+        resultado = super().event(evento)
+        # A janela é pintada primeiro; status e tabela são carregados logo depois
+        if evento.type() == QEvent.Paint and not self._carregamento_agendado:
+            self._carregamento_agendado = True
+            QTimer.singleShot(0, self.carregar_dados_iniciais)
+        return resultado
+
+    def carregar_dados_iniciais(self):
+        """Recalcula os status e preenche a tabela depois que a janela já foi exibida."""
+        self.migrar_comprovantes()
         self.recalcular_status_global()
         self.atualizar_tabela()
+        self.carregamentoConcluido.emit()
+        QTimer.singleShot(ATRASO_COLETA_COMPROVANTES_MS, self.coletar_comprovantes_orfaos)
+        self.retomar_avisos_pendentes()
 
-        # **Aqui garantimos que a janela será maximizada ao iniciar**
-        self.showMaximized()
+    def retomar_avisos_pendentes(self):
+        """Retoma os avisos que ficaram na caixa de saída (aplicação fechada no meio de um envio).
+
+        Pelo gateway HTTP o envio continua sozinho; com os links wa.me, que
+        abrem uma conversa no navegador para cada aviso, o usuário decide.
+        """
+        if self.database.proxima_tentativa_aviso() is None:
+            return
+        if not isinstance(self.despachante.transporte, TransporteHttp):
+            situacao = self.database.contar_avisos_saida()
+            quantidade = situacao.get(AVISO_PENDENTE, 0) + situacao.get(AVISO_ENVIANDO, 0)
+            resposta = QMessageBox.question(
+                self, 'Avisos pendentes',
+                f'{quantidade} aviso(s) de um envio anterior ainda não foram enviados. '
+                'Continuar o envio agora? Uma conversa do WhatsApp será aberta para cada aviso.\n\n'
+                'Se não, os avisos continuam na fila e saem no próximo envio.',
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if resposta != QMessageBox.Yes:
+                return
+        self.despachante.acordar()
 
     def criar_interface(self):
         """Cria todos os componentes da interface gráfica."""
         widget_central = QWidget()
         layout_principal = QVBoxLayout()
 
+        # Filtro rápido (aplicado enquanto o usuário digita)
+        self.campo_filtro = QLineEdit()
+        self.campo_filtro.setPlaceholderText('Filtrar por nome, telefone, CPF/CNPJ, e-mail ou município...')
+        self.campo_filtro.setClearButtonEnabled(True)
+        self.timer_filtro = QTimer(self)
+        self.timer_filtro.setSingleShot(True)
+        self.timer_filtro.setInterval(ATRASO_FILTRO_MS)
+        self.timer_filtro.timeout.connect(self.aplicar_filtro_rapido)
+        self.campo_filtro.textChanged.connect(self.timer_filtro.start)
+
         # Tabela de clientes
-        self.tabela_clientes = QTableWidget()
+        self.modelo_clientes = ClienteTableModel(self.database, self)
+        self.proxy_clientes = ClienteFilterProxyModel(self)
+        self.proxy_clientes.setSourceModel(self.modelo_clientes)
+        self.tabela_clientes = QTableView()
+        self.tabela_clientes.setModel(self.proxy_clientes)
+        self.tabela_clientes.setItemDelegate(ClienteItemDelegate(self.tabela_clientes))
         self.tabela_clientes.horizontalHeader().setSectionsMovable(True)
-        self.tabela_clientes.setColumnCount(15)  # Removido o ID
-        self.tabela_clientes.setHorizontalHeaderLabels([
-            'ID','Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Período',
-            'Último Pagamento', 'Vencimento', 'Data Aviso', 'Avisado',
-            'Status', 'Estado', 'Municipio', 'Observação', 'Comprovante'
-        ])
         self.tabela_clientes.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 alternate-background-color: #f8f8f8;
                 selection-background-color: #e0f0ff;
             }
@@ -81,57 +550,75 @@ class MainWindow(QMainWindow):
 
         # Habilita a ordenação ao clicar nos rótulos das colunas
         self.tabela_clientes.setSortingEnabled(True)
+        self.tabela_clientes.sortByColumn(0, Qt.AscendingOrder)
+
+        # Contagem exibida na barra de status (total conhecido antes da rolagem)
+        self.label_total = QLabel()
+        self.statusBar().addPermanentWidget(self.label_total)
+        for sinal in (self.proxy_clientes.modelReset, self.proxy_clientes.rowsInserted,
+                      self.proxy_clientes.rowsRemoved, self.proxy_clientes.layoutChanged):
+            sinal.connect(self.atualizar_contagem)
 
         # Botões de ação
         layout_botoes = QHBoxLayout()
 
         botao_adicionar = QPushButton('Adicionar')
-        botao_adicionar.setIcon(QIcon(get_resource_path('icones/add.png')))
+        botao_adicionar.setIcon(obter_icone('icones/add.png'))
         botao_adicionar.setIconSize(QSize(20, 20))
         botao_adicionar.clicked.connect(self.adicionar_cliente)
 
         botao_editar = QPushButton('Editar')
-        botao_editar.setIcon(QIcon(get_resource_path('icones/edit.png')))
+        botao_editar.setIcon(obter_icone('icones/edit.png'))
         botao_editar.setIconSize(QSize(20, 20))
         botao_editar.clicked.connect(self.editar_cliente)
 
         botao_remover = QPushButton('Remover')
-        botao_remover.setIcon(QIcon(get_resource_path('icones/delete.png')))
+        botao_remover.setIcon(obter_icone('icones/delete.png'))
         botao_remover.setIconSize(QSize(20, 20))
         botao_remover.clicked.connect(self.remover_cliente)
 
         botao_avisar = QPushButton('Avisar')
-        botao_avisar.setIcon(QIcon(get_resource_path('icones/aviso.png')))
+        botao_avisar.setIcon(obter_icone('icones/aviso.png'))
         botao_avisar.setIconSize(QSize(20, 20))
         botao_avisar.clicked.connect(self.avisar_cliente)
 
+        botao_campanha = QPushButton('Avisar em Lote')
+        botao_campanha.setIcon(obter_icone('icones/whatsapp.png'))
+        botao_campanha.setIconSize(QSize(20, 20))
+        botao_campanha.clicked.connect(self.abrir_campanha_aviso)
+
         botao_pesquisar = QPushButton('Pesquisar')
-        botao_pesquisar.setIcon(QIcon(get_resource_path('icones/search.png')))
+        botao_pesquisar.setIcon(obter_icone('icones/search.png'))
         botao_pesquisar.setIconSize(QSize(20, 20))
         botao_pesquisar.clicked.connect(self.abrir_janela_pesquisa)
 
         botao_listar = QPushButton('Listar Todos')
-        botao_listar.setIcon(QIcon(get_resource_path('icones/refresh.png')))
+        botao_listar.setIcon(obter_icone('icones/refresh.png'))
         botao_listar.setIconSize(QSize(20, 20))
-        botao_listar.clicked.connect(self.atualizar_tabela)
+        botao_listar.clicked.connect(self.listar_todos)
 
         botao_renovar = QPushButton('Renovação')
-        botao_renovar.setIcon(QIcon(get_resource_path('icones/money.png')))
+        botao_renovar.setIcon(obter_icone('icones/money.png'))
         botao_renovar.setIconSize(QSize(20, 20))
         botao_renovar.clicked.connect(self.abrir_renovacao)
 
         botao_comprovante = QPushButton('Ver Comprovante')
-        botao_comprovante.setIcon(QIcon(get_resource_path('icones/request_quote.png')))
+        botao_comprovante.setIcon(obter_icone('icones/request_quote.png'))
         botao_comprovante.setIconSize(QSize(20, 20))
         botao_comprovante.clicked.connect(self.ver_comprovante)
 
         botao_relatorio = QPushButton('Relatório')
-        botao_relatorio.setIcon(QIcon(get_resource_path('icones/chart.png')))
+        botao_relatorio.setIcon(obter_icone('icones/chart.png'))
         botao_relatorio.setIconSize(QSize(20, 20))
         botao_relatorio.clicked.connect(self.abrir_janela_relatorio)
 
+        botao_anexar = QPushButton('Anexar Comprovantes')
+        botao_anexar.setIcon(obter_icone('icones/request_quote.png'))
+        botao_anexar.setIconSize(QSize(20, 20))
+        botao_anexar.clicked.connect(self.anexar_comprovantes_lote)
+
         botao_importar = QPushButton('Importar CSV')
-        botao_importar.setIcon(QIcon(get_resource_path('icones/csv.png')))
+        botao_importar.setIcon(obter_icone('icones/csv.png'))
         botao_importar.setIconSize(QSize(20, 20))
         botao_importar.clicked.connect(self.importar_csv)
 
@@ -139,141 +626,116 @@ class MainWindow(QMainWindow):
         layout_botoes.addWidget(botao_editar)
         layout_botoes.addWidget(botao_remover)
         layout_botoes.addWidget(botao_avisar)
+        layout_botoes.addWidget(botao_campanha)
         layout_botoes.addWidget(botao_pesquisar)
         layout_botoes.addWidget(botao_listar)
         layout_botoes.addWidget(botao_renovar)
         layout_botoes.addWidget(botao_comprovante)
         layout_botoes.addWidget(botao_relatorio)
         layout_botoes.addWidget(botao_importar)
+        layout_botoes.addWidget(botao_anexar)
 
+        layout_principal.addWidget(self.campo_filtro)
         layout_principal.addWidget(self.tabela_clientes)
         layout_principal.addLayout(layout_botoes)
 
         widget_central.setLayout(layout_principal)
         self.setCentralWidget(widget_central)
 
+    def atualizar_tabela(self):
+        self.consulta_pesquisa = None
+        self.carregar_tabela()
+
+    def listar_todos(self):
+        self.campo_filtro.blockSignals(True)
+        self.campo_filtro.clear()
+        self.campo_filtro.blockSignals(False)
+        self.timer_filtro.stop()
         self.atualizar_tabela()
 
-    def atualizar_tabela(self):
+    def carregar_tabela(self):
+        """Recarrega a tabela combinando a pesquisa avançada e o filtro rápido.
+
+        Resultados pequenos são lidos por inteiro e filtrados em memória pelo
+        proxy; acima de limite_filtro_memoria o texto vira uma busca indexada.
+        """
         try:
-            clientes = self.database.listar_clientes()
-            self.tabela_clientes.setRowCount(len(clientes))
-            self.tabela_clientes.setColumnCount(15)  # Mantenha as 15 colunas
-            headers = [
-                'ID','Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Período',
-                'Último Pagamento', 'Vencimento', 'Data Aviso', 'Avisado',
-                'Status', 'Estado', 'Municipio', 'Observação', 'Comprovante'
-            ]
-            self.tabela_clientes.setHorizontalHeaderLabels(headers)
-            self.tabela_clientes.setColumnHidden(0, True)  # ID permanece oculto
-
-            # Índices das colunas que devem ter alinhamento à esquerda
-            colunas_alinhamento_esquerda = [1, 4, 14]  # Nome, E-mail, Observação
-
-            for linha, cliente in enumerate(clientes):
-                for coluna in range(15):  # Itera todas as 15 colunas
-                    if coluna == 0:  # ID (coluna 0, oculta)
-                        valor = str(cliente[0])
-                        item = QTableWidgetItem(valor)
-                        self.tabela_clientes.setItem(linha, 0, item)
-                        continue
-
-                    if coluna == 14:  # Comprovante (coluna 14)
-                        comprovante = cliente[14]  # Campo "comprovante" está na última posição
-                        if comprovante:
-                            label = QLabel()
-                            pixmap = QPixmap(get_resource_path("icones/check.png")).scaled(20, 20)
-                            label.setPixmap(pixmap)
-                            label.setAlignment(Qt.AlignCenter)
-                            self.tabela_clientes.setCellWidget(linha, 14, label)
-                        else:
-                            # Limpa o widget caso não haja comprovante
-                            self.tabela_clientes.setCellWidget(linha, 14, None)
-                            item = QTableWidgetItem("")
-                            item.setTextAlignment(Qt.AlignCenter)
-                            self.tabela_clientes.setItem(linha, 14, item)
-                        continue
-
-                    # Mapeamento ajustado dos índices do banco para a tabela:
-                    # Colunas 1-7: índices 1-7 do banco
-                    # Colunas 8-13: índices 8-13 do banco (pulando o comprovante)
-                    if coluna >= 1 and coluna <= 7:
-                        cliente_idx = coluna
-                    elif coluna >= 8 and coluna <= 13:
-                        cliente_idx = coluna
-                    else:
-                        cliente_idx = 0  # Valor padrão para evitar erros
-
-                    valor = str(cliente[cliente_idx]) if cliente_idx < len(cliente) else ""
-
-                    # Formatações específicas (telefone, CPF/CNPJ, datas, etc.)
-                    if coluna == 2:  # Telefone
-                        valor = CadastroClienteDialog.formatar_telefone(valor)
-                    elif coluna == 3:  # CPF/CNPJ
-                        valor = CadastroClienteDialog.formatar_cpf_cnpj(valor)
-                    elif coluna == 14:  # Comprovante (já tratado)
-                        continue
-                    elif coluna in [6, 7, 8]:  # Último Pagamento, Vencimento, Data Aviso
-                        try:
-                            valor = datetime.strptime(valor, "%Y-%m-%d").strftime("%d/%m/%Y")
-                        except Exception:
-                            pass
-                    elif coluna == 9:  # Avisado
-                        valor = "SIM" if valor == "1" else "NÃO"
-
-                    # Definição do item da tabela
-                    item = QTableWidgetItem(valor)
-                    # Define o alinhamento com base na coluna
-                    if coluna in colunas_alinhamento_esquerda:
-                        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)  # Alinhamento à esquerda
-                    else:
-                        item.setTextAlignment(Qt.AlignCenter)  # Centraliza o texto
-
-                    # Cores para Status (coluna 11)
-                    if coluna == 10:
-                        cor = QColor(173, 216, 230) if valor == 'Expirando' else \
-                            QColor(255, 182, 193) if valor == 'Inadimplente' else None
-                        if cor:
-                            item.setBackground(cor)
-
-                    # Insere o item na tabela (exceto para a coluna de comprovante)
-                    if coluna != 14:
-                        self.tabela_clientes.setItem(linha, coluna, item)
-                    # Garante que a coluna de comprovante sempre mostre o ícone
-                    elif coluna == 14 and comprovante:
-                        label = QLabel()
-                        pixmap = QPixmap("icones/check.png").scaled(20, 20)
-                        label.setPixmap(pixmap)
-                        label.setAlignment(Qt.AlignCenter)
-                        self.tabela_clientes.setCellWidget(linha, 14, label)
+            texto = self.campo_filtro.text().strip()
+            total = self.database.contar_clientes(self.consulta_pesquisa)
+
+            if total <= self.limite_filtro_memoria:
+                self.filtro_em_memoria = True
+                self.modelo_clientes.carregar(self.consulta_pesquisa, completo=True)
+                self.proxy_clientes.definir_termo(texto)
+            else:
+                self.filtro_em_memoria = False
+                self.proxy_clientes.definir_termo('')
+                consulta = self.consulta_pesquisa
+                if termos_busca(texto):
+                    busca = self.database.consulta_busca_rapida(texto)
+                    if consulta:
+                        busca = ConsultaClientes().adicionar_grupo(consulta).adicionar_grupo(busca)
+                    consulta = busca
+                self.modelo_clientes.carregar(consulta)
         except Exception as e:
             traceback.print_exc()
             QMessageBox.critical(self, 'Erro', f'Erro ao atualizar tabela: {str(e)}')
 
+    def aplicar_filtro_rapido(self):
+        if self.filtro_em_memoria:
+            self.proxy_clientes.definir_termo(self.campo_filtro.text())
+        else:
+            self.carregar_tabela()
+
+    def atualizar_contagem(self, *args):
+        carregados = self.modelo_clientes.rowCount()
+        total = self.modelo_clientes.total()
+        if self.proxy_clientes.filtrando():
+            self.label_total.setText(f'{self.proxy_clientes.rowCount()} de {total} clientes')
+        elif carregados < total:
+            self.label_total.setText(f'{carregados} de {total} clientes carregados')
+        else:
+            self.label_total.setText(f'{total} clientes')
+
+    def selecionar_cliente(self, cliente_id) -> bool:
+        """Seleciona a linha do cliente, se ela estiver carregada (e visível) na tabela."""
+        linha = self.modelo_clientes.linha_do_cliente(cliente_id)
+        if linha is None:
+            return False
+        indice = self.proxy_clientes.mapFromSource(self.modelo_clientes.index(linha, 1))
+        if not indice.isValid():
+            return False
+        self.tabela_clientes.selectRow(indice.row())
+        self.tabela_clientes.scrollTo(indice)
+        return True
+
+    def linha_selecionada(self):
+        """Linha do modelo de clientes correspondente à seleção (ou None)."""
+        indice = self.tabela_clientes.currentIndex()
+        if not indice.isValid():
+            return None
+        return self.proxy_clientes.mapToSource(indice).row()
+
+    def cliente_id_selecionado(self):
+        """ID do cliente na linha selecionada (ou None se nada estiver selecionado)."""
+        linha = self.linha_selecionada()
+        if linha is None:
+            return None
+        return self.modelo_clientes.cliente_id(linha)
+
     def adicionar_cliente(self):
         dialog = CadastroClienteDialog(self)
         if dialog.exec_() == QDialog.Accepted:
-            self.atualizar_tabela()
+            # A linha nova chega à tabela pelo evento de inserção do banco
+            self.selecionar_cliente(dialog.cliente_id)
 
     def editar_cliente(self):
         try:
-            linha_selecionada = self.tabela_clientes.currentRow()
-            if linha_selecionada == -1:
+            cliente_id = self.cliente_id_selecionado()
+            if cliente_id is None:
                 QMessageBox.warning(self, 'Aviso', 'Selecione um cliente para editar')
                 return
 
-            # Verifica se a coluna do ID existe e está preenchida
-            if self.tabela_clientes.columnCount() < 1:
-                QMessageBox.critical(self, 'Erro', 'Estrutura da tabela incorreta')
-                return
-
-            id_item = self.tabela_clientes.item(linha_selecionada, 0)
-            if not id_item or not id_item.text().isdigit():
-                QMessageBox.critical(self, 'Erro', 'ID do cliente inválido ou não encontrado')
-                return
-
-            cliente_id = int(id_item.text())
-
             # Busca o cliente usando o ID
             cliente = self.database.obter_cliente_por_id(cliente_id)
             if not cliente:
@@ -283,7 +745,7 @@ class MainWindow(QMainWindow):
             # Abre a janela de edição
             dialog = CadastroClienteDialog(self, cliente)
             if dialog.exec_() == QDialog.Accepted:
-                self.atualizar_tabela()
+                self.selecionar_cliente(cliente_id)
 
         except Exception as e:
             QMessageBox.critical(
@@ -294,26 +756,20 @@ class MainWindow(QMainWindow):
             traceback.print_exc()
 
     def remover_cliente(self):
-        linha_selecionada = self.tabela_clientes.currentRow()
-        if linha_selecionada >= 0:
+        cliente_id = self.cliente_id_selecionado()
+        if cliente_id is not None:
             try:
-                # Obter o ID REAL da lista de clientes, não da tabela
-                clientes = self.database.listar_clientes()
-
-                if linha_selecionada < len(clientes):
-                    cliente_id = clientes[linha_selecionada][0]  # ID está na posição 0 da tupla
-
-                    resposta = QMessageBox.question(
-                        self, 'Confirmar',
-                        'Tem certeza que deseja remover este cliente?',
-                        QMessageBox.Yes | QMessageBox.No
-                    )
+                resposta = QMessageBox.question(
+                    self, 'Confirmar',
+                    'Tem certeza que deseja remover este cliente?',
+                    QMessageBox.Yes | QMessageBox.No
+                )
 
-                    if resposta == QMessageBox.Yes:
-                        self.database.remover_cliente(cliente_id)
-                        self.atualizar_tabela()
-                else:
-                    QMessageBox.warning(self, 'Erro', 'Índice inválido')
+                if resposta == QMessageBox.Yes:
+                    cliente = self.database.obter_cliente_por_id(cliente_id)
+                    self.database.remover_cliente(cliente_id)
+                    if cliente:
+                        liberar_comprovante(self.database, cliente.get('comprovante'), COMPROVANTES_DIR)
 
             except Exception as e:
                 QMessageBox.critical(self, 'Erro', f'Erro ao remover cliente: {str(e)}')
@@ -322,176 +778,96 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Aviso', 'Selecione um cliente para remover')
 
     def recalcular_status_global(self):
-        """Atualiza o status de todos os clientes no banco de dados"""
-        db = Database()
-        clientes = db.listar_clientes()
-
-        for cliente in clientes:
-            cliente_id = cliente[0]
-            vencimento = cliente[7]  # Índice do vencimento
-
-            novo_status = calcular_status(vencimento)
-            db.atualizar_status_cliente(cliente_id, novo_status)
+        """Atualiza o status dos clientes cuja transição chegou e agenda a próxima verificação"""
+        # Só os clientes que mudam de faixa hoje são regravados; as linhas
+        # alteradas chegam à tabela pelos eventos do banco
+        try:
+            self.database.atualizar_transicoes()
+        except Exception as e:
+            print(f"Erro ao atualizar status: {e}")
+            traceback.print_exc()
+        self.agendar_virada_dia()
+
+    def agendar_virada_dia(self):
+        """Agenda recalcular_status_global para logo após a próxima meia-noite."""
+        agora = datetime.now()
+        meia_noite = datetime.combine(agora.date() + timedelta(days=1), datetime.min.time())
+        espera_ms = int((meia_noite - agora).total_seconds() * 1000) + 1000
+        self.timer_virada_dia.start(espera_ms)
+
+    def migrar_comprovantes(self):
+        """Leva os comprovantes ainda na raiz da pasta para as subpastas de hash (uma única vez)."""
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            migrar_para_subpastas(self.database, COMPROVANTES_DIR)
+        except Exception as e:
+            print(f"Erro ao migrar comprovantes para subpastas: {e}")
+            traceback.print_exc()
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def coletar_comprovantes_orfaos(self):
+        """Move para a quarentena, em segundo plano, os comprovantes sem cliente."""
+        tarefa = TarefaColeta(self.database.db_name, COMPROVANTES_DIR)
+        self.sinais_coleta = tarefa.sinais  # Mantém os sinais vivos até o fim da tarefa
+        self.sinais_coleta.concluida.connect(self.coleta_concluida)
+        QThreadPool.globalInstance().start(tarefa)
+
+    def coleta_concluida(self, resumo: dict):
+        orfaos = resumo['orfaos'] + resumo['originais']
+        recolhidos = orfaos + resumo['excluidos']
+        if recolhidos:
+            megabytes = (resumo['bytes_orfaos'] + resumo['bytes_originais'] + resumo['bytes_excluidos']) / (1024 * 1024)
+            self.statusBar().showMessage(
+                f"{orfaos} comprovante(s) sem cliente em quarentena, "
+                f"{resumo['excluidos']} excluído(s) ({megabytes:.1f} MB)", 10000)
 
     def abrir_janela_pesquisa(self):
         try:
             dialog = PesquisaClienteDialog(self)
             if dialog.exec_() == QDialog.Accepted:
-                criterio = dialog.criterio.currentText()
-                valores = dialog.get_valores_selecionados()
-                self.filtrar_tabela(criterio, valores)
+                self.filtrar_consulta(dialog.get_consulta())
         except Exception as e:
             QMessageBox.critical(self, 'Erro', f'Erro na janela de pesquisa: {str(e)}')
             traceback.print_exc()
 
-    def filtrar_tabela(self, criterio: str, valores: list):
+    def filtrar_consulta(self, consulta: ConsultaClientes):
         try:
-            if not valores:
+            if consulta.vazia():
                 self.atualizar_tabela()
                 return
+            self.consulta_pesquisa = consulta
 
-            # Validação especial para datas
-            if criterio == 'Vencimento (DD/MM/AAAA)':
-                valores = [v for v in valores if v.strip() != '']
-                if not valores:
-                    self.atualizar_tabela()
-                    return
-
-            clientes = self.database.pesquisar_clientes(criterio, valores)
-            self.exibir_resultados_pesquisa(clientes)
+            # Pesquisas por vencimento são exibidas do vencimento mais próximo ao mais distante
+            if consulta.ordem_padrao() == 'vencimento':
+                cabecalho = self.tabela_clientes.horizontalHeader()
+                cabecalho.blockSignals(True)
+                cabecalho.setSortIndicator(COLUNA_VENCIMENTO, Qt.AscendingOrder)
+                cabecalho.blockSignals(False)
+                self.modelo_clientes.definir_ordenacao(COLUNA_VENCIMENTO, Qt.AscendingOrder)
+            self.carregar_tabela()
 
         except Exception as e:
             QMessageBox.critical(self, 'Erro', f'Erro na pesquisa: {str(e)}')
             traceback.print_exc()
 
-    def exibir_resultados_pesquisa(self, clientes):
-        self.tabela_clientes.setRowCount(len(clientes))
-
-        # Índices das colunas que devem ter alinhamento à esquerda
-        colunas_alinhamento_esquerda = [1, 4, 13]  # Nome, E-mail, Observação
-
-        for linha, cliente in enumerate(clientes):
-            # Primeiro, adicione o ID na coluna 0 (mesmo que esteja oculta)
-            id_item = QTableWidgetItem(str(cliente[0]))
-            self.tabela_clientes.setItem(linha, 0, id_item)
-
-            # Processa cada coluna
-            for coluna in range(15):  # Itera todas as 15 colunas
-                if coluna == 0:  # ID (já tratado)
-                    continue
-
-                if coluna == 14:  # Comprovante (coluna 14)
-                    comprovante = cliente[14]  # Campo "comprovante" está na última posição
-                    if comprovante:
-                        label = QLabel()
-                        pixmap = QPixmap("icones/check.png").scaled(20, 20)
-                        label.setPixmap(pixmap)
-                        label.setAlignment(Qt.AlignCenter)
-                        self.tabela_clientes.setCellWidget(linha, 14, label)
-                    else:
-                        # Limpa o widget caso não haja comprovante
-                        self.tabela_clientes.setCellWidget(linha, 14, None)
-                        item = QTableWidgetItem("")
-                        item.setTextAlignment(Qt.AlignCenter)
-                        self.tabela_clientes.setItem(linha, 14, item)
-                    continue
-
-                # Para as outras colunas
-                cliente_idx = coluna
-                valor = str(cliente[cliente_idx]) if cliente_idx < len(cliente) else ""
-
-                # Formatações específicas
-                if coluna == 2:  # Telefone
-                    valor = CadastroClienteDialog.formatar_telefone(valor)
-                elif coluna == 3:  # CPF/CNPJ
-                    valor = CadastroClienteDialog.formatar_cpf_cnpj(valor)
-                elif coluna in [6, 7, 8]:  # Último Pagamento, Vencimento, Data Aviso
-                    try:
-                        valor = datetime.strptime(valor, "%Y-%m-%d").strftime("%d/%m/%Y")
-                    except Exception:
-                        pass
-                elif coluna == 9:  # Avisado
-                    valor = "SIM" if valor == "1" else "NÃO"
-
-                # Cria e configura o item da tabela
-                item = QTableWidgetItem(valor)
-                if coluna in colunas_alinhamento_esquerda:
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                else:
-                    item.setTextAlignment(Qt.AlignCenter)
-
-                # Cores para Status (coluna 10)
-                if coluna == 10:
-                    cor = QColor(173, 216, 230) if valor == 'Expirando' else \
-                        QColor(255, 182, 193) if valor == 'Inadimplente' else None
-                    if cor:
-                        item.setBackground(cor)
-
-                self.tabela_clientes.setItem(linha, coluna, item)
-        self.tabela_clientes.setRowCount(len(clientes))
-
-        # Índices das colunas de data
-        COLUNA_STATUS = 9  # Índice da coluna de status
-        colunas_datas = [5, 6]  # Último Pagamento e Vencimento
-
-        for linha, cliente in enumerate(clientes):
-            # Primeiro, adicione o ID na coluna 0 (mesmo que esteja oculta)
-            id_item = QTableWidgetItem(str(cliente[0]))
-            self.tabela_clientes.setItem(linha, 0, id_item)
-
-            # Depois, adicione os demais dados a partir da coluna 1
-            for coluna, valor in enumerate(cliente[1:], 1):  # Começa do índice 1
-                item = QTableWidgetItem(str(valor if valor is not None else ""))
-
-                # Converter datas para formato BR
-                if coluna - 1 in colunas_datas:  # -1 porque agora estamos começando do índice 1
-                    try:
-                        data_iso = datetime.strptime(str(valor), "%Y-%m-%d")
-                        item.setText(data_iso.strftime("%d/%m/%Y"))
-                    except (ValueError, TypeError):
-                        pass
-
-                # Define o alinhamento com base na coluna
-                if coluna in colunas_alinhamento_esquerda:
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)  # Alinhamento à esquerda
-                else:
-                    item.setTextAlignment(Qt.AlignCenter)  # Centraliza o texto
-
-                # Aplicar cores baseadas no status
-                if coluna - 1 == COLUNA_STATUS:  # -1 pela mesma razão
-                    if valor == "Expirando":
-                        item.setBackground(QColor(173, 216, 230))  # Azul claro
-                    elif valor == "Inadimplente":
-                        item.setBackground(QColor(255, 182, 193))  # Vermelho claro
-                    item.setForeground(QColor(0, 0, 0))  # Texto preto para contraste
-
-                self.tabela_clientes.setItem(linha, coluna, item)
-
     def abrir_renovacao(self):
-        linha_selecionada = self.tabela_clientes.currentRow()
-        if linha_selecionada >= 0:
-            clientes = self.database.listar_clientes()
-            if 0 <= linha_selecionada < len(clientes):
-                cliente = clientes[linha_selecionada]
+        linha = self.linha_selecionada()
+        if linha is not None:
+            cliente = self.modelo_clientes.cliente(linha)
+            if cliente:
                 dialog = RenovacaoDialog(self, cliente)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.atualizar_tabela()
+                    self.selecionar_cliente(cliente[0])
 
     def ver_comprovante(self):
         try:
-            linha_selecionada = self.tabela_clientes.currentRow()
-            if linha_selecionada == -1:
-                QMessageBox.warning(self, 'Aviso', 'Selecione um cliente para visualizar o comprovante.')
-                return
-
             # Obtém o ID do cliente selecionado
-            id_item = self.tabela_clientes.item(linha_selecionada, 0)
-            if not id_item or not id_item.text().isdigit():
-                QMessageBox.critical(self, 'Erro', 'ID do cliente inválido ou não encontrado.')
+            cliente_id = self.cliente_id_selecionado()
+            if cliente_id is None:
+                QMessageBox.warning(self, 'Aviso', 'Selecione um cliente para visualizar o comprovante.')
                 return
 
-            cliente_id = int(id_item.text())
-
             # Busca o cliente no banco de dados
             cliente = self.database.obter_cliente_por_id(cliente_id)
             if not cliente:
@@ -504,8 +880,8 @@ class MainWindow(QMainWindow):
                 QMessageBox.information(self, 'Informação', 'Nenhum comprovante encontrado para este cliente.')
                 return
 
-            # Monta o caminho completo do comprovante
-            comprovante_path = os.path.join(COMPROVANTES_DIR, comprovante_hash)
+            # Monta o caminho completo do comprovante (subpasta do hash)
+            comprovante_path = caminho_comprovante(comprovante_hash, COMPROVANTES_DIR)
             if not os.path.exists(comprovante_path):
                 QMessageBox.warning(self, 'Erro', 'Arquivo do comprovante não encontrado.')
                 return
@@ -545,9 +921,6 @@ class MainWindow(QMainWindow):
                     f'Registros com falha: {registros_falhos}'
                 )
 
-                # Atualiza a tabela para mostrar os novos registros
-                self.atualizar_tabela()
-
         except Exception as e:
             QMessageBox.critical(
                 self,
@@ -555,16 +928,64 @@ class MainWindow(QMainWindow):
                 f'Ocorreu um erro durante a importação:\n{str(e)}'
             )
 
+    def anexar_comprovantes_lote(self):
+        """Anexa os comprovantes de uma pasta, associando cada arquivo ao cliente pelo CPF/CNPJ do nome."""
+        pasta_origem = QFileDialog.getExistingDirectory(self, 'Selecionar pasta com os comprovantes')
+        if not pasta_origem:
+            return
+        try:
+            associados, self.nao_associados_lote = associar_arquivos(
+                pasta_origem, self.database.indice_documentos()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao ler a pasta: {str(e)}')
+            traceback.print_exc()
+            return
+        if not associados:
+            self.exibir_resultado_anexo(0, self.nao_associados_lote)
+            return
+
+        # Cópia e hash em segundo plano; a gravação no banco é feita aqui ao final
+        self.progresso_anexo = QProgressDialog('Anexando comprovantes...', None, 0, len(associados), self)
+        self.progresso_anexo.setWindowTitle('Anexar Comprovantes')
+        self.progresso_anexo.setWindowModality(Qt.WindowModal)
+        self.progresso_anexo.setMinimumDuration(0)
+        tarefa = TarefaAnexoLote(associados, COMPROVANTES_DIR)
+        self.sinais_anexo = tarefa.sinais
+        self.sinais_anexo.progresso.connect(lambda concluidos, total: self.progresso_anexo.setValue(concluidos))
+        self.sinais_anexo.concluido.connect(self.anexo_lote_concluido)
+        self.sinais_anexo.falhou.connect(self.anexo_lote_falhou)
+        pool_lote().start(tarefa)
+
+    def anexo_lote_concluido(self, atribuicoes: dict, falhas: list):
+        self.progresso_anexo.close()
+        try:
+            atualizados = gravar_anexos(self.database, atribuicoes, COMPROVANTES_DIR)
+        except Exception as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao gravar os comprovantes: {str(e)}')
+            traceback.print_exc()
+            return
+        self.exibir_resultado_anexo(atualizados, self.nao_associados_lote + falhas)
+
+    def anexo_lote_falhou(self, mensagem: str):
+        self.progresso_anexo.close()
+        QMessageBox.critical(self, 'Erro', f'Erro ao anexar comprovantes: {mensagem}')
+
+    def exibir_resultado_anexo(self, atualizados: int, nao_associados: list):
+        caixa = QMessageBox(self)
+        caixa.setWindowTitle('Anexar Comprovantes')
+        caixa.setIcon(QMessageBox.Information if not nao_associados else QMessageBox.Warning)
+        caixa.setText(f'Comprovantes anexados: {atualizados}\n'
+                      f'Arquivos não associados: {len(nao_associados)}')
+        if nao_associados:
+            caixa.setDetailedText('\n'.join(f'{arquivo}: {motivo}' for arquivo, motivo in nao_associados))
+        caixa.exec_()
+
     def avisar_cliente(self):
-        linha_selecionada = self.tabela_clientes.currentRow()
-        if linha_selecionada == -1:
+        cliente_id = self.cliente_id_selecionado()
+        if cliente_id is None:
             QMessageBox.warning(self, "Aviso", "Selecione um cliente para avisar.")
             return
-        id_item = self.tabela_clientes.item(linha_selecionada, 0)
-        if not id_item or not id_item.text().isdigit():
-            QMessageBox.critical(self, "Erro", "ID do cliente inválido ou não encontrado.")
-            return
-        cliente_id = int(id_item.text())
         cliente = self.database.obter_cliente_por_id(cliente_id)
         if not cliente:
             QMessageBox.warning(self, "Erro", "Cliente não encontrado.")
@@ -572,7 +993,42 @@ class MainWindow(QMainWindow):
 
         dialog = AvisoClienteDialog(self, cliente)
         if dialog.exec_() == QDialog.Accepted:
-            self.atualizar_tabela()
+            self.selecionar_cliente(cliente_id)
+
+    def abrir_campanha_aviso(self):
+        dialog = CampanhaAvisoDialog(self)
+        dialog.exec_()
+
+    def avisos_processados(self, resultados: list):
+        enviados = sum(1 for _, _, estado, _, _ in resultados if estado == AVISO_ENVIADO)
+        mensagem = f'Avisos enviados: {enviados}'
+        if enviados < len(resultados):
+            mensagem += f'; com falha: {len(resultados) - enviados}'
+        self.statusBar().showMessage(mensagem, 10000)
+
+    def closeEvent(self, evento):
+        # Avisos reservados e não enviados voltam para a fila da próxima abertura
+        self.despachante.parar()
+        super().closeEvent(evento)
+
+
+def armazenar_com_progresso(parent, preparacao: PreparacaoComprovante):
+    """
+    Armazena o comprovante em segundo plano, com progresso e opção de cancelar.
+
+    Returns:
+        str: Nome do arquivo armazenado, ou None se o usuário cancelou
+    """
+    progresso = QProgressDialog('Copiando comprovante...', 'Cancelar', 0, 0, parent)
+    progresso.setWindowTitle('Comprovante')
+    progresso.setWindowModality(Qt.WindowModal)  # Impede um segundo "Salvar" durante a cópia
+    progresso.setMinimumDuration(ATRASO_PROGRESSO_COPIA_MS)
+    try:
+        return preparacao.armazenar(progresso)
+    except CopiaCancelada:
+        return None
+    finally:
+        progresso.close()
 
 
 class CadastroClienteDialog(QDialog):
@@ -581,7 +1037,9 @@ class CadastroClienteDialog(QDialog):
         self.setWindowTitle('Cadastro de Cliente')
         self.database = Database()
         self.cliente = cliente
+        self.cliente_id = cliente['id'] if cliente else None
         self.comprovante_path = None
+        self.preparacao_comprovante = None
 
         layout = QFormLayout()
 
@@ -666,22 +1124,9 @@ class CadastroClienteDialog(QDialog):
         # Calcula vencimento inicial
         self.calcular_vencimento()
 
-    @staticmethod
-    def formatar_telefone(telefone: str) -> str:
-        numeros = ''.join(filter(str.isdigit, telefone))
-        if len(numeros) == 11:
-            return f"({numeros[:2]}) {numeros[2:7]}-{numeros[7:]}"
-        # Se não tiver 11 dígitos, retorna o formato original
-        return telefone
-
-    @staticmethod
-    def formatar_cpf_cnpj(valor: str) -> str:
-        numeros = ''.join(filter(str.isdigit, valor))
-        if len(numeros) == 11:
-            return f"{numeros[:3]}.{numeros[3:6]}.{numeros[6:9]}-{numeros[9:]}"
-        elif len(numeros) == 14:
-            return f"{numeros[:2]}.{numeros[2:5]}.{numeros[5:8]}/{numeros[8:12]}-{numeros[12:]}"
-        return valor
+    # Mantidos como atalhos para o módulo de formatação compartilhado
+    formatar_telefone = staticmethod(formatar_telefone)
+    formatar_cpf_cnpj = staticmethod(formatar_cpf_cnpj)
 
     def atualizarMascaraTelefone(self, text):
         # Remove caracteres não numéricos para contar os dígitos
@@ -810,12 +1255,10 @@ class CadastroClienteDialog(QDialog):
             self.ultimo_pagamento.setEnabled(False)
 
             # Vencimento
-            try:
-                vencimento_iso = cliente.get('vencimento', '')
-                vencimento_date = datetime.strptime(vencimento_iso, "%Y-%m-%d")
-                self.vencimento.setText(vencimento_date.strftime("%d/%m/%Y"))
-            except (ValueError, TypeError):
-                self.vencimento.setText("")
+            vencimento_iso = cliente.get('vencimento', '')
+            vencimento_br = formatar_data(vencimento_iso)
+            # Valores que não são datas ISO continuam deixando o campo vazio
+            self.vencimento.setText(vencimento_br if vencimento_br != str(vencimento_iso) else "")
             self.vencimento.setReadOnly(True)
             self.vencimento.setEnabled(False)
 
@@ -854,24 +1297,14 @@ class CadastroClienteDialog(QDialog):
                 QMessageBox.warning(self, 'Erro', 'E-mail inválido')
                 return
 
-            # Processar comprovante
+            # Processar comprovante (nomeado pelo hash do conteúdo; arquivos iguais são guardados uma vez)
             comprovante_hash = None
             if self.comprovante_path and os.path.isfile(self.comprovante_path):
-                # Verificar e criar diretório se necessário
-                os.makedirs(COMPROVANTES_DIR, exist_ok=True)
-
-                # Gerar nome baseado em hash
-                hash_name = hashlib.sha256(
-                    f"{self.nome.text()}{datetime.now().timestamp()}".encode()
-                ).hexdigest()[:16]
-
-                ext = os.path.splitext(self.comprovante_path)[1]
-                novo_nome = f"{hash_name}{ext}"
-                destino = os.path.join(COMPROVANTES_DIR, novo_nome)
-
-                # Copiar arquivo para o diretório de comprovantes
-                shutil.copy(self.comprovante_path, destino)
-                comprovante_hash = novo_nome
+                # A cópia roda em segundo plano; o banco só é gravado depois que ela termina
+                comprovante_hash = armazenar_com_progresso(self, self.preparacao_comprovante)
+                if comprovante_hash is None:
+                    return  # Cancelado: o diálogo continua aberto
+                agendar_miniatura(caminho_comprovante(comprovante_hash, COMPROVANTES_DIR))
 
             if self.cliente:  # Edição
                 cliente_completo = (
@@ -892,6 +1325,11 @@ class CadastroClienteDialog(QDialog):
                     self.cliente['id']  # ID do dicionário
                 )
                 self.database.atualizar_cliente(cliente_completo)
+
+                # Comprovante substituído: o antigo é excluído se ninguém mais o usa
+                comprovante_antigo = self.cliente.get('comprovante')
+                if comprovante_hash and comprovante_antigo and comprovante_antigo != comprovante_hash:
+                    liberar_comprovante(self.database, comprovante_antigo, COMPROVANTES_DIR)
             else:  # Novo cliente
                 vencimento_date = datetime.strptime(self.vencimento.text(), "%d/%m/%Y")
                 cliente = (
@@ -910,7 +1348,7 @@ class CadastroClienteDialog(QDialog):
                     self.observacao.text(),
                     comprovante_hash  # Adicionar o hash do comprovante
                 )
-                self.database.adicionar_cliente(cliente)
+                self.cliente_id = self.database.adicionar_cliente(cliente)
 
             self.accept()
         except Exception as e:
@@ -927,6 +1365,10 @@ class CadastroClienteDialog(QDialog):
             if file_name:
                 if os.path.exists(file_name):
                     self.comprovante_path = file_name
+                    # Reduz e recomprime em segundo plano enquanto o formulário é preenchido
+                    if self.preparacao_comprovante:
+                        self.preparacao_comprovante.descartar()
+                    self.preparacao_comprovante = PreparacaoComprovante(file_name, COMPROVANTES_DIR)
                 else:
                     QMessageBox.warning(self, 'Aviso', 'Arquivo selecionado não existe.')
         except Exception as e:
@@ -934,11 +1376,20 @@ class CadastroClienteDialog(QDialog):
             import traceback
             traceback.print_exc()
 
+    def done(self, resultado):
+        # Fechado sem salvar: apaga o temporário da preparação (ao salvar, armazenar() já o removeu)
+        if self.preparacao_comprovante:
+            self.preparacao_comprovante.descartar()
+        super().done(resultado)
+
 class PesquisaClienteDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle('Pesquisar Clientes')
-        self.setFixedSize(400, 300)  # Tamanho ajustado
+        self.setFixedSize(450, 520)  # Tamanho ajustado
+
+        # Critérios já empilhados: (conector, criterio, valores)
+        self.criterios_empilhados = []
 
         layout = QVBoxLayout()
 
@@ -949,7 +1400,11 @@ class PesquisaClienteDialog(QDialog):
             'Telefone',
             'CPF/CNPJ',
             'E-mail',
+            'Municipio',
             'Vencimento (DD/MM/AAAA)',
+            'Vencimento entre datas',
+            'Vence nos próximos N dias',
+            'Venceu nos últimos N dias',
             'Status',
             'Estado'
         ])
@@ -972,14 +1427,57 @@ class PesquisaClienteDialog(QDialog):
         self.lista_estados.addItems(estados)
         self.lista_estados.setSelectionMode(QListWidget.MultiSelection)
 
+        # Intervalo de vencimento (de/até)
+        self.data_inicio = QDateEdit()
+        self.data_inicio.setCalendarPopup(True)
+        self.data_inicio.setDisplayFormat('dd/MM/yyyy')
+        self.data_inicio.setDate(QDate.currentDate().addMonths(-1))
+        self.data_fim = QDateEdit()
+        self.data_fim.setCalendarPopup(True)
+        self.data_fim.setDisplayFormat('dd/MM/yyyy')
+        self.data_fim.setDate(QDate.currentDate())
+
+        self.intervalo_datas = QWidget()
+        layout_intervalo = QHBoxLayout()
+        layout_intervalo.setContentsMargins(0, 0, 0, 0)
+        layout_intervalo.addWidget(QLabel('De:'))
+        layout_intervalo.addWidget(self.data_inicio)
+        layout_intervalo.addWidget(QLabel('Até:'))
+        layout_intervalo.addWidget(self.data_fim)
+        self.intervalo_datas.setLayout(layout_intervalo)
+
+        # Janela relativa (em dias a partir de hoje)
+        self.campo_dias = QSpinBox()
+        self.campo_dias.setRange(0, 3650)
+        self.campo_dias.setValue(7)
+        self.campo_dias.setSuffix(' dias')
+
         # Container para os componentes
         self.container = QWidget()
         self.layout_container = QVBoxLayout()
         self.layout_container.addWidget(self.campo_texto)
         self.layout_container.addWidget(self.lista_status)
         self.layout_container.addWidget(self.lista_estados)
+        self.layout_container.addWidget(self.intervalo_datas)
+        self.layout_container.addWidget(self.campo_dias)
         self.container.setLayout(self.layout_container)
 
+        # Empilhamento de critérios (combinados com E/OU)
+        self.conector = QComboBox()
+        self.conector.addItems(['E', 'OU'])
+
+        botao_adicionar_criterio = QPushButton('Adicionar critério')
+        botao_adicionar_criterio.clicked.connect(self.adicionar_criterio)
+        botao_remover_criterio = QPushButton('Remover critério')
+        botao_remover_criterio.clicked.connect(self.remover_criterio)
+
+        layout_empilhar = QHBoxLayout()
+        layout_empilhar.addWidget(self.conector)
+        layout_empilhar.addWidget(botao_adicionar_criterio)
+        layout_empilhar.addWidget(botao_remover_criterio)
+
+        self.lista_criterios = QListWidget()
+
         # Botões
         botao_pesquisar = QPushButton('Pesquisar')
         botao_pesquisar.clicked.connect(self.accept)
@@ -991,6 +1489,9 @@ class PesquisaClienteDialog(QDialog):
         layout.addWidget(self.criterio)
         layout.addWidget(QLabel('Valor:'))
         layout.addWidget(self.container)
+        layout.addLayout(layout_empilhar)
+        layout.addWidget(QLabel('Critérios combinados:'))
+        layout.addWidget(self.lista_criterios)
         layout.addWidget(botao_pesquisar)
         layout.addWidget(botao_cancelar)
 
@@ -1004,11 +1505,17 @@ class PesquisaClienteDialog(QDialog):
         self.campo_texto.hide()
         self.lista_status.hide()
         self.lista_estados.hide()
+        self.intervalo_datas.hide()
+        self.campo_dias.hide()
 
         # Mostra o componente correto
-        if criterio in ['Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Vencimento (DD/MM/AAAA)']:
+        if criterio in ['Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Municipio', 'Vencimento (DD/MM/AAAA)']:
             self.campo_texto.show()
             self.campo_texto.clear()
+        elif criterio == 'Vencimento entre datas':
+            self.intervalo_datas.show()
+        elif criterio in ['Vence nos próximos N dias', 'Venceu nos últimos N dias']:
+            self.campo_dias.show()
         elif criterio == 'Status':
             self.lista_status.show()
         elif criterio == 'Estado':
@@ -1021,9 +1528,64 @@ class PesquisaClienteDialog(QDialog):
                 return [item.text() for item in self.lista_status.selectedItems()]
             else:
                 return [item.text() for item in self.lista_estados.selectedItems()]
+        elif criterio == 'Vencimento entre datas':
+            return [
+                self.data_inicio.date().toString('dd/MM/yyyy'),
+                self.data_fim.date().toString('dd/MM/yyyy')
+            ]
+        elif criterio in ['Vence nos próximos N dias', 'Venceu nos últimos N dias']:
+            return [str(self.campo_dias.value())]
         else:
             return [self.campo_texto.text().strip()]
 
+    def criterio_atual(self):
+        """Retorna (criterio, valores) do editor ou None se nada foi informado."""
+        valores = [v for v in self.get_valores_selecionados() if v.strip() != '']
+        if not valores:
+            return None
+        return self.criterio.currentText(), valores
+
+    def adicionar_criterio(self):
+        atual = self.criterio_atual()
+        if not atual:
+            QMessageBox.warning(self, 'Aviso', 'Informe um valor para o critério.')
+            return
+
+        criterio, valores = atual
+        conector = 'OR' if self.conector.currentText() == 'OU' else 'AND'
+        self.criterios_empilhados.append((conector, criterio, valores))
+
+        prefixo = '' if len(self.criterios_empilhados) == 1 else f'{self.conector.currentText()} '
+        self.lista_criterios.addItem(f"{prefixo}{criterio}: {', '.join(valores)}")
+
+        if criterio in ['Nome', 'Telefone', 'CPF/CNPJ', 'E-mail', 'Municipio', 'Vencimento (DD/MM/AAAA)']:
+            self.campo_texto.clear()
+
+    def remover_criterio(self):
+        linha = self.lista_criterios.currentRow()
+        if linha < 0:
+            return
+        self.lista_criterios.takeItem(linha)
+        del self.criterios_empilhados[linha]
+
+        # O primeiro critério restante não exibe conector
+        if linha == 0 and self.lista_criterios.count():
+            item = self.lista_criterios.item(0)
+            item.setText(item.text().split(' ', 1)[1])
+
+    def get_consulta(self) -> ConsultaClientes:
+        """Monta a consulta com os critérios empilhados (ou só o critério em edição, se não houver)."""
+        consulta = ConsultaClientes()
+        for conector, criterio, valores in self.criterios_empilhados:
+            consulta.adicionar(criterio, valores, conector)
+
+        # Com critérios empilhados, o valor que ficou no editor pode ser de um já adicionado ou removido
+        if not self.criterios_empilhados:
+            atual = self.criterio_atual()
+            if atual:
+                consulta.adicionar(*atual)
+        return consulta
+
 class RenovacaoDialog(QDialog):
     def __init__(self, parent=None, cliente=None):
         super().__init__(parent)
@@ -1031,6 +1593,7 @@ class RenovacaoDialog(QDialog):
         self.cliente = cliente
         self.database = Database()
         self.comprovante_path = None
+        self.preparacao_comprovante = None
 
         layout = QVBoxLayout()
 
@@ -1074,12 +1637,22 @@ class RenovacaoDialog(QDialog):
             if file_name:
                 if os.path.exists(file_name):
                     self.comprovante_path = file_name
+                    # Reduz e recomprime em segundo plano enquanto o formulário é preenchido
+                    if self.preparacao_comprovante:
+                        self.preparacao_comprovante.descartar()
+                    self.preparacao_comprovante = PreparacaoComprovante(file_name, COMPROVANTES_DIR)
                 else:
                     QMessageBox.warning(self, 'Aviso', 'Arquivo selecionado não existe.')
         except Exception as e:
             QMessageBox.critical(self, 'Erro', f'Falha ao carregar arquivo: {str(e)}')
             traceback.print_exc()
 
+    def done(self, resultado):
+        # Fechado sem salvar: apaga o temporário da preparação (ao salvar, armazenar() já o removeu)
+        if self.preparacao_comprovante:
+            self.preparacao_comprovante.descartar()
+        super().done(resultado)
+
     def calcular_novo_vencimento(self):
         try:
             periodo = int(self.periodo_assinatura.text()) * 30
@@ -1093,28 +1666,16 @@ class RenovacaoDialog(QDialog):
 
     def salvar_renovacao(self):
         try:
-            # Verificar e criar diretório se necessário
-            os.makedirs(COMPROVANTES_DIR, exist_ok=True)
-
-            # Processar comprovante
+            # Processar comprovante (nomeado pelo hash do conteúdo; arquivos iguais são guardados uma vez)
             comprovante_hash = None
             if self.comprovante_path and os.path.isfile(self.comprovante_path):
-                hash_name = hashlib.sha256(
-                    f"{self.cliente[0]}{datetime.now().timestamp()}".encode()
-                ).hexdigest()[:16]
-
-                ext = os.path.splitext(self.comprovante_path)[1]
-                novo_nome = f"{hash_name}{ext}"
-                destino = os.path.join(COMPROVANTES_DIR, novo_nome)
+                # A cópia roda em segundo plano; o banco só é gravado depois que ela termina
+                comprovante_hash = armazenar_com_progresso(self, self.preparacao_comprovante)
+                if comprovante_hash is None:
+                    return  # Cancelado: o diálogo continua aberto
+                agendar_miniatura(caminho_comprovante(comprovante_hash, COMPROVANTES_DIR))
 
-                # Remover arquivo antigo
-                if len(self.cliente) > 14 and self.cliente[14]:
-                    old_path = os.path.join(COMPROVANTES_DIR, self.cliente[14])
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-
-                shutil.copy(self.comprovante_path, destino)
-                comprovante_hash = novo_nome
+            comprovante_antigo = self.cliente[14] if len(self.cliente) > 14 else None
 
             # Construir dados atualizados
             cliente_atualizado = (
@@ -1131,11 +1692,15 @@ class RenovacaoDialog(QDialog):
                 self.cliente[11] if len(self.cliente) > 11 else '',
                 self.cliente[12] if len(self.cliente) > 12 else '',
                 self.cliente[13] if len(self.cliente) > 13 else '',
-                comprovante_hash,
+                comprovante_hash or comprovante_antigo,  # Manter comprovante se não for alterado
                 self.cliente[0]  # ID
             )
 
             self.database.atualizar_cliente(cliente_atualizado)
+
+            # Comprovante substituído: o antigo só é excluído se nenhum outro cliente o usa
+            if comprovante_hash and comprovante_antigo and comprovante_antigo != comprovante_hash:
+                liberar_comprovante(self.database, comprovante_antigo, COMPROVANTES_DIR)
             self.accept()
 
         except Exception as e:
@@ -1160,43 +1725,129 @@ class ComprovanteDialog(QDialog):
         self.scroll_area.setWidget(self.label_imagem)
         layout.addWidget(self.scroll_area)
 
-        # Botão para fechar a janela
+        # Botões: resolução original (sob demanda) e fechar
+        layout_botoes = QHBoxLayout()
+        self.botao_original = QPushButton('Ver em resolução original')
+        self.botao_original.clicked.connect(self.carregar_original)
+        layout_botoes.addWidget(self.botao_original)
+
         botao_fechar = QPushButton('Fechar')
         botao_fechar.clicked.connect(self.close)
-        layout.addWidget(botao_fechar)
+        layout_botoes.addWidget(botao_fechar)
+        layout.addLayout(layout_botoes)
 
         self.setLayout(layout)
 
         # Carrega a imagem
+        self.comprovante_path = comprovante_path
+        self.sinais_miniatura = None
         self.carregar_imagem(comprovante_path)
 
     def carregar_imagem(self, comprovante_path):
-        if os.path.exists(comprovante_path):
-            pixmap = QPixmap(comprovante_path)
-            self.label_imagem.setPixmap(pixmap)
+        """Exibe a miniatura em cache; se ainda não existir, gera em segundo plano."""
+        if not os.path.exists(comprovante_path):
+            QMessageBox.warning(self, 'Erro', 'Comprovante não encontrado.')
+            return
 
-            # Define o tamanho máximo baseado na área disponível da tela (com margem)
-            screen_geometry = QApplication.desktop().availableGeometry(self)
-            max_width = screen_geometry.width() - 100
-            max_height = screen_geometry.height() - 100
+        miniatura = miniatura_atualizada(comprovante_path)
+        if miniatura:
+            self.exibir_pixmap(QPixmap(miniatura))
+            return
 
-            # Calcula as dimensões desejadas, respeitando o tamanho da imagem e os limites da tela
-            new_width = min(pixmap.width(), max_width)
-            new_height = min(pixmap.height(), max_height)
+        self.label_imagem.setText('Carregando comprovante...')
+        self.resize(400, 300)
+        self.sinais_miniatura = agendar_miniatura(comprovante_path, self.miniatura_pronta, self.miniatura_falhou)
+
+        # Uma tarefa que terminou logo antes da conexão não emite de novo
+        miniatura = miniatura_atualizada(comprovante_path)
+        if miniatura:
+            self.exibir_pixmap(QPixmap(miniatura))
+
+    def miniatura_pronta(self, comprovante_path, miniatura):
+        if comprovante_path == self.comprovante_path:
+            self.exibir_pixmap(QPixmap(miniatura))
+
+    def miniatura_falhou(self, comprovante_path, mensagem):
+        # Formatos que o leitor não reduz ainda podem abrir inteiros
+        if comprovante_path == self.comprovante_path:
+            self.carregar_original()
+
+    def carregar_original(self):
+        self.exibir_pixmap(QPixmap(self.comprovante_path))
+        self.botao_original.setEnabled(False)
+
+    def exibir_pixmap(self, pixmap):
+        if pixmap.isNull():
+            self.label_imagem.setText('Não foi possível abrir o comprovante.')
+            return
+        self.label_imagem.setPixmap(pixmap)
+
+        # Define o tamanho máximo baseado na área disponível da tela (com margem)
+        screen_geometry = QApplication.desktop().availableGeometry(self)
+        max_width = screen_geometry.width() - 100
+        max_height = screen_geometry.height() - 100
+
+        # Calcula as dimensões desejadas, respeitando o tamanho da imagem e os limites da tela
+        new_width = min(pixmap.width(), max_width)
+        new_height = min(pixmap.height(), max_height)
+
+        self.resize(new_width, new_height)
+
+
+class SinaisRenderizacao(QObject):
+    concluido = pyqtSignal(object, object, QImage)  # chave, figura, imagem
+    falhou = pyqtSignal(object, str)
+
+
+class RenderizacaoGrafico(QRunnable):
+    """Desenha um gráfico em buffer Agg fora da thread da interface."""
+
+    def __init__(self, chave, tipo, dados, titulo):
+        super().__init__()
+        self.chave = chave
+        self.tipo = tipo
+        self.dados = dados
+        self.titulo = titulo
+        self.sinais = SinaisRenderizacao()
+
+    def run(self):
+        try:
+            figura, imagem = renderizar_grafico(self.tipo, self.dados, self.titulo)
+            self.sinais.concluido.emit(self.chave, figura, imagem)
+        except Exception as e:
+            traceback.print_exc()
+            self.sinais.falhou.emit(self.chave, str(e))
 
-            self.resize(new_width, new_height)
-        else:
-            QMessageBox.warning(self, 'Erro', 'Comprovante não encontrado.')
 
 class RelatorioDialog(QDialog):
+    # Gráficos já renderizados, compartilhados entre aberturas do diálogo:
+    # (tipo, título, dados) -> (figura, imagem). Como a chave inclui os dados
+    # agregados, qualquer alteração nos clientes gera uma nova versão
+    _cache_graficos = OrderedDict()
+    MAX_GRAFICOS_CACHE = 16
+
+    # O matplotlib não é seguro para desenhar várias figuras ao mesmo tempo,
+    # então os gráficos são renderizados um de cada vez
+    _pool_renderizacao = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle('Relatórios')
         self.setMinimumSize(800, 600)
         self.database = Database()
         self.current_figure = None
+        self.imagem_atual = None
+        self.chave_pendente = None
+        self.zoom = 1.0
         self.init_ui()
 
+    @classmethod
+    def pool_renderizacao(cls) -> QThreadPool:
+        if cls._pool_renderizacao is None:
+            cls._pool_renderizacao = QThreadPool()
+            cls._pool_renderizacao.setMaxThreadCount(1)
+        return cls._pool_renderizacao
+
     def init_ui(self):
         layout = QVBoxLayout()
 
@@ -1206,6 +1857,10 @@ class RelatorioDialog(QDialog):
         self.btn_estado.clicked.connect(self.gerar_relatorio_estado)
         self.btn_municipio = QPushButton('Município', self)
         self.btn_municipio.clicked.connect(self.gerar_relatorio_municipio)
+        self.btn_inadimplencia = QPushButton('Inadimplência', self)
+        self.btn_inadimplencia.clicked.connect(self.gerar_relatorio_inadimplencia)
+        self.btn_renovacoes = QPushButton('Renovações (12 meses)', self)
+        self.btn_renovacoes.clicked.connect(self.gerar_relatorio_renovacoes)
 
         # Botões de zoom
         zoom_layout = QHBoxLayout()
@@ -1219,11 +1874,17 @@ class RelatorioDialog(QDialog):
 
         btn_top_layout.addWidget(self.btn_estado)
         btn_top_layout.addWidget(self.btn_municipio)
+        btn_top_layout.addWidget(self.btn_inadimplencia)
+        btn_top_layout.addWidget(self.btn_renovacoes)
         btn_top_layout.addLayout(zoom_layout)
 
-        # Área do gráfico
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
+        # Área do gráfico: exibe a imagem renderizada em segundo plano
+        self.label_grafico = QLabel('Selecione um relatório', self)
+        self.label_grafico.setAlignment(Qt.AlignCenter)
+        self.area_grafico = QScrollArea(self)
+        self.area_grafico.setWidget(self.label_grafico)
+        self.area_grafico.setWidgetResizable(True)
+        self.area_grafico.setAlignment(Qt.AlignCenter)
 
         # Botão de exportação
         btn_exportar = QPushButton('Exportar Gráfico', self)
@@ -1231,7 +1892,7 @@ class RelatorioDialog(QDialog):
         btn_exportar.clicked.connect(self.exportar_grafico)
 
         layout.addLayout(btn_top_layout)
-        layout.addWidget(self.canvas)
+        layout.addWidget(self.area_grafico)
         layout.addWidget(btn_exportar, alignment=Qt.AlignRight)
 
         self.setLayout(layout)
@@ -1262,100 +1923,364 @@ class RelatorioDialog(QDialog):
             except Exception as e:
                 QMessageBox.critical(self, 'Erro', f'Falha ao exportar gráfico:\n{str(e)}')
 
+    def gerar_relatorio(self, nome):
+        # Agregação feita no banco; o desenho vai para segundo plano
+        _, tipo, titulo, _ = RELATORIOS[nome]
+        self.exibir_grafico(tipo, dados_relatorio(self.database, nome), titulo)
+
     def gerar_relatorio_estado(self):
-        clientes = self.database.listar_clientes()
-        estados = [cliente[11] for cliente in clientes if cliente[11]]
+        self.gerar_relatorio('estado')
 
-        # Contagem por estado
-        contagem = {}
-        for estado in estados:
-            contagem[estado] = contagem.get(estado, 0) + 1
+    def gerar_relatorio_municipio(self):
+        self.gerar_relatorio('municipio')
+
+    def gerar_relatorio_inadimplencia(self):
+        self.gerar_relatorio('inadimplencia')
+
+    def gerar_relatorio_renovacoes(self):
+        self.gerar_relatorio('renovacoes')
+
+    def exibir_grafico(self, tipo, dados, titulo):
+        """Mostra o gráfico do cache ou agenda a renderização em segundo plano."""
+        if not dados:
+            self.chave_pendente = None
+            self.current_figure = None
+            self.imagem_atual = None
+            self.label_grafico.setPixmap(QPixmap())
+            self.label_grafico.setText('Nenhum dado para exibir')
+            return
 
-        self.plot_pie_chart(contagem, 'Distribuição de Clientes por Estado')
+        chave = (tipo, titulo, tuple(dados.items()))
+        self.chave_pendente = chave
 
-    def gerar_relatorio_municipio(self):
-        clientes = self.database.listar_clientes()
-        municipios = [f"{cliente[12]} ({cliente[11]})" for cliente in clientes if cliente[12]]
+        em_cache = self._cache_graficos.get(chave)
+        if em_cache is not None:
+            self._cache_graficos.move_to_end(chave)
+            self.mostrar_grafico(*em_cache)
+            return
 
-        # Contagem por município
-        contagem = {}
-        for municipio in municipios:
-            contagem[municipio] = contagem.get(municipio, 0) + 1
+        self.label_grafico.setPixmap(QPixmap())
+        self.label_grafico.setText('Gerando gráfico...')
+        tarefa = RenderizacaoGrafico(chave, tipo, dados, titulo)
+        tarefa.sinais.concluido.connect(self.grafico_renderizado)
+        tarefa.sinais.falhou.connect(self.falha_renderizacao)
+        self.pool_renderizacao().start(tarefa)
+
+    def grafico_renderizado(self, chave, figura, imagem):
+        self._cache_graficos[chave] = (figura, imagem)
+        while len(self._cache_graficos) > self.MAX_GRAFICOS_CACHE:
+            self._cache_graficos.popitem(last=False)
+
+        # Ignora resultados de relatórios que o usuário já trocou
+        if chave == self.chave_pendente:
+            self.mostrar_grafico(figura, imagem)
+
+    def falha_renderizacao(self, chave, mensagem):
+        if chave == self.chave_pendente:
+            self.label_grafico.setText('')
+            QMessageBox.critical(self, 'Erro', f'Falha ao gerar gráfico:\n{mensagem}')
+
+    def mostrar_grafico(self, figura, imagem):
+        self.current_figure = figura
+        self.imagem_atual = QPixmap.fromImage(imagem)
+        self.aplicar_zoom()
+
+    def aplicar_zoom(self):
+        """Reescala a imagem já renderizada (o zoom não redesenha o gráfico)."""
+        if self.imagem_atual is None:
+            return
+        # A imagem é renderizada com o dobro da resolução exibida em 100%
+        escala = self.zoom * 100 / DPI_GRAFICO
+        largura = int(self.imagem_atual.width() * escala)
+        altura = int(self.imagem_atual.height() * escala)
+        self.label_grafico.setText('')
+        self.label_grafico.setPixmap(
+            self.imagem_atual.scaled(largura, altura, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        )
 
-        self.plot_pie_chart(contagem, 'Distribuição de Clientes por Município')
+    def zoom_in(self):
+        if self.current_figure:
+            self.zoom *= 1.2
+            self.aplicar_zoom()
 
-    def plot_pie_chart(self, data, title):
-        self.figure.clear()
-        # Set a larger figure size and adjust layout
-        self.figure.set_size_inches(10, 8)
-        ax = self.figure.add_subplot(111)
+    def zoom_out(self):
+        if self.current_figure:
+            self.zoom /= 1.2
+            self.aplicar_zoom()
 
-        labels = list(data.keys())
-        sizes = list(data.values())
 
-        # Create custom labels with both percentage and absolute numbers
-        total = sum(sizes)
-        custom_labels = [f'{label}\n{size} ({size/total*100:.1f}%)' for label, size in zip(labels, sizes)]
+class CampanhaAvisoDialog(QDialog):
+    """Avisa pelo WhatsApp, em sequência, todos os clientes de um status ou janela de vencimento."""
 
-        ax.pie(sizes, labels=custom_labels, startangle=90)
-        ax.axis('equal')
-        # Add padding between title and plot
-        ax.set_title(title, pad=20)
-        
-        # Adjust layout to prevent overlapping
-        self.figure.tight_layout()
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Avisar em Lote')
+        self.setMinimumSize(700, 600)
+        # Utiliza o mesmo objeto Database do MainWindow
+        self.database = parent.database
+        self.despachante = parent.despachante
+        self.clientes = []
+        self.envios = []
+        self.posicoes = {}  # ID do aviso na caixa de saída -> linha da lista
+        self.pendentes = set()
 
-        self.current_figure = self.figure
-        self.canvas.draw()
+        layout = QVBoxLayout()
 
-    def plot_bar_chart(self, data, title):
-        # Limpa a figura atual se existir
-        if self.current_figure:
-            plt.close(self.current_figure)
+        # Seleção: status e/ou janela de vencimento
+        form_layout = QFormLayout()
+        status_layout = QHBoxLayout()
+        self.chk_status = {}
+        for indice, status in enumerate(STATUS_CAMPANHA):
+            caixa = QCheckBox(status)
+            caixa.setChecked(indice < 2)
+            self.chk_status[status] = caixa
+            status_layout.addWidget(caixa)
+        form_layout.addRow('Status:', status_layout)
+
+        janela_layout = QHBoxLayout()
+        self.chk_janela = QCheckBox('Vencimento entre')
+        self.data_inicio = QDateEdit(QDate.currentDate().addDays(-30))
+        self.data_inicio.setCalendarPopup(True)
+        self.data_fim = QDateEdit(QDate.currentDate().addDays(DIAS_EXPIRANDO))
+        self.data_fim.setCalendarPopup(True)
+        janela_layout.addWidget(self.chk_janela)
+        janela_layout.addWidget(self.data_inicio)
+        janela_layout.addWidget(QLabel('e'))
+        janela_layout.addWidget(self.data_fim)
+        form_layout.addRow('Janela:', janela_layout)
+
+        self.chk_nao_avisados = QCheckBox('Somente clientes ainda não avisados')
+        self.chk_nao_avisados.setChecked(True)
+        form_layout.addRow('', self.chk_nao_avisados)
+
+        # Modelo da mensagem
+        self.modelo = QPlainTextEdit(MODELO_PADRAO)
+        self.modelo.setMaximumHeight(90)
+        self.modelo.textChanged.connect(self.atualizar_previa)
+        form_layout.addRow('Mensagem:', self.modelo)
+        campos = QLabel('Campos: ' + ', '.join(f'{{{campo}}}' for campo in CAMPOS_MODELO))
+        campos.setToolTip('\n'.join(f'{{{campo}}}: {descricao}' for campo, descricao in CAMPOS_MODELO.items()))
+        campos.setWordWrap(True)
+        form_layout.addRow('', campos)
+        layout.addLayout(form_layout)
 
-        # Cria uma nova figura
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(range(len(data)), list(data.values()))
+        self.btn_selecionar = QPushButton('Selecionar Clientes')
+        self.btn_selecionar.setIcon(obter_icone('icones/search.png'))
+        self.btn_selecionar.clicked.connect(self.selecionar_clientes)
+        layout.addWidget(self.btn_selecionar)
 
-        # Personaliza o gráfico
-        ax.set_title(title)
-        ax.set_ylabel('Quantidade de Clientes')
+        # Clientes selecionados e prévia da mensagem do cliente marcado
+        self.lista_clientes = QListWidget()
+        self.lista_clientes.currentRowChanged.connect(self.atualizar_previa)
+        layout.addWidget(self.lista_clientes)
+        self.label_previa = QLabel()
+        self.label_previa.setWordWrap(True)
+        self.label_previa.setStyleSheet('color: #555;')
+        layout.addWidget(self.label_previa)
 
-        # Ajusta os rótulos do eixo x
-        labels = list(data.keys())
-        ax.set_xticks(range(len(data)))
-        ax.set_xticklabels(labels, rotation=45, ha='right')
+        self.label_progresso = QLabel()
+        layout.addWidget(self.label_progresso)
 
-        # Adiciona os valores sobre as barras
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom')
+        # Botões de ação
+        btn_layout = QHBoxLayout()
+        self.btn_iniciar = QPushButton('Iniciar Envio')
+        self.btn_iniciar.setIcon(obter_icone('icones/whatsapp.png'))
+        self.btn_iniciar.setEnabled(False)
+        self.btn_iniciar.clicked.connect(self.iniciar_envio)
+        self.btn_pausar = QPushButton('Pausar')
+        self.btn_pausar.setEnabled(False)
+        self.btn_pausar.clicked.connect(self.pausar_envio)
+        self.btn_parar = QPushButton('Parar')
+        self.btn_parar.setEnabled(False)
+        self.btn_parar.clicked.connect(self.parar_envio)
+        btn_fechar = QPushButton('Fechar')
+        btn_fechar.clicked.connect(self.reject)
+        btn_layout.addWidget(self.btn_iniciar)
+        btn_layout.addWidget(self.btn_pausar)
+        btn_layout.addWidget(self.btn_parar)
+        btn_layout.addWidget(btn_fechar)
+        layout.addLayout(btn_layout)
 
-        # Ajusta o layout para evitar cortes nos rótulos
-        plt.tight_layout()
+        self.setLayout(layout)
 
-        # Atualiza a figura atual
-        self.current_figure = fig
-        
-        # Atualiza o canvas para exibir o gráfico
-        self.canvas.draw()
+    def selecionar_clientes(self):
+        status = [status for status, caixa in self.chk_status.items() if caixa.isChecked()]
+        inicio = fim = None
+        if self.chk_janela.isChecked():
+            inicio = self.data_inicio.date().toPyDate().toordinal()
+            fim = self.data_fim.date().toPyDate().toordinal()
+            inicio, fim = min(inicio, fim), max(inicio, fim)
+        elif not status:
+            QMessageBox.warning(self, 'Aviso', 'Marque ao menos um status ou a janela de vencimento.')
+            return
+
+        try:
+            self.clientes = self.database.selecionar_campanha(status, inicio, fim,
+                                                              self.chk_nao_avisados.isChecked())
+        except Exception as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao selecionar clientes: {str(e)}')
+            traceback.print_exc()
+            return
 
-        # Retorna a figura para exibição
-        return fig
+        self.lista_clientes.clear()
+        for cliente in self.clientes:
+            self.lista_clientes.addItem(
+                f'{cliente[1]} — {formatar_telefone(cliente[2] or "")} — '
+                f'vence {formatar_data(cliente[7])} ({cliente[10]})'
+            )
+        self.envios = []
+        self.label_progresso.setText(f'{len(self.clientes)} cliente(s) selecionado(s)')
+        self.btn_iniciar.setEnabled(bool(self.clientes))
+        if self.clientes:
+            self.lista_clientes.setCurrentRow(0)
+        else:
+            self.label_previa.clear()
 
-    def zoom_in(self):
-        if self.current_figure:
-            current_size = self.figure.get_size_inches()
-            self.figure.set_size_inches(current_size[0] * 1.2, current_size[1] * 1.2)
-            self.canvas.draw()
+    def atualizar_previa(self, *args):
+        linha = self.lista_clientes.currentRow()
+        if not 0 <= linha < len(self.clientes):
+            return
+        modelo = self.modelo.toPlainText()
+        erro = validar_modelo(modelo)
+        self.label_previa.setText(erro or 'Prévia: ' + renderizar_mensagem(modelo, self.clientes[linha]))
+
+    def iniciar_envio(self):
+        modelo = self.modelo.toPlainText()
+        erro = validar_modelo(modelo)
+        if erro:
+            QMessageBox.warning(self, 'Aviso', erro)
+            return
+
+        self.envios, sem_telefone = preparar_envios(self.clientes, modelo)
+        if sem_telefone:
+            resposta = QMessageBox.question(
+                self, 'Telefone inválido',
+                f'{len(sem_telefone)} cliente(s) sem telefone válido serão ignorados. Continuar?',
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if resposta != QMessageBox.Yes:
+                return
+        if not self.envios:
+            return
+
+        # As mensagens ficam gravadas na caixa de saída: se a aplicação fechar
+        # no meio, o envio continua na próxima abertura
+        try:
+            ids = self.database.enfileirar_avisos(
+                [(cliente_id, telefone, mensagem) for cliente_id, _, telefone, mensagem in self.envios]
+            )
+        except Exception as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao enfileirar os avisos: {str(e)}')
+            traceback.print_exc()
+            return
+        self.posicoes = {aviso_id: posicao for posicao, aviso_id in enumerate(ids)}
+        self.pendentes = set(ids)
+        self.enviados = 0
+        self.falhas = 0
+
+        # A lista passa a mostrar só quem será avisado, na ordem de envio
+        self.lista_clientes.clear()
+        for _, nome, _, _ in self.envios:
+            self.lista_clientes.addItem(QListWidgetItem(f'{nome} — na fila'))
+        self.label_progresso.setText(f'{len(ids)} aviso(s) na fila')
+
+        self.despachante.processados.connect(self.avisos_processados)
+        self.btn_selecionar.setEnabled(False)
+        self.btn_iniciar.setEnabled(False)
+        self.btn_pausar.setEnabled(True)
+        self.btn_parar.setEnabled(True)
+        if self.despachante.pausado:
+            self.despachante.continuar()
+        self.despachante.acordar()
+
+    def avisos_processados(self, resultados: list):
+        for aviso_id, _, estado, erro, proxima in resultados:
+            posicao = self.posicoes.get(aviso_id)
+            if posicao is None:
+                continue  # Aviso de outra campanha
+            item = self.lista_clientes.item(posicao)
+            nome = self.envios[posicao][1]
+            if estado == AVISO_ENVIADO:
+                item.setText(f'{nome} — enviado')
+                item.setForeground(QColor('#2e7d32'))
+                self.enviados += 1
+            elif estado == AVISO_PENDENTE:
+                hora = datetime.fromtimestamp(proxima).strftime('%H:%M')
+                item.setText(f'{nome} — {erro}; nova tentativa às {hora}')
+                item.setForeground(QColor('#ef6c00'))
+                continue
+            else:
+                item.setText(f'{nome} — falhou: {erro}')
+                item.setForeground(QColor('#c62828'))
+                self.falhas += 1
+            self.pendentes.discard(aviso_id)
+            self.lista_clientes.scrollToItem(item)
+
+        self.label_progresso.setText(f'Enviados {self.enviados} de {len(self.posicoes)}'
+                                     + (f'; falhas: {self.falhas}' if self.falhas else ''))
+        if self.posicoes and not self.pendentes:
+            self.envio_concluido()
+
+    def pausar_envio(self):
+        if self.despachante.pausado:
+            self.despachante.continuar()
+            self.btn_pausar.setText('Pausar')
+        else:
+            self.despachante.pausar()
+            self.btn_pausar.setText('Continuar')
+
+    def parar_envio(self):
+        """Cancela os avisos da campanha que ainda estão na fila."""
+        try:
+            cancelados = self.database.cancelar_avisos(sorted(self.pendentes))
+        except Exception as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao cancelar os avisos: {str(e)}')
+            traceback.print_exc()
+            return
+        for aviso_id in cancelados:
+            posicao = self.posicoes[aviso_id]
+            item = self.lista_clientes.item(posicao)
+            item.setText(f'{self.envios[posicao][1]} — cancelado')
+            item.setForeground(QColor('#888888'))
+            self.pendentes.discard(aviso_id)
+        # Os que já estavam sendo enviados terminam normalmente
+        if self.despachante.pausado:
+            self.despachante.continuar()
+            self.btn_pausar.setText('Pausar')
+        self.btn_pausar.setEnabled(False)
+        self.btn_parar.setEnabled(False)
+        self.label_progresso.setText(f'Envio interrompido: {self.enviados} enviado(s) de {len(self.posicoes)}')
+
+    def envio_concluido(self):
+        self.btn_pausar.setEnabled(False)
+        self.btn_parar.setEnabled(False)
+        QMessageBox.information(self, 'Avisar em Lote',
+                                f'Clientes avisados: {self.enviados} de {len(self.posicoes)}'
+                                + (f'\nFalhas: {self.falhas}' if self.falhas else ''))
+
+    def done(self, resultado):
+        # A pausa vale para o despachante da aplicação inteira: ao fechar, o envio
+        # é retomado ou os avisos restantes da campanha são cancelados
+        if self.despachante.pausado:
+            if self.pendentes:
+                resposta = QMessageBox.question(
+                    self, 'Envio pausado',
+                    f'{len(self.pendentes)} aviso(s) ainda não foram enviados. Cancelar esses avisos?\n\n'
+                    'Se não forem cancelados, o envio continua em segundo plano.',
+                    QMessageBox.Yes | QMessageBox.No
+                )
+                if resposta == QMessageBox.Yes:
+                    self.parar_envio()
+            self.despachante.continuar()
+
+        # Os avisos que restarem continuam sendo enviados em segundo plano
+        if self.posicoes:
+            try:
+                self.despachante.processados.disconnect(self.avisos_processados)
+            except TypeError:
+                pass
+        super().done(resultado)
 
-    def zoom_out(self):
-        if self.current_figure:
-            current_size = self.figure.get_size_inches()
-            self.figure.set_size_inches(current_size[0] / 1.2, current_size[1] / 1.2)
-            self.canvas.draw()
 
 class AvisoClienteDialog(QDialog):
     def __init__(self, parent=None, cliente=None):
@@ -1380,7 +2305,7 @@ class AvisoClienteDialog(QDialog):
 
         # Botão WhatsApp (ícone) para enviar mensagem
         self.btn_whatsapp = QPushButton()
-        self.btn_whatsapp.setIcon(QIcon(get_resource_path('icones/whatsapp.png')))
+        self.btn_whatsapp.setIcon(obter_icone('icones/whatsapp.png'))
         self.btn_whatsapp.setIconSize(QSize(24, 24))
         self.btn_whatsapp.clicked.connect(self.enviar_whatsapp)
 